@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import time
+
+
+def cache_key(model, system_prompt, user_prompt, temperature):
+    """按模型、系统提示词、用户提示词和温度计算内容寻址的缓存键"""
+    raw = json.dumps([model, system_prompt, user_prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """AI建议的磁盘缓存，每条一个 {key}.json 文件。
+
+    命中时刷新文件 mtime，淘汰时按 mtime 从旧到新删除（LRU），直到条数和总大小
+    都在上限内；超过 ttl 秒的条目视为过期。"""
+
+    def __init__(self, cache_dir, max_entries=200, max_bytes=5 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """返回缓存的内容，未命中或已过期返回 None"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry.get("content")
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, content, model=""):
+        tmp = self._path(key) + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"model": model, "created_at": time.time(), "content": content}, f, ensure_ascii=False)
+            os.replace(tmp, self._path(key))
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self):
+        """删除过期条目，再按 LRU 淘汰到条数和大小上限以内"""
+        now = time.time()
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                st = entry.stat()
+                if now - st.st_mtime > self.ttl:
+                    os.remove(entry.path)
+                else:
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total -= size
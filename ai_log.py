@@ -0,0 +1,89 @@
+"""AI 接口调试日志：JSON Lines 格式，后台线程写盘，按大小轮转。
+
+调用方只把记录放进内存队列（QueueHandler），由 QueueListener 的后台线程写入
+RotatingFileHandler，界面线程不做任何文件 I/O。每行一条记录，字段：
+ts、request_id、phase、latency_ms、status、payload_bytes，以及可选的附加字段。"""
+import json
+import queue
+import threading
+import time
+import uuid
+
+MAX_BYTES = 512 * 1024
+BACKUP_COUNT = 3
+
+_config = None
+_logger = None
+_listener = None
+_start_lock = threading.Lock()
+
+
+def setup(log_file, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """登记日志文件。logging 模块和后台写日志线程在第一条记录时才加载、启动，
+    不占程序启动时间；重复调用无效果"""
+    global _config
+    if _config is None:
+        _config = (log_file, max_bytes, backup_count)
+
+
+def _start():
+    global _logger, _listener
+    import logging
+    import logging.handlers
+
+    class JsonLineFormatter(logging.Formatter):
+        def format(self, record):
+            entry = {"ts": round(record.created, 3)}
+            entry.update(record.fields)
+            return json.dumps(entry, ensure_ascii=False)
+
+    log_file, max_bytes, backup_count = _config
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonLineFormatter())
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("work_report.ai")
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _listener.start()
+    _logger = logger
+
+
+def shutdown():
+    """写完队列中剩余的记录并停止后台线程（退出程序前调用）"""
+    global _config, _logger, _listener
+    with _start_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            for handler in list(_logger.handlers):
+                _logger.removeHandler(handler)
+        _config = _logger = _listener = None
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def elapsed_ms(start):
+    """start 为 time.perf_counter() 的返回值"""
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def event(request_id, phase, latency_ms=None, status=None, payload_bytes=None, **extra):
+    """记录一条日志，未调用 setup 时直接丢弃"""
+    logger = _logger
+    if logger is None:
+        with _start_lock:
+            if _config is None:
+                return
+            if _logger is None:
+                _start()
+            logger = _logger
+    fields = {"request_id": request_id, "phase": phase, "latency_ms": latency_ms,
+              "status": status, "payload_bytes": payload_bytes}
+    fields.update(extra)
+    logger.info(phase, extra={"fields": fields})
@@ -0,0 +1,81 @@
+import json
+import time
+
+import http_client
+
+
+class StreamError(Exception):
+    """流式请求失败（HTTP 错误或服务端在流中返回 error）"""
+
+
+def iter_sse_data(lines):
+    """把 SSE 行解析为每个事件的 data 内容。
+
+    多行 data 按换行合并，空行表示事件结束，冒号开头的注释行（心跳）忽略。
+    lines 可以是 bytes 或 str（requests 的 iter_lines 返回 bytes）。"""
+    buf = []
+    for raw in lines:
+        line = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        line = line.rstrip("\r\n")
+        if not line:
+            if buf:
+                yield "\n".join(buf)
+                buf = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            buf.append(value)
+    if buf:
+        yield "\n".join(buf)
+
+
+def iter_content_deltas(lines):
+    """从 chat/completions 的 SSE 流中逐个取出增量文本，遇到 [DONE] 结束"""
+    for payload in iter_sse_data(lines):
+        if payload.strip() == "[DONE]":
+            return
+        try:
+            chunk = json.loads(payload)
+        except ValueError:
+            continue
+        if not isinstance(chunk, dict):
+            continue
+        if chunk.get("error"):
+            error = chunk["error"]
+            raise StreamError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+        for choice in chunk.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield content
+
+
+def stream_chat_completion(api_url, headers, data, read_timeout=60, cancel_event=None):
+    """以 "stream": true 调用 chat/completions，边接收边产出增量文本。
+
+    cancel_event 被置位后停止读取并关闭连接。"""
+    body = dict(data, stream=True)
+    with http_client.post(api_url, headers=headers, json=body, read_timeout=read_timeout, stream=True) as response:
+        if response.status_code != 200:
+            raise StreamError(f"API调用失败: HTTP {response.status_code}, 响应内容: {response.text[:200]}")
+        # iter_lines 默认攒满 512 字节才返回，会拖慢首字：分块传输时按到达的块读取，
+        # 否则逐字节读取（建议正文只有几 KB，开销可忽略）
+        chunked = response.headers.get("Transfer-Encoding", "").lower() == "chunked"
+        lines = response.iter_lines(chunk_size=None if chunked else 1)
+        body_start = time.perf_counter()
+        try:
+            for delta in iter_content_deltas(lines):
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                yield delta
+            # [DONE] 之后读完剩余的结束块，连接才能放回连接池复用
+            for _ in lines:
+                pass
+        finally:
+            body_ms = round((time.perf_counter() - body_start) * 1000, 1)
+            response.timings["body_ms"] = body_ms
+            response.timings["total_ms"] = round(response.timings["total_ms"] + body_ms, 1)
+            print(f"[HTTP] stream finished {http_client.format_timings(response.timings)}")
@@ -0,0 +1,50 @@
+import json
+import os
+
+
+def atomic_write_json(path, obj, indent=None):
+    """先写临时文件再 os.replace 覆盖，避免写到一半崩溃留下损坏的 JSON"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
+
+
+class WriteBehind:
+    """延迟合并写入：一连串保存请求只在静默 delay_ms 后真正执行一次。
+
+    依赖 Tk 的 after/after_cancel 调度，回调始终在主线程执行，无需加锁。
+    关闭窗口前调用 flush() 立即落盘未完成的写入。"""
+
+    def __init__(self, root, write_func, delay_ms=800):
+        self.root = root
+        self.write_func = write_func
+        self.delay_ms = delay_ms
+        self.requested = 0
+        self.performed = 0
+        self._after_id = None
+
+    @property
+    def pending(self):
+        return self._after_id is not None
+
+    def request(self):
+        """登记一次保存请求，重新开始计时"""
+        self.requested += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        self.performed += 1
+        self.write_func()
+
+    def flush(self):
+        """有待写入时立即执行"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._fire()
+
+    def counters(self):
+        return {"requested": self.requested, "performed": self.performed}
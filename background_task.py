@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+
+# 后台网络请求共用的线程池，第一次提交任务时才创建（concurrent.futures 会连带导入 logging，
+# 不放在启动路径上）；Tk 控件只能在主线程操作，结果经队列交回主线程
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bg-task")
+        return _executor
+
+# 主线程轮询间隔（约 60fps），保证进度条动画和窗口响应不卡顿
+POLL_INTERVAL_MS = 16
+
+
+class TaskCancelled(Exception):
+    """任务被用户取消"""
+
+
+class TaskDeadlineExceeded(Exception):
+    """任务超过总时限仍未完成"""
+
+
+class BackgroundTask:
+    """在线程池中执行 func(cancel_event)，通过 root.after 轮询把结果交回主线程。
+
+    - on_done(result) / on_error(exc) 只会在主线程调用其中之一，且只调用一次。
+    - cancel() 后不再回调 on_done，改为 on_error(TaskCancelled())；
+      func 可检查 cancel_event 提前结束（例如流式读取时逐块检查）。
+    - deadline 从 func 真正开始执行时计时（线程池被之前已放弃的请求占满时，排队时间不算），
+      超过仍未完成视为超时，回调 on_error(TaskDeadlineExceeded())。
+    - 排队期间已取消的任务不再执行 func。
+    - 工作线程可调用 report_progress(payload)，主线程按顺序回调 on_progress(payload)。"""
+
+    def __init__(self, root, func, on_done, on_error, deadline=None, on_progress=None):
+        self.root = root
+        self.func = func
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.deadline = deadline
+        self.cancel_event = threading.Event()
+        self._results = queue.Queue()
+        self._finished = False
+        self._started_at = None
+
+    def start(self):
+        _get_executor().submit(self._run)
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+        return self
+
+    def _run(self):
+        if self.cancel_event.is_set():
+            return
+        self._started_at = time.monotonic()
+        try:
+            self._results.put(("done", self.func(self.cancel_event)))
+        except Exception as exc:
+            self._results.put(("error", exc))
+
+    def report_progress(self, payload):
+        """工作线程调用，把中间结果（如流式文本）交给主线程"""
+        self._results.put(("progress", payload))
+
+    def cancel(self):
+        if not self._finished:
+            self.cancel_event.set()
+            self._finish(self.on_error, TaskCancelled())
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def _finish(self, callback, value):
+        self._finished = True
+        callback(value)
+
+    def _poll(self):
+        if self._finished:
+            return
+        # 一次取完队列中已到达的中间结果，最后才处理完成/失败
+        while True:
+            try:
+                kind, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(value)
+                if self._finished:
+                    return
+                continue
+            self._finish(self.on_done if kind == "done" else self.on_error, value)
+            return
+        started_at = self._started_at
+        if self.deadline and started_at is not None and time.monotonic() - started_at > self.deadline:
+            self.cancel_event.set()
+            self._finish(self.on_error, TaskDeadlineExceeded())
+            return
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+
+
+class FrameMonitor:
+    """主循环卡顿监测：每 interval_ms 调度一次空回调，记录相邻两次回调的实际间隔。
+
+    间隔超过 interval_ms + budget_ms（默认再多一帧）记为一次卡顿；stats() 返回
+    回调次数、最大间隔和卡顿次数，用来验证后台任务没有占住主线程。"""
+
+    def __init__(self, root, interval_ms=POLL_INTERVAL_MS, budget_ms=POLL_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.ticks = 0
+        self.stalls = 0
+        self.max_gap_ms = 0.0
+        self._last = None
+        self._after_id = None
+
+    def start(self):
+        self._last = time.perf_counter()
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        now = time.perf_counter()
+        gap = (now - self._last) * 1000
+        self._last = now
+        self.ticks += 1
+        self.max_gap_ms = max(self.max_gap_ms, gap)
+        if gap > self.interval_ms + self.budget_ms:
+            self.stalls += 1
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stats(self):
+        return {"ticks": self.ticks, "max_gap_ms": round(self.max_gap_ms, 1), "stalls": self.stalls}
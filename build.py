@@ -7,7 +7,7 @@ from version import get_version_string, increment_version, load_version, save_ve
 PROJECT_NAME = "WorkReportGenerator"
 MAIN_SCRIPT = "main.py"
 ICON_FILE = "wiz_logo.png"
-RESOURCES = ["wiz_logo.png", "version.json", "task_tracker.py", "wechat_integration.py", "version.py"]
+RESOURCES = ["wiz_logo.png", "version.json", "task_tracker.py", "wechat_integration.py", "version.py", "report_store.py", "report_stats.py", "autosave.py", "draft_store.py", "background_task.py", "ai_stream.py", "ai_cache.py", "http_client.py", "ai_log.py", "send_queue.py", "report_format.py"]
 
 
 def run_command(cmd, cwd=None):
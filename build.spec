@@ -4,7 +4,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('wiz_logo.png', '.'), ('version.json', '.'), ('task_tracker.py', '.'), ('wechat_integration.py', '.'), ('version.py', '.')],
+    datas=[('wiz_logo.png', '.'), ('version.json', '.'), ('task_tracker.py', '.'), ('wechat_integration.py', '.'), ('version.py', '.'), ('report_store.py', '.'), ('report_stats.py', '.'), ('autosave.py', '.'), ('draft_store.py', '.'), ('background_task.py', '.'), ('ai_stream.py', '.'), ('ai_cache.py', '.'), ('http_client.py', '.'), ('ai_log.py', '.'), ('send_queue.py', '.'), ('report_format.py', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,138 @@
+import json
+import os
+import re
+from datetime import datetime
+
+from autosave import atomic_write_json
+
+INDEX_FILE = "index.json"
+_MONTH_FILE = re.compile(r"^(\d{4}-\d{2})\.json$")
+_MONTH = re.compile(r"^\d{4}-\d{2}")
+
+
+def draft_key(user, dept, date):
+    return f"{user}__{dept}__{date}"
+
+
+def month_of(date):
+    """草稿所属分区（YYYY-MM），日期格式不规范的归入 other 分区"""
+    m = _MONTH.match(date or "")
+    return m.group(0) if m else "other"
+
+
+class DraftStore:
+    """按月分区的草稿缓存。
+
+    drafts/index.json 只保存 _last_user/_last_dept/_last_date 和旧版 tomorrow 表，
+    每月草稿各存一个 drafts/YYYY-MM.json，按需加载。启动时只读索引和今天/昨天所在
+    的分区，超过保留期的分区在 compact() 时整文件删除，启动开销不随历史增长。"""
+
+    def __init__(self, drafts_dir, retention_months=3):
+        self.drafts_dir = drafts_dir
+        self.retention_months = retention_months
+        os.makedirs(drafts_dir, exist_ok=True)
+        self._index = None
+        self._partitions = {}
+        self._dirty = set()
+        self._index_dirty = False
+
+    # ---- 索引 ----
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self._read(os.path.join(self.drafts_dir, INDEX_FILE))
+            self._index.setdefault("tomorrow", {})
+        return self._index
+
+    def set_last(self, user, dept, date):
+        idx = self.index
+        if (idx.get("_last_user"), idx.get("_last_dept"), idx.get("_last_date")) != (user, dept, date):
+            idx.update({"_last_user": user, "_last_dept": dept, "_last_date": date})
+            self._index_dirty = True
+
+    def get_tomorrow(self, userkey):
+        return self.index["tomorrow"].get(userkey, "")
+
+    def set_tomorrow(self, userkey, plan):
+        self.index["tomorrow"][userkey] = plan
+        self._index_dirty = True
+
+    # ---- 分区 ----
+    def _read(self, path):
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except Exception:
+                pass
+        return {}
+
+    def _partition(self, month):
+        if month not in self._partitions:
+            self._partitions[month] = self._read(os.path.join(self.drafts_dir, f"{month}.json"))
+        return self._partitions[month]
+
+    def get_draft(self, user, dept, date):
+        return self._partition(month_of(date)).get(draft_key(user, dept, date))
+
+    def put_draft(self, user, dept, date, draft):
+        month = month_of(date)
+        self._partition(month)[draft_key(user, dept, date)] = draft
+        self._dirty.add(month)
+
+    def flush(self):
+        """把有改动的分区和索引原子写回磁盘"""
+        for month in sorted(self._dirty):
+            atomic_write_json(os.path.join(self.drafts_dir, f"{month}.json"),
+                              self._partitions[month], indent=2)
+        self._dirty.clear()
+        if self._index_dirty:
+            atomic_write_json(os.path.join(self.drafts_dir, INDEX_FILE), self.index, indent=2)
+            self._index_dirty = False
+
+    # ---- 保留期与迁移 ----
+    def compact(self, today=None):
+        """删除超过保留期（retention_months 个整月之前）的分区，返回删除的分区名"""
+        today = today or datetime.now()
+        year, month = today.year, today.month - self.retention_months
+        while month <= 0:
+            year, month = year - 1, month + 12
+        cutoff = f"{year:04d}-{month:02d}"
+        removed = []
+        for name in os.listdir(self.drafts_dir):
+            m = _MONTH_FILE.match(name)
+            if m and m.group(1) < cutoff:
+                os.remove(os.path.join(self.drafts_dir, name))
+                self._partitions.pop(m.group(1), None)
+                self._dirty.discard(m.group(1))
+                removed.append(m.group(1))
+        return removed
+
+    def migrate_legacy(self, legacy_file):
+        """把旧版单文件 report_config.json 拆分到索引和月分区，完成后改名为 .migrated 备份"""
+        if not os.path.exists(legacy_file):
+            return 0
+        allcache = self._read(legacy_file)
+        for key in ("_last_user", "_last_dept", "_last_date"):
+            if key in allcache and key not in self.index:
+                self.index[key] = allcache[key]
+                self._index_dirty = True
+        for userkey, plan in (allcache.get("tomorrow") or {}).items():
+            self.index["tomorrow"].setdefault(userkey, plan)
+            self._index_dirty = True
+        moved = 0
+        for key, draft in allcache.items():
+            if key.startswith("_") or key == "tomorrow" or not isinstance(draft, dict):
+                continue
+            parts = key.split("__")
+            if len(parts) != 3:
+                continue
+            month = month_of(parts[2])
+            self._partition(month).setdefault(key, draft)
+            self._dirty.add(month)
+            moved += 1
+        self.flush()
+        os.replace(legacy_file, legacy_file + ".migrated")
+        return moved
@@ -0,0 +1,132 @@
+"""所有 AI 接口调用共用的 HTTP 客户端。
+
+进程内只有一个 keep-alive 的 requests.Session，连接池复用到同一 API 主机的 TCP/TLS
+连接；GET 对 429/5xx 按指数退避自动重试，生成用的 POST 不会被重发（见 _Retry）；
+超时拆分为连接超时和读取超时。每次调用记录耗时拆分：建连（复用连接时为 0）、
+首字节（TTFB）和读取响应体。"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+
+class _Retry(Retry):
+    """GET（拉模型列表）遇到 429/5xx 退避重试；POST 每发一次就是一次计费的生成，
+    只在 429 且带 Retry-After 时重试。
+
+    POST 不在 allowed_methods 里，读超时和响应中途断开都直接抛出，不会重发；
+    连接没建起来（请求还没发出去）对所有方法都会重试。"""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == "POST":
+            return bool(self.total and status_code == 429 and has_retry_after)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+RETRY = _Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# 当前线程最近一次请求中新建连接的耗时（秒），复用连接时保持为 0
+_timing = threading.local()
+
+
+def _timed_connect(connect):
+    def wrapper(self):
+        start = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            _timing.connect = getattr(_timing, "connect", 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """返回进程内共享的 Session（首次调用时创建）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = _TimedAdapter(pool_connections=4, pool_maxsize=8, max_retries=RETRY)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def request(method, url, read_timeout=DEFAULT_READ_TIMEOUT, stream=False, **kwargs):
+    """发送请求并在 response.timings 上记录耗时拆分（毫秒）。
+
+    stream=True 时响应体尚未读取，body_ms 为 None。"""
+    _timing.connect = 0.0
+    start = time.perf_counter()
+    response = get_session().request(
+        method, url, timeout=(CONNECT_TIMEOUT, read_timeout), stream=stream, **kwargs)
+    total = time.perf_counter() - start
+    connect = _timing.connect
+    headers_at = response.elapsed.total_seconds()
+    response.timings = {
+        "connect_ms": round(connect * 1000, 1),
+        "ttfb_ms": round(max(headers_at - connect, 0.0) * 1000, 1),
+        "body_ms": None if stream else round(max(total - headers_at, 0.0) * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+    }
+    print(f"[HTTP] {method} {url} -> {response.status_code} {format_timings(response.timings)}")
+    return response
+
+
+def get(url, read_timeout=DEFAULT_READ_TIMEOUT, **kwargs):
+    return request("GET", url, read_timeout=read_timeout, **kwargs)
+
+
+def post(url, read_timeout=DEFAULT_READ_TIMEOUT, **kwargs):
+    return request("POST", url, read_timeout=read_timeout, **kwargs)
+
+
+def format_timings(timings):
+    parts = [f"connect={timings['connect_ms']}ms", f"ttfb={timings['ttfb_ms']}ms"]
+    if timings.get("body_ms") is not None:
+        parts.append(f"body={timings['body_ms']}ms")
+    parts.append(f"total={timings['total_ms']}ms")
+    return " ".join(parts)
@@ -1,17 +1,43 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
-import os, json, re
+import os, json, re, time
 from datetime import datetime, timedelta
 from version import get_version_info
 from task_tracker import generate_today_work, parse_task_input, add_task
-from wechat_integration import send_to_wechat
-import requests
+from report_store import open_report_store
+from report_stats import ReportStats
+from report_format import format_report
+from autosave import WriteBehind
+from draft_store import DraftStore
+from background_task import BackgroundTask, FrameMonitor, TaskCancelled, TaskDeadlineExceeded
+from send_queue import SendQueue, clipboard_runner, wework_runner
+from ai_cache import ResponseCache, cache_key
+import ai_log
+# http_client（requests/urllib3）和 ai_stream 在第一次调用 AI 接口时才导入，
+# 企微和剪贴板相关模块由 send_queue 在发送时导入，都不拖慢窗口出现
 
 ROOT_DIR = "工作汇报记录"
-CFG_FILE = os.path.join(ROOT_DIR, "report_config.json")
+CFG_FILE = os.path.join(ROOT_DIR, "report_config.json")  # 旧版单文件草稿，启动时迁移到 DRAFTS_DIR
+DRAFTS_DIR = os.path.join(ROOT_DIR, "drafts")
+# 草稿按月分区，只保留最近几个月，启动时清理更早的分区
+DRAFT_RETENTION_MONTHS = 3
 HISTORY_DIR = os.path.join(ROOT_DIR, "report_history")
 TEMPLATE_FILE = os.path.join(ROOT_DIR, "report_template.json")
 AI_CONFIG_FILE = os.path.join(ROOT_DIR, "ai_config.json")
+AI_CACHE_DIR = os.path.join(ROOT_DIR, "ai_cache")
+AI_DEBUG_LOG = os.path.join(ROOT_DIR, "ai_debug.log")  # JSON Lines，超过 512KB 轮转，保留 3 份
+HISTORY_DB_FILE = os.path.join(ROOT_DIR, "report_history.db")
+STATS_CACHE_FILE = os.path.join(ROOT_DIR, "report_stats.json")
+SEND_JOBS_FILE = os.path.join(ROOT_DIR, "send_jobs.jsonl")  # 发送任务状态日志，崩溃后可查看
+# 设置后“发送到企微”直接用 send_to_wework 助手自动发到该群，否则只复制内容并打开企微
+WECOM_AUTO_SEND_GROUP = os.environ.get("WORK_REPORT_WECOM_GROUP", "").strip()
+# 设为 1 时监测主循环卡顿，退出时打印最大帧间隔和卡顿次数
+FRAME_MONITOR = os.environ.get("WORK_REPORT_FRAME_MONITOR", "") == "1"
+# 启动耗时探针：设为文件路径时，窗口第一次显示后把当前时间戳写入该文件并退出（scripts/bench_startup.py 用）
+STARTUP_PROBE = os.environ.get("WORK_REPORT_STARTUP_PROBE", "")
+# 历史存储后端：sqlite（默认，首次启动自动迁移旧 JSON）或 json（旧版每份一个文件），
+# 可通过环境变量切换，便于两者对比测试
+HISTORY_BACKEND = os.environ.get("WORK_REPORT_HISTORY_BACKEND", "sqlite")
 SUGGESTIONS = [
     "建议使用简洁的短句，条理清晰；",
     "适当量化工作成效，例如'完成XX模块开发50%'；",
@@ -30,9 +56,18 @@ DEFAULT_AI_CONFIG = {
         "gpt-3.5-turbo",
         "gpt-4o",
         "gpt-4o-mini"
-    ]
+    ],
+    # AI建议请求的总时限（秒）
+    "request_deadline": 90,
+    # 流式输出：边生成边显示（需接口支持 "stream": true）
+    "stream": False
 }
 
+# AI建议的采样温度（同时参与响应缓存键计算）
+AI_TEMPERATURE = 0.7
+# AI建议的系统提示词
+AI_SYSTEM_PROMPT = "你是一个专业的工作汇报优化助手，擅长将工作内容转化为专业、简洁、有条理的汇报文本。你必须严格按照用户要求的格式输出，今日工作使用实际进度，明日计划使用预期进度。\n\n重要规则：\n1. 休息优先原则：如果用户在明日计划中写了'休息'，或者系统检测到明天是休息日，你必须严格按照以下要求处理：\n   a. 明日计划中只能保留'休息'两个字，绝对不能生成任何其他工作计划\n   b. 即使有未完成的工作，也不要将其添加到明日计划中\n   c. 未完成的工作应该保留在今日工作中，等待用户下次工作日再继续\n2. 对于100%完成的工作，不需要写'明天无'，因为工作已经结束\n3. 只有在需要明天继续做的情况下才写具体的明天准备做的内容\n4. 进度计算规则：明日计划的预期进度应该是在今天进度的基础上继续推进，而不是倒退\n   例如：今天完成60%，明天应该计划完成剩余的40%，而不是又从40%开始\n5. 空项处理：如果明日计划确实没有内容，不要写'无'，直接留空即可\n6. 智能识别：要智能识别用户的真实意图，不要机械地替换内容\n\n示例：\n如果用户写：\n2、明日工作计划\n休息\n\n你应该生成：\n2、明日工作计划\n休息\n\n绝对不能生成：\n2、明日工作计划\n休息\n工作内容（...）"
+
 def load_ai_config():
     """加载AI配置"""
     if os.path.exists(AI_CONFIG_FILE):
@@ -67,7 +102,7 @@ def show_ai_config_dialog(first_time=False):
     
     win = tk.Toplevel(root)
     win.title("AI接口配置" if not first_time else "欢迎使用 - 请配置AI接口")
-    win.geometry("550x450")
+    win.geometry("550x480")
     win.transient(root)
     win.grab_set()
     
@@ -131,6 +166,11 @@ def show_ai_config_dialog(first_time=False):
     # 提示用户可以输入自定义模型
     tk.Label(form_frame, text="(可手动输入或从API获取)", font=("微软雅黑", 8), fg="gray").grid(row=3, column=1, sticky="w")
     
+    # 流式输出开关
+    stream_var = tk.BooleanVar(value=bool(config.get("stream", DEFAULT_AI_CONFIG["stream"])))
+    tk.Checkbutton(form_frame, text="流式输出（边生成边显示）", variable=stream_var,
+                   font=("微软雅黑", 9)).grid(row=4, column=1, sticky="w")
+    
     # 获取模型列表按钮
     def fetch_models():
         """从API获取可用模型列表"""
@@ -150,8 +190,7 @@ def show_ai_config_dialog(first_time=False):
         tk.Label(fetch_win, text="正在获取可用模型列表...", font=("微软雅黑", 11)).pack(pady=20)
         fetch_win.update()
         
-        # 定义调试文件路径
-        debug_file = os.path.join(ROOT_DIR, "ai_debug.log")
+        request_id = ai_log.new_request_id()
         
         try:
             # 对于GET请求，只需要Authorization头部
@@ -167,25 +206,22 @@ def show_ai_config_dialog(first_time=False):
             print(f"请求模型列表URL: {models_url}")
             print(f"请求头部: {headers}")
             
-            with open(debug_file, "a", encoding="utf-8") as f:
-                f.write(f"\n{'='*50}\n")
-                f.write(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"开始获取模型列表...\n")
-                f.write(f"请求模型列表URL: {models_url}\n")
+            ai_log.event(request_id, "models_request", url=models_url)
             
-            response = requests.get(
+            import http_client
+            response = http_client.get(
                 models_url,
                 headers=headers,
-                timeout=10
+                read_timeout=10
             )
             
             # 记录响应信息
             print(f"模型列表响应状态码: {response.status_code}")
             print(f"模型列表响应内容: {response.text[:300]}")
             
-            with open(debug_file, "a", encoding="utf-8") as f:
-                f.write(f"模型列表响应状态码: {response.status_code}\n")
-                f.write(f"模型列表响应内容: {response.text[:300]}\n")
+            ai_log.event(request_id, "models_response", latency_ms=response.timings["total_ms"],
+                         status=response.status_code, payload_bytes=len(response.content),
+                         timings=response.timings)
             
             fetch_win.destroy()
             
@@ -232,6 +268,7 @@ def show_ai_config_dialog(first_time=False):
                         error_msg = f"解析错误：{str(e)}"
                 messagebox.showerror("失败", f"获取模型列表失败：\n{error_msg}\n\n您可以手动输入模型名称。")
         except Exception as e:
+            ai_log.event(request_id, "models_error", error=str(e))
             fetch_win.destroy()
             messagebox.showerror("失败", f"获取模型列表失败：\n{str(e)}\n\n您可以手动输入模型名称。")
     
@@ -251,7 +288,9 @@ def show_ai_config_dialog(first_time=False):
             "api_key": api_key_var.get().strip(),
             "api_url": api_url_var.get().strip(),
             "model": model_var.get(),
-            "available_models": current_models
+            "available_models": current_models,
+            "request_deadline": config.get("request_deadline", DEFAULT_AI_CONFIG["request_deadline"]),
+            "stream": stream_var.get()
         }
         
         if not new_config["api_key"]:
@@ -304,11 +343,12 @@ def show_ai_config_dialog(first_time=False):
                 "max_tokens": 10
             }
             
-            response = requests.post(
+            import http_client
+            response = http_client.post(
                 test_config["api_url"],
                 headers=headers,
                 json=data,
-                timeout=10
+                read_timeout=10
             )
             
             test_win.destroy()
@@ -331,6 +371,13 @@ if not os.path.exists(ROOT_DIR):
     os.makedirs(ROOT_DIR)
 if not os.path.exists(HISTORY_DIR):
     os.makedirs(HISTORY_DIR)
+report_store = open_report_store(HISTORY_BACKEND, HISTORY_DIR, HISTORY_DB_FILE)
+report_stats = ReportStats(STATS_CACHE_FILE, report_store)
+ai_cache = ResponseCache(AI_CACHE_DIR)
+ai_log.setup(AI_DEBUG_LOG)
+draft_store = DraftStore(DRAFTS_DIR, retention_months=DRAFT_RETENTION_MONTHS)
+draft_store.migrate_legacy(CFG_FILE)
+draft_store.compact()
 
 def logical_today():
     now = datetime.now()
@@ -340,61 +387,12 @@ def logical_today():
         base = now
     return base.strftime("%Y-%m-%d")
 
-def excel_letters(n):
-    res = ""
-    while True:
-        n, r = divmod(n, 26)
-        res = chr(97 + r) + res
-        if n == 0:
-            break
-        n -= 1
-    return res + "."
-
-def proper_bullet(line, idx):
-    line = line.strip()
-    patterns = [
-        r"^[a-zA-Z]{1,2}\.\s?.*",
-        r"^\d+\.\s?.*",
-        r"^①|②|③|④|⑤|⑥|⑦|⑧|⑨|⑩",
-    ]
-    for pat in patterns:
-        if re.match(pat, line):
-            return line
-    if idx < 10:
-        return f"{excel_letters(idx)} {line}"
-    elif idx < 36:
-        return f"{idx+1}. {line}"
-    else:
-        circled = ["①","②","③","④","⑤","⑥","⑦","⑧","⑨","⑩"]
-        return f"{circled[(idx%10)]} {line}"
-
-def format_with_bullets(text):
-    lines = text.strip().split("\n")
-    return "\n".join([proper_bullet(line, i) for i, line in enumerate(lines) if line.strip()])
-
 def save_user_tomorrow(userkey, tomorrow_plan):
-    allcfg = {}
-    if os.path.exists(CFG_FILE):
-        with open(CFG_FILE, "r", encoding="utf-8") as f:
-            try:
-                allcfg = json.load(f)
-            except:
-                allcfg = {}
-    if "tomorrow" not in allcfg:
-        allcfg["tomorrow"] = {}
-    allcfg["tomorrow"][userkey] = tomorrow_plan
-    with open(CFG_FILE, "w", encoding="utf-8") as f:
-        json.dump(allcfg, f, ensure_ascii=False, indent=2)
+    # 只改内存中的索引，随下一次自动保存一起落盘
+    draft_store.set_tomorrow(userkey, tomorrow_plan)
 
 def load_last_tomorrow(userkey):
-    if os.path.exists(CFG_FILE):
-        with open(CFG_FILE, "r", encoding="utf-8") as f:
-            try:
-                cfg = json.load(f)
-            except:
-                return ""
-            return cfg.get("tomorrow", {}).get(userkey, "")
-    return ""
+    return draft_store.get_tomorrow(userkey)
 
 def load_template():
     if os.path.exists(TEMPLATE_FILE):
@@ -413,38 +411,25 @@ def get_report_token(user, dept, date):
     return f"{user}_{dept}_{date}"
 
 def save_report_history(token, report_data):
-    path = os.path.join(HISTORY_DIR, f"{token}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(report_data, f, ensure_ascii=False, indent=2)
+    # 写入历史的同时增量更新统计缓存
+    report_stats.save(token, report_data)
 
 def load_history_list():
-    return sorted([
-        f.replace(".json","") for f in os.listdir(HISTORY_DIR)
-        if f.endswith(".json")
-    ], reverse=True)
+    return report_store.list_tokens()
 
 def load_history_detail(token):
-    path = os.path.join(HISTORY_DIR, f"{token}.json")
-    if not os.path.exists(path): return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return report_store.get(token)
 
 def analyze_report_stat():
-    history = [load_history_detail(t) for t in load_history_list()]
-    total = len(history)
-    items_total = 0
-    user_counter = {}
-    for r in history:
-        if r is None: continue
-        user = r.get("user","")
-        user_counter[user] = user_counter.get(user,0) + 1
-        for k in ["today_work","tomorrow_plan","problems"]:
-            items = r.get(k,"").split("\n")
-            items_total += len([i for i in items if i.strip()])
+    stats = report_stats.current()
+    field_titles = {item["key"]: item["title"] for item in load_template()}
+    recent_days = sorted(stats["days"].items(), reverse=True)[:5]
     lines = [
-        f"历史总汇报份数：{total} ; 事项总条数：{items_total}",
+        f"历史总汇报份数：{stats['total']} ; 事项总条数：{stats['items_total']}",
+        "各栏目事项数：" + "；".join(f"{field_titles.get(k, k)} {c}" for k, c in stats["fields"].items()),
+        "最近汇报日：" + "；".join(f"{d} {c}份" for d, c in recent_days),
         "各用户提交量：",
-    ] + [f"\t{u}: {c}" for u,c in user_counter.items()]
+    ] + [f"\t{u}: {c}" for u,c in stats["users"].items()]
     return "\n".join(lines)
 
 def make_suggestion(content):
@@ -458,62 +443,36 @@ def make_suggestion(content):
     return "\n".join(advice)
 
 # ========= 新的保存/恢复逻辑 =========
-def get_cfg_today_key():
-    return f"{user_var.get()}__{dept_var.get()}__{logical_today()}"
-
 def save_all_inputs():
-    # 姓名、部门全局；内容按业务日区分存储
-    if not user_var.get() or not dept_var.get():
-        return
-    allcache = {}
-    if os.path.exists(CFG_FILE):
-        try:
-            with open(CFG_FILE, 'r', encoding='utf-8') as f:
-                allcache = json.load(f)
-        except: pass
-    today_key = get_cfg_today_key()
-    allcache[today_key] = {
-        "user": user_var.get(),
-        "dept": dept_var.get(),
-        "date": logical_today(),
-        "fields": {k: input_widgets[k].get("1.0", tk.END) for k in input_widgets}
-    }
-    # 姓名、部门、日期全局存储一份，跨业务日也能带出
-    allcache["_last_user"] = user_var.get()
-    allcache["_last_dept"] = dept_var.get()
-    allcache["_last_date"] = date_var.get()
-    # tommorrow历史兼容
-    if "tomorrow" not in allcache:
-        oldtomorrow = {}
-        if os.path.exists(CFG_FILE):
-            try:
-                with open(CFG_FILE, 'r', encoding='utf-8') as fr:
-                    oldall = json.load(fr)
-                    if "tomorrow" in oldall:
-                        oldtomorrow = oldall["tomorrow"]
-            except: pass
-        allcache["tomorrow"] = oldtomorrow
-    with open(CFG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(allcache, f, ensure_ascii=False, indent=2)
+    # 输入过程中会被频繁触发，交给延迟合并写入，静默一段时间后只落盘一次
+    autosaver.request()
+
+def write_all_inputs():
+    # 姓名、部门全局；内容按业务日区分存储（只写当月分区和索引）
+    if user_var.get() and dept_var.get():
+        draft_store.put_draft(user_var.get(), dept_var.get(), logical_today(), {
+            "user": user_var.get(),
+            "dept": dept_var.get(),
+            "date": logical_today(),
+            "fields": {k: input_widgets[k].get("1.0", tk.END) for k in input_widgets}
+        })
+        # 姓名、部门、日期全局存储一份，跨业务日也能带出
+        draft_store.set_last(user_var.get(), dept_var.get(), date_var.get())
+    draft_store.flush()
 
 def load_all_inputs():
-    if not os.path.exists(CFG_FILE): return
-    with open(CFG_FILE, 'r', encoding='utf-8') as f:
-        try:
-            allcache = json.load(f)
-        except:
-            return
-    last_user = allcache.get("_last_user", "")
-    last_dept = allcache.get("_last_dept", "")
-    last_date = allcache.get("_last_date", logical_today())
+    index = draft_store.index
+    if not any(k.startswith("_last_") for k in index): return
+    last_user = index.get("_last_user", "")
+    last_dept = index.get("_last_dept", "")
+    last_date = index.get("_last_date", logical_today())
     if not user_var.get() and last_user:
         user_var.set(last_user)
     if not dept_var.get() and last_dept:
         dept_var.set(last_dept)
     if not date_var.get() and last_date:
         date_var.set(last_date)
-    today_key = get_cfg_today_key()
-    thisdata = allcache.get(today_key)
+    thisdata = draft_store.get_draft(user_var.get(), dept_var.get(), logical_today())
     if thisdata:
         user_var.set(thisdata.get("user", last_user))
         dept_var.set(thisdata.get("dept", last_dept))
@@ -536,8 +495,7 @@ def load_all_inputs():
         else:
             # 2. 如果任务跟踪系统没有数据，使用旧的方式
             yesterday = (datetime.now() - timedelta(days=1) if datetime.now().hour >= 4 else datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d')
-            prev_key = f"{user_var.get()}__{dept_var.get()}__{yesterday}"
-            prev = allcache.get(prev_key)
+            prev = draft_store.get_draft(user_var.get(), dept_var.get(), yesterday)
             if prev:
                 # 把昨天的“明日计划”放到今天“今日完成情况”
                 y_tomorrow = prev["fields"].get("tomorrow_plan", "")
@@ -658,6 +616,9 @@ def task_tab_input(event):
     # 阻止默认Tab行为
     return "break"
 
+# 自动保存：合并连续输入产生的保存请求，静默 800ms 后原子写入一次
+autosaver = WriteBehind(root, write_all_inputs, delay_ms=800)
+
 user_var.trace_add("write", lambda *a: save_all_inputs())
 dept_var.trace_add("write", lambda *a: save_all_inputs())
 date_var.trace_add("write", lambda *a: save_all_inputs())
@@ -702,7 +663,7 @@ def show_stats():
     # 创建自动关闭的消息框
     msg_window = tk.Toplevel(root)
     msg_window.title("统计分析")
-    msg_window.geometry("400x200")
+    msg_window.geometry("480x260")
     msg_window.transient(root)
     msg_window.grab_set()
     
@@ -726,7 +687,8 @@ def show_history_list():
     txt.pack(side="left", fill="both", expand=True, padx=8, pady=10)
 
     history_keys = load_history_list()
-    for k in history_keys: lbox.insert(tk.END, k)
+    # 一次性批量插入，大量历史时比逐条 insert 快得多
+    if history_keys: lbox.insert(tk.END, *history_keys)
     txt.config(state="disabled")
 
     def onselect(e):
@@ -813,8 +775,12 @@ def open_template_editor():
             msg_window.after(5000, msg_window.destroy)
     ttk.Button(win, text="保存并关闭", command=_save).pack(pady=5)
 
-def ai_suggest():
-    """使用DeepSeek API进行AI建议"""
+def ai_suggest(bypass_cache=False):
+    """使用DeepSeek API进行AI建议
+    
+    Args:
+        bypass_cache: 跳过响应缓存强制请求（"重新生成"时使用）
+    """
     print("=== 开始AI建议功能 ===")
     # 获取当前填写的内容
     today_work = input_widgets.get("today_work", None)
@@ -990,10 +956,55 @@ c. ...
     
     print(f"生成的提示词: {prompt[:300]}...")
     
+    # 调试日志中同一次建议请求的各阶段记录共用一个 request_id
+    request_id = ai_log.new_request_id()
+    
+    # 使用用户配置的API
+    api_key = ai_config["api_key"]
+    api_url = ai_config.get("api_url", DEFAULT_AI_CONFIG["api_url"])
+    model = ai_config.get("model", DEFAULT_AI_CONFIG["model"])
+    # 整个请求的总时限（秒），超时后放弃等待并回退到本地建议
+    deadline = ai_config.get("request_deadline", DEFAULT_AI_CONFIG["request_deadline"])
+    stream_mode = bool(ai_config.get("stream", DEFAULT_AI_CONFIG["stream"]))
+    
+    print(f"调用API: {api_url}")
+    print(f"使用模型: {model}")
+    
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    data = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": AI_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": AI_TEMPERATURE,
+        "max_tokens": 2000
+    }
+    # 相同模型/提示词/温度的请求直接复用缓存结果，不再调用付费接口
+    key = cache_key(model, AI_SYSTEM_PROMPT, prompt, AI_TEMPERATURE)
+    cached_content = None if bypass_cache else ai_cache.get(key)
+    
+    ai_log.event(request_id, "request", payload_bytes=len(json.dumps(data, ensure_ascii=False).encode("utf-8")),
+                 url=api_url, model=model, stream=stream_mode, force_rest=force_rest,
+                 cache_hit=cached_content is not None, bypass_cache=bypass_cache)
+    
+    def regenerate():
+        # 重新调用ai_suggest函数，跳过缓存
+        ai_suggest(bypass_cache=True)
+    
+    if cached_content is not None:
+        print("AI建议缓存命中，直接显示")
+        show_ai_suggestion_window(cached_content, today_work, tomorrow_plan,
+                                  regenerate_callback=regenerate, from_cache=True)
+        return
+    
     # 创建带进度条的等待窗口
     wait_window = tk.Toplevel(root)
     wait_window.title("AI建议生成中")
-    wait_window.geometry("400x150")
+    wait_window.geometry("400x190")
     wait_window.transient(root)
     wait_window.grab_set()
     
@@ -1008,107 +1019,116 @@ c. ...
     status_label = tk.Label(wait_window, text="正在连接AI服务...", font=("微软雅黑", 10), fg="gray")
     status_label.pack(pady=5)
     
-    root.update()
-    
-    # 调试信息文件路径
-    debug_file = os.path.join(ROOT_DIR, "ai_debug.log")
+    started = time.perf_counter()
     
-    try:
-        # 记录调试信息
-        with open(debug_file, "a", encoding="utf-8") as f:
-            f.write(f"\n{'='*50}\n")
-            f.write(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"开始调用AI API...\n")
-            f.write(f"是否强制休息: {force_rest}\n")
-        
-        # 使用用户配置的API
-        api_key = ai_config["api_key"]
-        api_url = ai_config.get("api_url", DEFAULT_AI_CONFIG["api_url"])
-        model = ai_config.get("model", DEFAULT_AI_CONFIG["model"])
-        
-        print(f"调用API: {api_url}")
-        print(f"使用模型: {model}")
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": "你是一个专业的工作汇报优化助手，擅长将工作内容转化为专业、简洁、有条理的汇报文本。你必须严格按照用户要求的格式输出，今日工作使用实际进度，明日计划使用预期进度。\n\n重要规则：\n1. 休息优先原则：如果用户在明日计划中写了'休息'，或者系统检测到明天是休息日，你必须严格按照以下要求处理：\n   a. 明日计划中只能保留'休息'两个字，绝对不能生成任何其他工作计划\n   b. 即使有未完成的工作，也不要将其添加到明日计划中\n   c. 未完成的工作应该保留在今日工作中，等待用户下次工作日再继续\n2. 对于100%完成的工作，不需要写'明天无'，因为工作已经结束\n3. 只有在需要明天继续做的情况下才写具体的明天准备做的内容\n4. 进度计算规则：明日计划的预期进度应该是在今天进度的基础上继续推进，而不是倒退\n   例如：今天完成60%，明天应该计划完成剩余的40%，而不是又从40%开始\n5. 空项处理：如果明日计划确实没有内容，不要写'无'，直接留空即可\n6. 智能识别：要智能识别用户的真实意图，不要机械地替换内容\n\n示例：\n如果用户写：\n2、明日工作计划\n休息\n\n你应该生成：\n2、明日工作计划\n休息\n\n绝对不能生成：\n2、明日工作计划\n休息\n工作内容（...）"},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.7,
-            "max_tokens": 2000
-        }
-        
-        with open(debug_file, "a", encoding="utf-8") as f:
-            f.write(f"请求URL: {api_url}\n")
-            f.write(f"请求模型: {model}\n")
-            f.write(f"请求数据: {str(data)[:500]}...\n")
-        
-        status_label.config(text="正在生成内容...")
-        root.update()
-        
+    def request_ai(cancel_event):
+        # 在后台线程执行，只做网络请求，不操作任何 Tk 控件
         print("开始发送API请求...")
-        response = requests.post(
+        import http_client
+        return http_client.post(
             api_url,
             headers=headers,
             json=data,
-            timeout=60
+            read_timeout=60
         )
-        
-        print(f"API响应状态码: {response.status_code}")
-        
-        with open(debug_file, "a", encoding="utf-8") as f:
-            f.write(f"响应状态码: {response.status_code}\n")
-            f.write(f"响应内容: {response.text[:500]}...\n")
-        
+    
+    def on_failure(error_msg):
+        print(error_msg)
+        ai_log.event(request_id, "error", latency_ms=ai_log.elapsed_ms(started), error=error_msg)
+        # API调用失败，使用本地建议
+        fallback_suggestion(error_msg)
+    
+    def on_response(response):
         wait_window.destroy()
-        
-        if response.status_code == 200: # 成功响应
-            result = response.json()
-            ai_content = result["choices"][0]["message"]["content"]
-            
-            print(f"AI生成内容: {ai_content[:300]}...")
-            
-            with open(debug_file, "a", encoding="utf-8") as f:
-                f.write(f"API调用成功！\n")
-                f.write(f"AI回复内容:\n{ai_content[:500]}...\n")
+        try:
+            print(f"API响应状态码: {response.status_code}")
             
-            # 显示AI建议窗口，传入重新生成回调
-            def regenerate():
-                # 重新调用ai_suggest函数
-                ai_suggest()
+            ai_log.event(request_id, "response", latency_ms=ai_log.elapsed_ms(started),
+                         status=response.status_code, payload_bytes=len(response.content),
+                         timings=response.timings)
             
-            show_ai_suggestion_window(ai_content, today_work, tomorrow_plan, regenerate_callback=regenerate)
+            if response.status_code == 200: # 成功响应
+                result = response.json()
+                ai_content = result["choices"][0]["message"]["content"]
+                
+                print(f"AI生成内容: {ai_content[:300]}...")
+                ai_cache.put(key, ai_content, model)
+                
+                # 显示AI建议窗口，传入重新生成回调
+                show_ai_suggestion_window(ai_content, today_work, tomorrow_plan, regenerate_callback=regenerate)
+            else:
+                error_msg = f"API调用失败: HTTP {response.status_code}"
+                try:
+                    error_detail = response.json()
+                    error_msg += f", 详情: {error_detail}"
+                except:
+                    error_msg += f", 响应内容: {response.text[:200]}"
+                on_failure(error_msg)
+        except Exception as e:
+            on_failure(f"API调用异常: {str(e)}")
+    
+    # ---- 流式模式：收到第一段文本即打开建议窗口，之后逐段追加 ----
+    stream_window = {}
+    
+    def request_ai_stream(cancel_event):
+        # 在后台线程执行，每收到一段增量文本就交给主线程追加显示
+        print("开始发送流式API请求...")
+        from ai_stream import stream_chat_completion
+        chunks = []
+        for delta in stream_chat_completion(api_url, headers, data, read_timeout=60, cancel_event=cancel_event):
+            chunks.append(delta)
+            task.report_progress(delta)
+        return "".join(chunks)
+    
+    def on_delta(delta):
+        if not stream_window:
+            ai_log.event(request_id, "first_token", latency_ms=ai_log.elapsed_ms(started))
+            wait_window.destroy()
+            append_text, finish = show_ai_suggestion_window(
+                "", today_work, tomorrow_plan, regenerate_callback=regenerate,
+                streaming=True, on_close=task.cancel)
+            stream_window.update(append=append_text, finish=finish)
+        stream_window["append"](delta)
+    
+    def on_stream_done(ai_content):
+        print(f"AI生成内容: {ai_content[:300]}...")
+        if stream_window:
+            ai_log.event(request_id, "stream_done", latency_ms=ai_log.elapsed_ms(started), status=200,
+                         payload_bytes=len(ai_content.encode("utf-8")))
+            ai_cache.put(key, ai_content, model)
+            stream_window["finish"]()
         else:
-            error_msg = f"API调用失败: HTTP {response.status_code}"
-            try:
-                error_detail = response.json()
-                error_msg += f", 详情: {error_detail}"
-            except:
-                error_msg += f", 响应内容: {response.text[:200]}"
-            
-            print(f"API调用失败: {error_msg}")
-            
-            with open(debug_file, "a", encoding="utf-8") as f:
-                f.write(f"{error_msg}\n")
-            
-            # API调用失败，使用本地建议
-            fallback_suggestion(error_msg)
-            
-    except Exception as e:
+            wait_window.destroy()
+            on_failure("API调用失败: 流式响应没有返回任何内容")
+    
+    def on_error(exc):
         wait_window.destroy()
-        error_msg = f"API调用异常: {str(e)}"
-        print(f"API调用异常: {str(e)}")
-        
-        with open(debug_file, "a", encoding="utf-8") as f:
-            f.write(f"{error_msg}\n")
-        
-        # API调用失败，使用本地建议
-        fallback_suggestion(error_msg)
+        if stream_window and not isinstance(exc, TaskCancelled):
+            # 已经显示了部分内容，保留窗口并提示中断原因
+            error_msg = f"API调用超时: 超过 {deadline} 秒未完成" if isinstance(exc, TaskDeadlineExceeded) else f"API调用异常: {str(exc)}"
+            print(error_msg)
+            ai_log.event(request_id, "error", latency_ms=ai_log.elapsed_ms(started), error=error_msg)
+            stream_window["finish"](f"生成中断：{error_msg}")
+            return
+        if isinstance(exc, TaskCancelled):
+            print("用户取消了AI建议")
+            ai_log.event(request_id, "cancelled", latency_ms=ai_log.elapsed_ms(started))
+            return
+        if isinstance(exc, TaskDeadlineExceeded):
+            on_failure(f"API调用超时: 超过 {deadline} 秒未返回")
+        else:
+            on_failure(f"API调用异常: {str(exc)}")
+    
+    # 网络请求放到后台线程，主线程继续处理界面事件，进度条不会冻结
+    if stream_mode:
+        task = BackgroundTask(root, request_ai_stream, on_stream_done, on_error,
+                              deadline=deadline, on_progress=on_delta)
+    else:
+        task = BackgroundTask(root, request_ai, on_response, on_error, deadline=deadline)
+    tk.Button(wait_window, text="取消", command=task.cancel, font=("微软雅黑", 10), padx=20).pack(pady=5)
+    wait_window.protocol("WM_DELETE_WINDOW", task.cancel)
+    status_label.config(text="正在生成内容...")
+    task.start()
 
 def fallback_suggestion(error_msg=""):
     """API失败时的本地建议"""
@@ -1144,13 +1164,13 @@ def fallback_suggestion(error_msg=""):
     advice_label.pack(fill="both", expand=True)
     
     # 调试文件提示
-    debug_file = os.path.join(ROOT_DIR, "ai_debug.log")
-    tk.Label(win, text=f"详细调试信息已保存到: {debug_file}", font=("微软雅黑", 9), fg="gray").pack(pady=5)
+    tk.Label(win, text=f"详细调试信息已保存到: {AI_DEBUG_LOG}", font=("微软雅黑", 9), fg="gray").pack(pady=5)
     
     # 关闭按钮
     ttk.Button(win, text="关闭", command=win.destroy).pack(pady=10)
 
-def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regenerate_callback=None):
+def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regenerate_callback=None,
+                              streaming=False, on_close=None, from_cache=False):
     """显示AI建议窗口，用户可以接受、拒绝或重新生成
     
     Args:
@@ -1158,6 +1178,13 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
         today_widget: 今日工作输入框
         tomorrow_widget: 明日计划输入框
         regenerate_callback: 重新生成回调函数
+        streaming: 流式模式，内容通过返回的 append_text 逐段追加，
+                   收到"2、明日工作计划"部分后才允许同意应用
+        on_close: 窗口关闭时回调（流式模式下用于停止接收）
+        from_cache: 内容来自本地缓存，在标题旁提示
+    
+    Returns:
+        (append_text, finish) 两个函数，供流式模式追加内容和标记结束
     """
     win = tk.Toplevel(root)
     win.title("AI建议 - 工作汇报优化")
@@ -1169,6 +1196,9 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
     header_frame = tk.Frame(win)
     header_frame.pack(fill="x", padx=20, pady=10)
     tk.Label(header_frame, text="AI生成的优化建议：", font=("微软雅黑", 12, "bold")).pack(side=tk.LEFT)
+    status_text = "正在接收..." if streaming else ("缓存结果（点重新生成可获取新建议）" if from_cache else "")
+    status_label = tk.Label(header_frame, text=status_text, font=("微软雅黑", 10), fg="gray")
+    status_label.pack(side=tk.LEFT, padx=10)
     
     # 显示AI建议内容
     text_frame = tk.Frame(win)
@@ -1188,10 +1218,22 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
     btn_frame = tk.Frame(win)
     btn_frame.pack(pady=15)
     
+    def current_content():
+        return ai_text.get("1.0", "end-1c")
+    
+    def tomorrow_received(content):
+        # "2、明日工作计划"标题之后至少已有一行内容
+        return re.search(r'2[、.]明日工作计划[；:]?[^\n]*\n\s*\S', content) is not None
+    
+    def close_window():
+        if on_close:
+            on_close()
+        win.destroy()
+    
     def accept_suggestion():
         """接受AI建议，将内容填充到输入框"""
-        # 解析AI生成的内容
-        content = ai_content
+        # 解析AI生成的内容（流式模式下取已接收到的部分）
+        content = current_content()
         
         print("=== 开始处理AI建议 ===")
         print(f"AI生成的原始内容: {content[:200]}..." if len(content) > 200 else f"AI生成的原始内容: {content}")
@@ -1206,7 +1248,7 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
         if today_match and today_widget:
             today_text = today_match.group(1).strip()
             # 清理编号
-            today_text = re.sub(r'^[a-zA-Z][.．、]\s*', '', today_text, flags=re.MULTILINE)
+            today_text_clean = re.sub(r'^[a-zA-Z][.．、]\s*', '', today_text, flags=re.MULTILINE)
             today_widget.delete("1.0", tk.END)
             today_widget.insert("1.0", today_text_clean)
             print("今日工作已填充到输入框")
@@ -1226,7 +1268,7 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
         # 保存输入
         save_all_inputs()
         
-        win.destroy()
+        close_window()
         
         # 显示成功消息
         msg_window = tk.Toplevel(root)
@@ -1240,11 +1282,11 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
     
     def cancel_suggestion():
         """取消，关闭窗口"""
-        win.destroy()
+        close_window()
     
     def regenerate_suggestion():
         """重新生成建议"""
-        win.destroy()
+        close_window()
         if regenerate_callback:
             regenerate_callback()
     
@@ -1252,8 +1294,11 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
     btn_style = {"font": ("微软雅黑", 10), "padx": 15, "pady": 5}
     
     # 同意应用按钮 - 绿色
-    tk.Button(btn_frame, text="✓ 同意应用", command=accept_suggestion, 
-             bg="#4CAF50", fg="white", **btn_style).pack(side=tk.LEFT, padx=5)
+    accept_btn = tk.Button(btn_frame, text="✓ 同意应用", command=accept_suggestion, 
+             bg="#4CAF50", fg="white", **btn_style)
+    accept_btn.pack(side=tk.LEFT, padx=5)
+    if streaming:
+        accept_btn.config(state="disabled")
     
     # 重新生成按钮 - 蓝色
     tk.Button(btn_frame, text="↻ 重新生成", command=regenerate_suggestion,
@@ -1262,43 +1307,79 @@ def show_ai_suggestion_window(ai_content, today_widget, tomorrow_widget, regener
     # 取消按钮 - 灰色
     tk.Button(btn_frame, text="✗ 取消", command=cancel_suggestion,
              bg="#9E9E9E", fg="white", **btn_style).pack(side=tk.LEFT, padx=5)
+    win.protocol("WM_DELETE_WINDOW", cancel_suggestion)
+    
+    def append_text(delta):
+        """流式模式：追加一段文本"""
+        if not win.winfo_exists():
+            return
+        ai_text.config(state="normal")
+        ai_text.insert(tk.END, delta)
+        ai_text.see(tk.END)
+        ai_text.config(state="disabled")
+        if str(accept_btn["state"]) == "disabled" and tomorrow_received(current_content()):
+            accept_btn.config(state="normal")
+    
+    def finish(note="生成完成"):
+        """流式模式：接收结束"""
+        if not win.winfo_exists():
+            return
+        status_label.config(text=note)
+        accept_btn.config(state="normal")
+    
+    return append_text, finish
+
+def show_send_toast(title, text):
+    """自动关闭的提示框"""
+    msg_window = tk.Toplevel(root)
+    msg_window.title(title)
+    msg_window.geometry("300x100")
+    msg_window.transient(root)
+    msg_window.grab_set()
+
+    # 消息内容
+    label = tk.Label(msg_window, text=text, padx=20, pady=20, wraplength=260)
+    label.pack()
+
+    # 3秒后自动关闭
+    msg_window.after(3000, msg_window.destroy)
+
+def on_send_status(job, status, detail):
+    """发送任务状态回调（主线程）"""
+    if status == "queued":
+        send_status_label.config(text="已加入发送队列...")
+    elif status == "running":
+        send_status_label.config(text="正在发送到企微...")
+    elif status == "progress":
+        send_status_label.config(text=detail[-60:])
+    elif status == "done":
+        send_status_label.config(text="")
+        if job.kind == "wework":
+            show_send_toast("发送成功", f"已发送到企微群「{job.target}」！")
+        else:
+            show_send_toast("发送成功", "已复制内容并打开企业微信！")
+    elif status == "failed":
+        send_status_label.config(text="")
+        show_send_toast("发送失败", detail or "发送到企微失败，请检查企微是否安装！")
+    else:
+        send_status_label.config(text="发送已取消")
 
 def send_to_wechat_wrapper():
-    """发送到企微的包装函数，确保先有内容再发送"""
+    """发送到企微的包装函数，确保先有内容再发送；发送本身在后台队列执行"""
     # 总是生成最新的汇报内容
     generate_report(False)
     content = output_text.get("1.0", tk.END).strip()
-    
+
     if content:
-        success = send_to_wechat(content)
-        if success:
-            # 创建自动关闭的消息框
-            msg_window = tk.Toplevel(root)
-            msg_window.title("发送成功")
-            msg_window.geometry("300x100")
-            msg_window.transient(root)
-            msg_window.grab_set()
-            
-            # 消息内容
-            label = tk.Label(msg_window, text="已复制内容并打开企业微信！", padx=20, pady=20)
-            label.pack()
-            
-            # 3秒后自动关闭
-            msg_window.after(3000, msg_window.destroy)
+        if WECOM_AUTO_SEND_GROUP:
+            job, created = send_jobs.submit("wework", content, WECOM_AUTO_SEND_GROUP)
         else:
-            # 创建自动关闭的错误消息框
-            msg_window = tk.Toplevel(root)
-            msg_window.title("发送失败")
-            msg_window.geometry("300x100")
-            msg_window.transient(root)
-            msg_window.grab_set()
-            
-            # 消息内容
-            label = tk.Label(msg_window, text="发送到企微失败，请检查企微是否安装！", padx=20, pady=20)
-            label.pack()
-            
-            # 3秒后自动关闭
-            msg_window.after(3000, msg_window.destroy)
+            job, created = send_jobs.submit("clipboard", content)
+        if not created:
+            send_status_label.config(text="相同内容刚刚已发送或正在发送，已忽略重复点击")
+
+send_jobs = SendQueue(root, SEND_JOBS_FILE, {"clipboard": clipboard_runner, "wework": wework_runner},
+                      on_status=on_send_status)
 
 # 主按钮 - 所有按钮放在同一行
 main_buttons = tk.Frame(btnframe, bg="#f5f7fa")
@@ -1313,6 +1394,10 @@ ttk.Button(main_buttons, text="AI建议", command=ai_suggest).pack(side=tk.LEFT,
 ttk.Button(main_buttons, text="API配置", command=lambda: show_ai_config_dialog(first_time=False)).pack(side=tk.LEFT, padx=5)
 ttk.Button(main_buttons, text="模板定制", command=open_template_editor).pack(side=tk.LEFT, padx=5)
 
+# 发送任务状态
+send_status_label = tk.Label(btnframe, text="", font=("微软雅黑", 9), fg="gray", bg="#f5f7fa")
+send_status_label.pack()
+
 def generate_report(autocopy=False):
     user, dept, date = user_var.get().strip(), dept_var.get().strip(), date_var.get().strip()
     if not user or not dept or not date:
@@ -1320,8 +1405,7 @@ def generate_report(autocopy=False):
         return
     userkey = f"{user}_{dept}"
     report_dict = dict(user=user, dept=dept, date=date)
-    outlist = []
-    last_tomorrow = ""
+    values = {}
     for item in template:
         key = item.get("key","")
         raw = input_widgets.get(key, None)
@@ -1331,14 +1415,12 @@ def generate_report(autocopy=False):
             if t:
                 value = t
                 raw.insert("1.0", t)
-        if key in ("today_work", "tomorrow_plan"):
-            value = format_with_bullets(value) if value else ("a. 休息" if key == "tomorrow_plan" else "")
-        report_dict[key] = value
-        outlist.append(f"{item['title']}；\n{value}\n")
-        if key == "tomorrow_plan":
-            last_tomorrow = value
+        values[key] = value
+    body, formatted = format_report(template, values, title_sep="；")
+    report_dict.update(formatted)
+    last_tomorrow = formatted.get("tomorrow_plan", "")
     toptext = f"姓名：{user}  部门：{dept}  汇报日期：{date}\n"
-    report_full = toptext + "=" * 52 + "\n" + "".join(outlist)
+    report_full = toptext + "=" * 52 + "\n" + body
     report_dict["report"] = report_full
     save_user_tomorrow(userkey, last_tomorrow)
     token = get_report_token(user, dept, date)
@@ -1369,9 +1451,26 @@ root.after(500, check_first_time)
 
 def on_close_all():
     save_all_inputs()
+    autosaver.flush()
+    counters = autosaver.counters()
+    print(f"自动保存: 请求 {counters['requested']} 次, 实际写盘 {counters['performed']} 次")
+    report_store.close()
+    send_jobs.close()
+    if frame_monitor:
+        print(f"主循环帧间隔: {frame_monitor.stats()}")
+    ai_log.shutdown()
     root.destroy()
 
 
+frame_monitor = FrameMonitor(root).start() if FRAME_MONITOR else None
+
 root.protocol("WM_DELETE_WINDOW", on_close_all)
 
-root.mainloop()
\ No newline at end of file
+if STARTUP_PROBE:
+    root.wait_visibility(root)
+    root.update_idletasks()
+    with open(STARTUP_PROBE, "w", encoding="utf-8") as f:
+        f.write(f"{time.time():.3f}\n")
+    on_close_all()
+else:
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""汇报正文格式化：给今日工作/明日计划逐行加编号，main.py 和 wiz_work_repo_tool.py 共用。
+
+编号规则（idx 为行在原文中的下标，空行也占下标）：前 10 行 a. ~ j.，
+第 11 ~ 36 行 11. ~ 36.，之后循环用 ① ~ ⑩。已经带编号的行（字母编号 a./ab.、
+数字编号 1.、圆圈数字 ①~⑩ 开头）原样保留。
+
+识别用一个预编译的正则一次完成，返回编号类型和去掉编号后的内容。旧写法的
+圆圈数字模式 ^①|②|… 只给 ① 写了锚点，靠 re.match 才没有误判；这里三类编号
+放在同一个分组里，整体只匹配行首。"""
+
+import re
+
+BULLET_KEYS = ("today_work", "tomorrow_plan")
+REST_PLAN = "a. 休息"
+
+CIRCLED = "①②③④⑤⑥⑦⑧⑨⑩"
+
+_BULLET = re.compile(
+    r"^(?:(?P<letter>[a-zA-Z]{1,2}\.)|(?P<number>\d+\.)|(?P<circled>[①-⑩]))\s?(?P<content>.*)",
+    re.S)
+
+
+def excel_letters(n):
+    res = ""
+    while True:
+        n, r = divmod(n, 26)
+        res = chr(97 + r) + res
+        if n == 0:
+            break
+        n -= 1
+    return res + "."
+
+
+# 前 36 行的编号前缀预先生成
+_MARKERS = [excel_letters(i) for i in range(10)] + [f"{i + 1}." for i in range(10, 36)]
+
+
+def marker_for(idx):
+    """第 idx 行（从 0 开始）应加的编号"""
+    if idx < 36:
+        return _MARKERS[idx]
+    return CIRCLED[idx % 10]
+
+
+def classify_line(line):
+    """识别行首编号，返回 (类型, 内容)。类型为 letter/number/circled，没有编号时为 None，内容为整行"""
+    m = _BULLET.match(line)
+    if m is None:
+        return None, line
+    if m.group("letter"):
+        return "letter", m.group("content")
+    if m.group("number"):
+        return "number", m.group("content")
+    return "circled", m.group("content")
+
+
+def proper_bullet(line, idx):
+    """单行加编号；已有编号的行原样返回"""
+    line = line.strip()
+    if _BULLET.match(line):
+        return line
+    return f"{marker_for(idx)} {line}"
+
+
+def format_with_bullets(text):
+    """整段文本逐行加编号，跳过空行"""
+    match = _BULLET.match
+    out = []
+    for idx, line in enumerate(text.strip().split("\n")):
+        line = line.strip()
+        if not line:
+            continue
+        out.append(line if match(line) else f"{marker_for(idx)} {line}")
+    return "\n".join(out)
+
+
+def format_section(key, value):
+    """单个栏目的正文：今日工作/明日计划加编号，空的明日计划填“a. 休息”，其他栏目原样"""
+    if key in BULLET_KEYS:
+        return format_with_bullets(value) if value else (REST_PLAN if key == "tomorrow_plan" else "")
+    return value
+
+
+def format_report(template, values, title_sep="："):
+    """按模板一次格式化整份汇报的各栏目。
+
+    template 为 [{"title", "key"}, ...]，values 为 {key: 原始内容}。
+    返回 (正文, {key: 格式化后的内容})，正文每栏为 “标题{title_sep}\\n内容\\n”"""
+    formatted = {}
+    parts = []
+    for item in template:
+        key = item.get("key", "")
+        formatted[key] = format_section(key, values.get(key, ""))
+        parts.append(f"{item['title']}{title_sep}\n{formatted[key]}\n")
+    return "".join(parts), formatted
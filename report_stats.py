@@ -0,0 +1,111 @@
+import json
+import os
+
+# 参与“事项总条数”统计的内容字段
+ITEM_FIELDS = ("today_work", "tomorrow_plan", "problems")
+
+CACHE_VERSION = 1
+
+
+def count_items(text):
+    """按行统计非空事项数"""
+    if not isinstance(text, str):
+        return 0
+    return sum(1 for line in text.split("\n") if line.strip())
+
+
+def empty_stats():
+    return {
+        "version": CACHE_VERSION,
+        "fingerprint": None,
+        "total": 0,
+        "items_total": 0,
+        "users": {},   # 用户 -> 提交份数
+        "fields": {},  # 字段 -> 事项条数
+        "days": {},    # 日期 -> 提交份数
+    }
+
+
+def apply_report(stats, report, sign=1):
+    """把一份汇报计入（sign=1）或扣除（sign=-1）聚合统计"""
+    def bump(bucket, key, delta):
+        value = bucket.get(key, 0) + delta
+        if value:
+            bucket[key] = value
+        else:
+            bucket.pop(key, None)
+
+    stats["total"] += sign
+    bump(stats["users"], report.get("user", ""), sign)
+    bump(stats["days"], report.get("date", ""), sign)
+    for key in ITEM_FIELDS:
+        n = count_items(report.get(key, ""))
+        if n:
+            stats["items_total"] += sign * n
+            bump(stats["fields"], key, sign * n)
+
+
+class ReportStats:
+    """持久化的汇报统计缓存。
+
+    写入历史时按增量更新（覆盖同名汇报会先扣除旧内容），查询时只比较存储指纹
+    （mtime/大小），指纹与缓存一致即直接返回；仅当文件在程序之外被改动时才全量重建。"""
+
+    def __init__(self, cache_file, store):
+        self.cache_file = cache_file
+        self.store = store
+        self._stats = None
+
+    def _load(self):
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    stats = json.load(f)
+                if stats.get("version") == CACHE_VERSION:
+                    return stats
+            except Exception:
+                pass
+        return None
+
+    def _persist(self, stats):
+        tmp = self.cache_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False)
+        os.replace(tmp, self.cache_file)
+
+    def rebuild(self):
+        """全量扫描存储重建统计"""
+        stats = empty_stats()
+        for _, report in self.store.iter_reports():
+            apply_report(stats, report)
+        stats["fingerprint"] = self.store.fingerprint()
+        self._persist(stats)
+        self._stats = stats
+        return stats
+
+    def current(self):
+        """返回与存储一致的统计；指纹不符时全量重建"""
+        if self._stats is None:
+            self._stats = self._load()
+        if self._stats is None or self._stats.get("fingerprint") != self.store.fingerprint():
+            return self.rebuild()
+        return self._stats
+
+    def save(self, token, report_data):
+        """写入一份汇报到存储，并增量更新统计"""
+        stats = self.current()
+        try:
+            previous = self.store.get(token)
+        except Exception:
+            # 旧文件损坏（JSON 解析失败等）时 iter_reports 也会跳过它，统计里没有它的份额
+            previous = None
+        self.store.save(token, report_data)
+        if previous is not None:
+            apply_report(stats, previous, -1)
+        apply_report(stats, report_data)
+        stats["fingerprint"] = self.store.fingerprint()
+        try:
+            self._persist(stats)
+        except Exception:
+            # 缓存写失败不影响汇报保存，下次查询时指纹不符会自动重建
+            pass
@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import time
+
+# 汇报字典中的公共头部字段，其余键（today_work、tomorrow_plan、模板自定义项）都视为内容字段
+HEADER_KEYS = ("user", "dept", "date", "report")
+
+BACKENDS = ("sqlite", "json")
+
+
+def _encode_value(value):
+    """内容字段写入 fields 表：字符串原样存，其他类型（旧 JSON 里的 None、数字、列表等）
+    存 JSON 文本并置 is_json，读出时还原，保证与 JsonReportStore 读到的一致"""
+    if isinstance(value, str):
+        return value, 0
+    return json.dumps(value, ensure_ascii=False), 1
+
+
+def _decode_value(value, is_json):
+    return json.loads(value) if is_json else value
+
+
+class JsonReportStore:
+    """旧版存储：每份汇报一个 {token}.json 文件，列表靠 os.listdir 重新扫描"""
+
+    name = "json"
+
+    def __init__(self, history_dir):
+        self.history_dir = history_dir
+        os.makedirs(history_dir, exist_ok=True)
+
+    def _path(self, token):
+        return os.path.join(self.history_dir, f"{token}.json")
+
+    def save(self, token, report_data):
+        with open(self._path(token), "w", encoding="utf-8") as f:
+            json.dump(report_data, f, ensure_ascii=False, indent=2)
+
+    def list_tokens(self):
+        return sorted([
+            f[:-5] for f in os.listdir(self.history_dir)
+            if f.endswith(".json")
+        ], reverse=True)
+
+    def get(self, token):
+        path = self._path(token)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter_reports(self):
+        for token in self.list_tokens():
+            try:
+                data = self.get(token)
+            except Exception:
+                continue
+            if data is not None:
+                yield token, data
+
+    def count(self):
+        return len(self.list_tokens())
+
+    def fingerprint(self):
+        """目录指纹（文件数、总大小、最新 mtime），用于判断统计缓存是否失效"""
+        count = size = latest = 0
+        with os.scandir(self.history_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                st = entry.stat()
+                count += 1
+                size += st.st_size
+                latest = max(latest, st.st_mtime_ns)
+        return [self.name, count, size, latest]
+
+    def close(self):
+        pass
+
+
+class SqliteReportStore:
+    """SQLite 存储：users / reports / fields 三张表，按用户、部门、日期建索引"""
+
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        dept TEXT NOT NULL,
+        UNIQUE (name, dept)
+    );
+    CREATE TABLE IF NOT EXISTS reports (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        date TEXT NOT NULL,
+        report TEXT NOT NULL DEFAULT '',
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS fields (
+        token TEXT NOT NULL REFERENCES reports(token) ON DELETE CASCADE,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        is_json INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (token, key)
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_users_dept ON users(dept);
+    CREATE INDEX IF NOT EXISTS idx_reports_user_date ON reports(user_id, date);
+    CREATE INDEX IF NOT EXISTS idx_reports_date ON reports(date);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(self.SCHEMA)
+        self._upgrade_schema()
+        self.conn.commit()
+
+    def _upgrade_schema(self):
+        # 早期建的库 fields 表没有 is_json 列，旧行按字符串读出
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(fields)")}
+        if "is_json" not in columns:
+            self.conn.execute("ALTER TABLE fields ADD COLUMN is_json INTEGER NOT NULL DEFAULT 0")
+
+    def _user_id(self, name, dept):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO users (name, dept) VALUES (?, ?)", (name, dept))
+        row = self.conn.execute(
+            "SELECT id FROM users WHERE name = ? AND dept = ?", (name, dept)).fetchone()
+        return row[0]
+
+    def _write(self, token, report_data):
+        user_id = self._user_id(report_data.get("user", ""), report_data.get("dept", ""))
+        self.conn.execute(
+            "INSERT INTO reports (token, user_id, date, report, updated_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(token) DO UPDATE SET "
+            "user_id = excluded.user_id, date = excluded.date, "
+            "report = excluded.report, updated_at = excluded.updated_at",
+            (token, user_id, report_data.get("date", ""),
+             report_data.get("report", ""), time.time()))
+        # 同一 token 重新生成时整体覆盖旧字段
+        self.conn.execute("DELETE FROM fields WHERE token = ?", (token,))
+        self.conn.executemany(
+            "INSERT INTO fields (token, key, value, is_json) VALUES (?, ?, ?, ?)",
+            [(token, k, *_encode_value(v)) for k, v in report_data.items() if k not in HEADER_KEYS])
+
+    def save(self, token, report_data):
+        with self.conn:
+            self._write(token, report_data)
+
+    def save_many(self, items):
+        """批量写入 [(token, report_data), ...]，单个事务，供迁移使用"""
+        with self.conn:
+            for token, report_data in items:
+                self._write(token, report_data)
+
+    def list_tokens(self):
+        rows = self.conn.execute("SELECT token FROM reports ORDER BY token DESC")
+        return [r[0] for r in rows]
+
+    def get(self, token):
+        row = self.conn.execute(
+            "SELECT u.name, u.dept, r.date, r.report FROM reports r "
+            "JOIN users u ON u.id = r.user_id WHERE r.token = ?", (token,)).fetchone()
+        if row is None:
+            return None
+        data = {"user": row[0], "dept": row[1], "date": row[2]}
+        for key, value, is_json in self.conn.execute(
+                "SELECT key, value, is_json FROM fields WHERE token = ?", (token,)):
+            data[key] = _decode_value(value, is_json)
+        data["report"] = row[3]
+        return data
+
+    def iter_reports(self):
+        # 两次顺序扫描代替逐条 get()，全量统计时避免 N+1 查询
+        fields = {}
+        for token, key, value, is_json in self.conn.execute(
+                "SELECT token, key, value, is_json FROM fields"):
+            fields.setdefault(token, {})[key] = _decode_value(value, is_json)
+        rows = self.conn.execute(
+            "SELECT r.token, u.name, u.dept, r.date, r.report FROM reports r "
+            "JOIN users u ON u.id = r.user_id ORDER BY r.token DESC").fetchall()
+        for token, name, dept, date, report in rows:
+            data = {"user": name, "dept": dept, "date": date}
+            data.update(fields.get(token, {}))
+            data["report"] = report
+            yield token, data
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def fingerprint(self):
+        """数据库文件指纹（大小、mtime），用于判断统计缓存是否失效"""
+        st = os.stat(self.db_path)
+        return [self.name, st.st_size, st.st_mtime_ns]
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        self.conn.close()
+
+
+def migrate_json_to_sqlite(history_dir, store, batch_size=500):
+    """把旧版 report_history 目录下的 JSON 汇报一次性导入 SQLite。
+
+    已迁移过（meta 中有标记）则直接返回 0；损坏的文件跳过。原 JSON 文件保留不删，
+    切回 json 后端时仍可使用。返回导入的份数。"""
+    if store.get_meta("migrated_from_json"):
+        return 0
+    imported = 0
+    if os.path.isdir(history_dir):
+        batch = []
+        for name in os.listdir(history_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(history_dir, name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            if not isinstance(data, dict):
+                continue
+            batch.append((name[:-5], data))
+            if len(batch) >= batch_size:
+                store.save_many(batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            store.save_many(batch)
+            imported += len(batch)
+    store.set_meta("migrated_from_json", time.strftime("%Y-%m-%d %H:%M:%S"))
+    return imported
+
+
+def open_report_store(backend, history_dir, db_path):
+    """按名称打开历史存储后端。sqlite 首次打开时自动从 JSON 目录迁移"""
+    if backend == "json":
+        return JsonReportStore(history_dir)
+    if backend == "sqlite":
+        store = SqliteReportStore(db_path)
+        migrate_json_to_sqlite(history_dir, store)
+        return store
+    raise ValueError(f"未知的历史存储后端: {backend}（可选: {', '.join(BACKENDS)}）")
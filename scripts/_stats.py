@@ -0,0 +1,12 @@
+"""scripts 下统计脚本共用的小工具（ai_log_stats.py、send_trace.py）。"""
+
+
+def percentile(values, p):
+    """线性插值的第 p 百分位数；values 为空时返回 None"""
+    values = sorted(values)
+    if not values:
+        return None
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
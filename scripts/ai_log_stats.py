@@ -0,0 +1,42 @@
+"""统计 ai_debug.log（含轮转出的 .1/.2/...）中各阶段的耗时分位数。
+
+    python scripts/ai_log_stats.py [日志路径，默认 工作汇报记录/ai_debug.log]
+"""
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+from _stats import percentile
+
+
+def load_records(log_file):
+    for path in sorted(glob.glob(glob.escape(log_file) + ".*")) + [log_file]:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def main():
+    log_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join("工作汇报记录", "ai_debug.log")
+    latencies = defaultdict(list)
+    for record in load_records(log_file):
+        if record.get("latency_ms") is not None:
+            latencies[record.get("phase", "?")].append(record["latency_ms"])
+    if not latencies:
+        print("没有可统计的耗时记录")
+        return
+    print(f"{'phase':<16}{'n':>6}{'p50':>10}{'p95':>10}{'max':>10}")
+    for phase, values in sorted(latencies.items()):
+        print(f"{phase:<16}{len(values):>6}{percentile(values, 50):>10.1f}"
+              f"{percentile(values, 95):>10.1f}{max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
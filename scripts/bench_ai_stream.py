@@ -0,0 +1,167 @@
+"""流式 AI 建议基准：本地假 SSE 服务器，对比流式与非流式的首字时间。
+
+假服务器模拟 chat/completions：每 token_delay 秒产出一段文本，stream=true 时按
+SSE 逐段推送，否则攒齐后一次返回。用法：
+
+    python scripts/bench_ai_stream.py [段数，默认 60] [每段间隔秒，默认 0.05]
+
+最后检查重试策略：POST 遇到读超时、5xx 只发一次，429 带 Retry-After 才重发；GET 照常重试。
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client  # noqa: E402
+from ai_stream import iter_content_deltas, stream_chat_completion  # noqa: E402
+
+REPORT = ("1、今日工作完成情况；\na. 完成接口开发（100%，已完成全部接口）\n"
+          "b. 模块联调（60%，已完成登录模块，明天继续）\n\n"
+          "2、明日工作计划；\na. 模块联调（预计100%，完成剩余模块，进行测试验证）\n")
+
+
+def make_handler(pieces, token_delay):
+    class FakeCompletions(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def write_chunk(self, data):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.write_chunk(b": keep-alive\n\n")
+                for piece in pieces:
+                    time.sleep(token_delay)
+                    chunk = {"choices": [{"delta": {"content": piece}}]}
+                    self.write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.write_chunk(b"data: [DONE]\n\n")
+                self.write_chunk(b"")
+            else:
+                time.sleep(token_delay * len(pieces))
+                payload = json.dumps({"choices": [{"message": {"content": "".join(pieces)}}]},
+                                     ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+    return FakeCompletions
+
+
+def make_retry_handler(attempts, stall):
+    """按路径返回固定结果并统计收到的请求数：/stall 不回应，/500、/503、/429 返回对应状态码"""
+    class FlakyCompletions(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def respond(self):
+            attempts[self.command, self.path] = attempts.get((self.command, self.path), 0) + 1
+            if self.path == "/stall":
+                time.sleep(stall)
+                self.close_connection = True
+                return
+            self.send_response(int(self.path[1:]))
+            if self.path == "/429":
+                self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            self.respond()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.respond()
+
+    return FlakyCompletions
+
+
+def check_retries():
+    attempts = {}
+    stall = 1.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_retry_handler(attempts, stall))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    data = {"model": "fake", "messages": []}
+    try:
+        http_client.post(f"{base}/stall", json=data, read_timeout=stall / 4)
+    except Exception as e:
+        print(f"[retry] POST stall -> {type(e).__name__}")
+    for path in ("/500", "/503", "/429"):
+        http_client.post(f"{base}{path}", json=data)
+    http_client.get(f"{base}/503")
+    server.shutdown()
+    print(f"[retry] attempts: {', '.join(f'{m} {p}={n}' for (m, p), n in sorted(attempts.items()))}")
+    total = http_client.RETRY.total
+    assert attempts == {("POST", "/stall"): 1, ("POST", "/500"): 1, ("POST", "/503"): 1,
+                        ("POST", "/429"): total + 1, ("GET", "/503"): total + 1}, attempts
+
+
+def split_pieces(text, n):
+    size = max(1, len(text) // n)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    token_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    pieces = split_pieces(REPORT, n)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(pieces, token_delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    data = {"model": "fake", "messages": [{"role": "user", "content": "hi"}]}
+
+    start = time.perf_counter()
+    response = http_client.post(url, json=data, read_timeout=60)
+    content = response.json()["choices"][0]["message"]["content"]
+    blocking = time.perf_counter() - start
+    print(f"[non-stream] first text after {blocking * 1000:8.1f} ms (whole response)")
+
+    start = time.perf_counter()
+    first = ready = None
+    received = []
+    for delta in stream_chat_completion(url, {}, data, read_timeout=60):
+        now = time.perf_counter() - start
+        if first is None:
+            first = now
+        received.append(delta)
+        if ready is None and "2、明日工作计划；\n" in "".join(received):
+            ready = now
+    total = time.perf_counter() - start
+    assert "".join(received) == content
+    print(f"[stream]     first token after {first * 1000:8.1f} ms")
+    print(f"[stream]     accept enabled after {ready * 1000:8.1f} ms (明日工作计划 received)")
+    print(f"[stream]     complete after {total * 1000:8.1f} ms")
+
+    # 第二次请求应复用连接池里的 keep-alive 连接，connect 为 0
+    response = http_client.post(url, json=data, read_timeout=60)
+    print(f"[keep-alive] {http_client.format_timings(response.timings)}")
+    assert response.timings["connect_ms"] == 0
+    server.shutdown()
+
+    # 解析器自检：注释行、CRLF 行尾
+    lines = [b": ping", b"data: {\"choices\":[{\"delta\":{\"content\":\"a\"}}]}", b"",
+             "data: {\"choices\":[{\"delta\":{\"content\":\"b\"}}]}\r".encode(), b"", b"data: [DONE]", b""]
+    assert list(iter_content_deltas(lines)) == ["a", "b"]
+
+    check_retries()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""模糊匹配基准：模拟一屏搜索结果（若干 OCR 文本块）对多个目标群名打分。
+
+对比原来的完整编辑距离、带状提前退出和 Myers 位并行三种实现，并校验三者
+匹配结果一致。用法：
+
+    python scripts/bench_fuzzy_match.py [文本块数，默认 40] [目标数，默认 10] [轮数，默认 200]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fuzzy_match import Matcher, levenshtein, result_match, strip_member_count  # noqa: E402
+
+CHARS = "赛事平台研发部运营中心项目组产品技术支持市场销售文件传输助手周报日报测试"
+
+
+def full_result_match(group, text, threshold=0.85, distance=None):
+    """原 send_to_wework.py 的写法：每块都算完整编辑距离"""
+    text_clean = strip_member_count(text)
+    if group in text_clean or text_clean in group:
+        if min(len(text_clean), len(group)) >= len(group) * 0.6:
+            return "substring"
+    longest = max(len(group), len(text_clean)) or 1
+    sim = 1.0 - levenshtein(group, text_clean) / longest
+    return f"fuzzy(sim={sim:.2f})" if sim >= threshold else None
+
+
+def make_screen(rng, targets, blocks):
+    texts = []
+    for i in range(blocks):
+        if i < len(targets) and rng.random() < 0.5:
+            # 目标群名带一个 OCR 错字和成员数后缀
+            name = list(targets[i])
+            name[rng.randrange(len(name))] = rng.choice(CHARS)
+            texts.append("".join(name) + f"（{rng.randint(3, 80)}）")
+        else:
+            texts.append("".join(rng.choice(CHARS) for _ in range(rng.randint(4, 30))))
+    return texts
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    n_targets = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    rng = random.Random(3)
+    targets = ["".join(rng.choice(CHARS) for _ in range(rng.randint(6, 14))) for _ in range(n_targets)]
+    screens = [make_screen(rng, targets, blocks) for _ in range(rounds)]
+
+    results = {}
+    for label, matcher in (("full", Matcher(targets, rule=full_result_match)),
+                           ("banded", Matcher(targets, rule=result_match)),
+                           ("myers", Matcher(targets, rule=result_match, method="myers"))):
+        start = time.perf_counter()
+        out = [matcher.match_all(texts) for texts in screens]
+        elapsed = (time.perf_counter() - start) * 1000
+        # 只比较命中的文本块，原因字符串里的相似度在带状算法下不要求精确
+        results[label] = [{t: [idx for idx, _ in hits] for t, hits in r.items()} for r in out]
+        print(f"[{label:<6}] {elapsed / rounds:7.2f} ms per screen ({blocks} blocks x {n_targets} targets)")
+    assert results["full"] == results["banded"] == results["myers"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""OCR 常驻服务基准：对比冷启动（进程内加载模型）与走预热服务时，一次 send_to_wework.py
+运行的端到端耗时。
+
+每轮新起一个 send_to_wework.py --dry-run 进程：和真实发送一样导入全部依赖、探测常驻服务，
+再按发送顺序识别搜索结果、会话标题、搜索入口三个区域（不点击、不发送）。计时从启动
+进程到进程退出。cold 轮关闭常驻服务（WEWORK_OCR_DAEMON=0），warm 轮先拉起服务并预热。
+需要在装好依赖的 Windows 桌面上运行，企微窗口不在时识别主屏。用法：
+
+    python scripts/bench_ocr_daemon.py [轮数，默认 3] [send_to_wework.exe 路径，默认源码]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ocr_daemon import OcrClient  # noqa: E402
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+# 基准用独立的端点文件，不影响本机正在运行的服务
+BENCH_ENDPOINT = os.path.join(tempfile.gettempdir(), "bench_ocr_daemon.json")
+
+
+def run_send(command, env):
+    """运行一次 --dry-run，返回 (进程总耗时 ms, 进程内 OCR 路径耗时 ms)"""
+    start = time.perf_counter()
+    proc = subprocess.run(command + ["--dry-run"], env=env, capture_output=True, text=True,
+                          encoding="utf-8", errors="replace")
+    wall = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        sys.exit(f"send_to_wework --dry-run exited with {proc.returncode}:\n{proc.stdout}{proc.stderr}")
+    m = re.search(r"DRY_RUN_DONE elapsed_ms=(\d+)", proc.stdout)
+    return wall, float(m.group(1)) if m else float("nan")
+
+
+def report(mode, samples):
+    walls = [s[0] for s in samples]
+    print(f"[{mode}] send process median {statistics.median(walls):8.1f} ms "
+          f"(min {min(walls):.1f}, max {max(walls):.1f}), "
+          f"OCR path median {statistics.median(s[1] for s in samples):8.1f} ms ({len(samples)} runs)")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    exe = sys.argv[2] if len(sys.argv) > 2 else None
+    command = [exe] if exe else [sys.executable, os.path.join(SCRIPTS, "send_to_wework.py")]
+    env = dict(os.environ, WEWORK_OCR_ENDPOINT=BENCH_ENDPOINT)
+
+    report("cold", [run_send(command, dict(env, WEWORK_OCR_DAEMON="0")) for _ in range(rounds)])
+
+    daemon_cmd = [exe, "--ocr-daemon"] if exe else [sys.executable, os.path.join(SCRIPTS, "ocr_daemon.py")]
+    daemon = subprocess.Popen(daemon_cmd, env=env)
+    client = OcrClient(BENCH_ENDPOINT)
+    deadline = time.time() + 60
+    while not client.ping():
+        if time.time() > deadline:
+            daemon.kill()
+            sys.exit("OCR daemon did not start within 60s")
+        time.sleep(0.2)
+    try:
+        report("warm", [run_send(command, dict(env, WEWORK_OCR_DAEMON="1")) for _ in range(rounds)])
+    finally:
+        client.shutdown()
+        daemon.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""编号格式化基准：对比旧 proper_bullet（每行重建三条模式、逐条 re.match）与 report_format。
+
+生成一份几千行的粘贴汇报（混合已编号、未编号、空行、缩进和行中含 ② 的内容），
+分别测量 format_with_bullets 的耗时，并核对两者输出完全一致。用法：
+
+    python scripts/bench_report_format.py [行数，默认 5000] [轮数，默认 20]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_format import excel_letters, format_report, format_with_bullets  # noqa: E402
+
+
+def legacy_proper_bullet(line, idx):
+    """原 main.py 的实现"""
+    line = line.strip()
+    patterns = [
+        r"^[a-zA-Z]{1,2}\.\s?.*",
+        r"^\d+\.\s?.*",
+        r"^①|②|③|④|⑤|⑥|⑦|⑧|⑨|⑩",
+    ]
+    for pat in patterns:
+        if re.match(pat, line):
+            return line
+    if idx < 10:
+        return f"{excel_letters(idx)} {line}"
+    elif idx < 36:
+        return f"{idx+1}. {line}"
+    else:
+        circled = ["①","②","③","④","⑤","⑥","⑦","⑧","⑨","⑩"]
+        return f"{circled[(idx%10)]} {line}"
+
+
+def legacy_format_with_bullets(text):
+    lines = text.strip().split("\n")
+    return "\n".join([legacy_proper_bullet(line, i) for i, line in enumerate(lines) if line.strip()])
+
+
+def make_text(n, rng):
+    lines = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.05:
+            lines.append("")
+        elif kind < 0.25:
+            lines.append(f"{excel_letters(i % 10)} 已编号的工作内容{i}")
+        elif kind < 0.35:
+            lines.append(f"{i}. 数字编号的工作内容")
+        elif kind < 0.40:
+            lines.append(f"  完成第②阶段联调{i}")  # 行中的圆圈数字不算编号
+        else:
+            lines.append(f"完成模块{i}开发{rng.randint(10, 100)}%，修复问题{rng.randint(1, 9)}个")
+    return "\n".join(lines)
+
+
+def timed(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(5)
+    today = make_text(n, rng)
+    plan = make_text(n // 2, rng)
+
+    assert legacy_format_with_bullets(today) == format_with_bullets(today), "output differs"
+    assert legacy_format_with_bullets(plan) == format_with_bullets(plan), "output differs"
+
+    legacy_ms = timed(lambda: legacy_format_with_bullets(today), rounds)
+    new_ms = timed(lambda: format_with_bullets(today), rounds)
+    template = [{"title": "1、今日工作完成情况", "key": "today_work"},
+                {"title": "2、明日工作计划", "key": "tomorrow_plan"}]
+    report_ms = timed(lambda: format_report(template, {"today_work": today, "tomorrow_plan": plan}), rounds)
+    print(f"lines {n}, outputs identical")
+    print(f"[legacy] format_with_bullets {legacy_ms:8.2f} ms")
+    print(f"[new   ] format_with_bullets {new_ms:8.2f} ms ({legacy_ms / new_ms:.1f}x)")
+    print(f"[new   ] format_report (today {n} + plan {n // 2} lines) {report_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""统计缓存基准：全量重建 vs. 缓存命中 vs. 增量写入。
+
+用法：
+
+    python scripts/bench_report_stats.py [份数，默认 50000] [json|sqlite，默认 sqlite]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_stats import ReportStats  # noqa: E402
+from report_store import JsonReportStore, SqliteReportStore  # noqa: E402
+from bench_report_store import make_report  # noqa: E402
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<28}{(time.perf_counter() - start) * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    backend = sys.argv[2] if len(sys.argv) > 2 else "sqlite"
+    reports = [make_report(i) for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        if backend == "json":
+            store = JsonReportStore(os.path.join(tmp, "report_history"))
+            for token, data in reports:
+                store.save(token, data)
+        else:
+            store = SqliteReportStore(os.path.join(tmp, "bench.db"))
+            store.save_many(reports)
+        cache_file = os.path.join(tmp, "report_stats.json")
+        print(f"[{backend}, {n} reports]")
+        stats = ReportStats(cache_file, store)
+        timed("full rebuild", stats.rebuild)
+        timed("current (in-memory hit)", stats.current)
+        timed("current (cold, from cache)", ReportStats(cache_file, store).current)
+        token, data = make_report(n)
+        timed("incremental save", lambda: stats.save(token, data))
+        result = timed("current after save", stats.current)
+        assert result["total"] == n + 1
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
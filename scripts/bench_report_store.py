@@ -0,0 +1,69 @@
+"""历史存储基准：对比 json（每份一个文件）与 sqlite 两种后端。
+
+在临时目录生成 N 份模拟汇报，分别测量写入、列表（查历史窗口）、随机读取详情，
+以及 JSON → SQLite 一次性迁移耗时。用法：
+
+    python scripts/bench_report_store.py [份数，默认 20000]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_store import JsonReportStore, SqliteReportStore, migrate_json_to_sqlite  # noqa: E402
+
+
+def make_report(i):
+    user = f"用户{i % 50}"
+    dept = f"部门{i % 7}"
+    date = f"20{20 + i // 3650 % 10}-{i // 300 % 12 + 1:02d}-{i % 28 + 1:02d}"
+    today = "\n".join(f"{chr(97 + k)}. 任务{k}（{k * 10}%，完成部分开发，明天继续）" for k in range(4))
+    tomorrow = "\n".join(f"{chr(97 + k)}. 任务{k}（预计{k * 10 + 20}%，接口联调，测试验证）" for k in range(3))
+    token = f"{user}_{dept}_{date}_{i}"
+    return token, {
+        "user": user, "dept": dept, "date": date,
+        "today_work": today, "tomorrow_plan": tomorrow,
+        "report": f"姓名：{user}  部门：{dept}  汇报日期：{date}\n{today}\n{tomorrow}",
+    }
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<24}{(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def bench(store, reports, samples):
+    print(f"[{store.name}]")
+    timed(f"save x{len(reports)}", lambda: [store.save(t, d) for t, d in reports])
+    tokens = timed("list_tokens", store.list_tokens)
+    timed(f"get x{len(samples)}", lambda: [store.get(t) for t in samples])
+    assert len(tokens) == len(reports)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    reports = [make_report(i) for i in range(n)]
+    samples = [t for t, _ in random.sample(reports, min(200, n))]
+    with tempfile.TemporaryDirectory() as tmp:
+        history_dir = os.path.join(tmp, "report_history")
+        json_store = JsonReportStore(history_dir)
+        bench(json_store, reports, samples)
+
+        sqlite_store = SqliteReportStore(os.path.join(tmp, "bench.db"))
+        bench(sqlite_store, reports, samples)
+        sqlite_store.close()
+
+        migrated = SqliteReportStore(os.path.join(tmp, "migrated.db"))
+        print("[migrate json -> sqlite]")
+        count = timed("migrate", lambda: migrate_json_to_sqlite(history_dir, migrated))
+        assert count == n and migrated.count() == n
+        migrated.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""发送队列基准：对比在 Tk 主线程直接发送与经 SendQueue 后台发送时的主循环帧间隔。
+
+模拟发送每次耗时 SEND_MS（期间每 10ms 上报一次进度），连续“点击”发送 N 次，其中一半
+是重复内容；FrameMonitor 记录最大帧间隔和卡顿次数（超过两帧）。需要图形界面。用法：
+
+    python scripts/bench_send_queue.py [发送次数，默认 10]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from background_task import FrameMonitor  # noqa: E402
+from send_queue import FINAL_STATUSES, SendQueue, load_jobs  # noqa: E402
+
+SEND_MS = 300
+
+
+def fake_runner(job, cancel_event, report):
+    for i in range(SEND_MS // 10):
+        if cancel_event.is_set():
+            return
+        time.sleep(0.01)
+        report(f"step {i}")
+
+
+def run(mode, clicks, journal):
+    root = tk.Tk()
+    root.withdraw()
+    monitor = FrameMonitor(root).start()
+    state = {"finished": 0, "created": 0}
+
+    def on_status(job, status, detail):
+        if status in FINAL_STATUSES:
+            state["finished"] += 1
+
+    jobs = SendQueue(root, journal, {"fake": fake_runner}, on_status=on_status) if mode == "queue" else None
+
+    def click(i):
+        content = f"汇报内容 {i // 2}"  # 每个内容连点两次
+        if jobs:
+            _, created = jobs.submit("fake", content)
+            state["created"] += created
+        else:
+            fake_runner(None, threading.Event(), lambda text: None)
+            state["created"] += 1
+            state["finished"] += 1
+
+    for i in range(clicks):
+        root.after(50 + i * 20, click, i)
+
+    def check_done():
+        if state["finished"] >= state["created"] and state["created"] and time.perf_counter() > deadline:
+            root.quit()
+        else:
+            root.after(50, check_done)
+
+    deadline = time.perf_counter() + 0.05 + clicks * 0.02 + 0.1
+    root.after(100, check_done)
+    start = time.perf_counter()
+    root.mainloop()
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    if jobs:
+        jobs.close()
+    root.destroy()
+    stats = monitor.stats()
+    print(f"[{mode:<5}] sends {state['created']}/{clicks} clicks, wall {elapsed:5.2f}s, "
+          f"max frame gap {stats['max_gap_ms']:7.1f} ms, stalls {stats['stalls']}")
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "send_jobs.jsonl")
+        run("sync", clicks, journal)
+        run("queue", clicks, journal)
+        jobs, lines = load_jobs(journal)
+        print(f"journal: {len(jobs)} jobs, {lines} lines, "
+              f"statuses {sorted({state['status'] for state in jobs.values()})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""main.py 启动耗时基准。
+
+importtime：用 -X importtime 跑 main.py 顶层的全部 import 语句，列出耗时最多的模块；
+另外单独测量已改为按需导入的模块（不计入启动）。改动前后的结果存档在
+bench_startup_results.md。
+
+    python scripts/bench_startup.py importtime [显示条数，默认 15] [次数，默认 5]
+
+window：多次启动程序，测量从启动进程到窗口第一次显示的耗时（main.py 通过
+WORK_REPORT_STARTUP_PROBE 写时间戳后立即退出）。默认启动源码版，也可传打包后的 exe。
+
+    python scripts/bench_startup.py window [次数，默认 5] [exe 路径]
+"""
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+# 启动时不再导入、第一次使用时才导入的模块
+DEFERRED = ["http_client", "ai_stream", "wechat_integration", "pyperclip"]
+
+
+def top_level_imports(path):
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def run_importtime(code):
+    """返回 [(模块, 自身 us, 累计 us, 层级)]，层级 0 为被直接导入的模块"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, encoding="utf-8", errors="replace")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows, proc.returncode, proc.stderr
+
+
+def importtime(limit, runs):
+    code = top_level_imports(MAIN)
+    # 解释器自身启动时加载的模块（site、encodings 等）不算 main.py 的开销
+    baseline = {r[0] for r in run_importtime("pass")[0]}
+    samples = []
+    for _ in range(runs):
+        rows, code_rc, stderr = run_importtime(code)
+        if code_rc != 0:
+            sys.exit(stderr.strip().splitlines()[-1])
+        rows = [r for r in rows if r[0] not in baseline]
+        samples.append((sum(r[2] for r in rows if r[3] == 0), rows))
+    # 单次结果抖动较大，取总耗时居中的一次列明细
+    samples.sort(key=lambda s: s[0])
+    total, rows = samples[len(samples) // 2]
+    loaded = {r[0] for r in rows} | baseline
+    print(f"main.py top-level imports: {len(rows)} modules, median {total / 1000:.1f} ms over {runs} runs "
+          f"(min {samples[0][0] / 1000:.1f}, max {samples[-1][0] / 1000:.1f})")
+    print(f"{'module':<36}{'self ms':>10}{'cumulative ms':>15}")
+    top = [r for r in rows if r[3] == 0]
+    for name, self_us, cumulative_us, _ in sorted(top, key=lambda r: r[2], reverse=True)[:limit]:
+        print(f"{name:<36}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
+
+    print("deferred until first use:")
+    for module in DEFERRED:
+        extra, rc, _ = run_importtime(f"{code}\nimport {module}")
+        if rc != 0:
+            print(f"  {module:<34}(not installed)")
+            continue
+        new = [r for r in extra if r[0] not in loaded]
+        cost = next((r[2] for r in new if r[0] == module), 0)
+        print(f"  {module:<34}{cost / 1000:>10.1f} ms, {len(new)} modules")
+
+
+def window(runs, exe):
+    command = [exe] if exe else [sys.executable, MAIN]
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            probe = os.path.join(tmp, "first_window.txt")
+            env = dict(os.environ, WORK_REPORT_STARTUP_PROBE=probe)
+            start = time.time()
+            proc = subprocess.Popen(command, cwd=tmp, env=env)
+            proc.wait(timeout=30)
+            if not os.path.exists(probe):
+                sys.exit(f"program exited with {proc.returncode} before showing the window")
+            with open(probe, "r", encoding="utf-8") as f:
+                samples.append((float(f.read()) - start) * 1000)
+    print(f"time to first window over {runs} runs ({' '.join(command)}): "
+          f"median {statistics.median(samples):.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms")
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "importtime"
+    if mode == "window":
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+        window(runs, sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+        importtime(limit, int(sys.argv[3]) if len(sys.argv) > 3 else 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""任务跟踪基准：对比旧实现（每次读写整个 JSON + 线性查找）与 TaskRepository。
+
+在临时目录生成 N 个已完成任务和 50 个进行中任务，分别测量单次 update / complete
+的平均耗时。N 增大时旧实现线性变慢，仓库的耗时应基本不变。用法：
+
+    python scripts/bench_task_tracker.py [已完成任务数，逗号分隔，默认 1000,5000,20000]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_tracker import TaskRepository  # noqa: E402
+
+OPS = 50
+
+
+def make_task(i, status):
+    return {"id": f"task_{i}", "name": f"任务{i}", "progress": "50%", "completed": "完成部分开发",
+            "planned": "继续联调", "created_at": f"2025-{i // 28 % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "status": status}
+
+
+def write_fixture(task_file, n_completed):
+    completed = [dict(make_task(i, "completed"), completed_at="2025-01-01") for i in range(n_completed)]
+    tasks = [make_task(n_completed + i, "in_progress") for i in range(OPS)]
+    with open(task_file, "w", encoding="utf-8") as f:
+        json.dump({"tasks": tasks, "completed": completed}, f, ensure_ascii=False, indent=2)
+    return [t["id"] for t in tasks]
+
+
+def legacy_update(task_file, task_id, progress):
+    with open(task_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for task in data["tasks"]:
+        if task["id"] == task_id:
+            task["progress"] = progress
+            with open(task_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
+    return False
+
+
+def legacy_complete(task_file, task_id):
+    with open(task_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for i, task in enumerate(data["tasks"]):
+        if task["id"] == task_id:
+            task["status"] = "completed"
+            data["completed"].append(data["tasks"].pop(i))
+            with open(task_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
+    return False
+
+
+def per_op(func, ids):
+    start = time.perf_counter()
+    for task_id in ids:
+        assert func(task_id)
+    return (time.perf_counter() - start) * 1000 / len(ids)
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1000, 5000, 20000]
+    print(f"{'completed':>10}{'legacy upd':>12}{'legacy done':>12}{'repo load':>12}{'repo upd':>10}{'repo done':>11}  (ms)")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            task_file = os.path.join(tmp, "task_tracker.json")
+            ids = write_fixture(task_file, n)
+            legacy_upd = per_op(lambda task_id: legacy_update(task_file, task_id, "80%"), ids)
+            legacy_done = per_op(lambda task_id: legacy_complete(task_file, task_id), ids)
+
+            ids = write_fixture(task_file, n)
+            start = time.perf_counter()
+            repo = TaskRepository(task_file)
+            load = (time.perf_counter() - start) * 1000
+            repo_upd = per_op(lambda task_id: repo.update(task_id, {"progress": "80%"}), ids)
+            repo_done = per_op(lambda task_id: repo.complete(task_id, "2025-01-02"), ids)
+
+            # 重新加载（快照 + 日志重放）后状态一致
+            reloaded = TaskRepository(task_file)
+            assert reloaded.snapshot() == repo.snapshot()
+            assert not reloaded.by_status("in_progress") and len(reloaded.snapshot()["completed"]) == n + OPS
+        print(f"{n:>10}{legacy_upd:>12.2f}{legacy_done:>12.2f}{load:>12.1f}{repo_upd:>10.3f}{repo_done:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""窗口发现基准：对比退避轮询、事件驱动、事件驱动+钩子内按 hwnd 过滤
+（FakeBackend 模拟 WinEvent）的发现延迟。
+
+模拟窗口在随机时刻出现，并伴随其他窗口的无关事件；记录从窗口出现到被发现的延迟
+和条件检查（即枚举窗口）次数。用法：
+
+    python scripts/bench_window_events.py [轮数，默认 5]
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from window_events import CandidateFilter, FakeBackend, WindowWatcher  # noqa: E402
+
+TITLES = {1234: "企业微信"}
+
+
+def poll_with_backoff(predicate, timeout, interval=1.0):
+    """send_to_wework 原来的轮询方式：间隔从 interval 起按 1.5 倍退避，上限 2 秒"""
+    checks = 0
+    start = time.time()
+    delay = interval
+    while time.time() - start < timeout:
+        checks += 1
+        if predicate():
+            return checks
+        time.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
+    return checks
+
+
+def simulate(appear_at, backend):
+    """appear_at 秒后窗口出现；期间每 50ms 有一个无关窗口事件"""
+    state = {"appeared": None}
+    stop = threading.Event()
+
+    def world():
+        start = time.perf_counter()
+        while not stop.is_set():
+            if state["appeared"] is None and time.perf_counter() - start >= appear_at:
+                state["appeared"] = time.perf_counter()
+                if backend:
+                    backend.emit("show", 1234)
+            elif backend:
+                backend.emit("namechange", 1)
+            time.sleep(0.05)
+
+    thread = threading.Thread(target=world, daemon=True)
+    thread.start()
+    return state, stop
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    random.seed(7)
+    appear_times = [random.uniform(0.5, 4.0) for _ in range(rounds)]
+    for mode in ("polling", "events", "filtered"):
+        latencies = []
+        total_checks = 0
+        for appear_at in appear_times:
+            backend = FakeBackend() if mode != "polling" else None
+            event_filter = None
+            if mode == "filtered":
+                event_filter = CandidateFilter(lambda title: "企业微信" in title, lambda hwnd: TITLES.get(hwnd, ""))
+            watcher = WindowWatcher(backend, event_filter=event_filter).start() if backend else None
+            state, stop = simulate(appear_at, backend)
+            found = lambda: state["appeared"] is not None  # noqa: E731
+            if watcher:
+                watcher.wait_until(found, timeout=10)
+                total_checks += watcher.checks
+            else:
+                total_checks += poll_with_backoff(found, timeout=10)
+            latencies.append((time.perf_counter() - state["appeared"]) * 1000)
+            stop.set()
+        print(f"[{mode:<8}] discovery latency avg {sum(latencies) / rounds:7.1f} ms, "
+              f"max {max(latencies):7.1f} ms, checks {total_checks / rounds:5.1f}/round")
+
+
+if __name__ == "__main__":
+    main()
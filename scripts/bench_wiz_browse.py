@@ -0,0 +1,66 @@
+"""wiz_work_repo_tool 历史浏览基准：对比旧写法每次 rerun 全量处理与 HistoryIndex。
+
+旧写法每次 rerun：按 user/dept 过滤并排序找上次明日计划，构建整张标签列表并两次反转。
+新写法：索引只在历史变化时构建一次，之后每次 rerun 只查字典、切一页标签。用法：
+
+    python scripts/bench_wiz_browse.py [规模，逗号分隔，默认 1000,10000,100000]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wiz_history_store import HistoryIndex  # noqa: E402
+
+PAGE_SIZE = 50
+ROUNDS = 10
+
+
+def make_items(n):
+    return [(i + 1, {"user": f"user{i % 200}", "dept": f"部门{i % 5}",
+                     "date": f"20{20 + i % 6}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                     "tomorrow_plan": f"a. 计划{i}"}) for i in range(n)]
+
+
+def legacy_rerun(history_list, user, dept):
+    history = [h for h in history_list if h.get("user") == user and h.get("dept") == dept]
+    last = sorted(history, key=lambda x: x['date'], reverse=True)[0] if history else None
+    ids = [f"{h.get('user','')}|{h.get('dept','')}|{h.get('date','')}" for h in history_list[::-1]]
+    selected = ids[0]
+    h = history_list[::-1][ids.index(selected)]
+    return last, h
+
+
+def indexed_rerun(index, page, user, dept):
+    last = index.latest.get((user, dept))
+    page_ids = index.ids_by_date[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    labels = [index.label(i) for i in page_ids]
+    return last, labels
+
+
+def timed(func, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1000, 10000, 100000]
+    print(f"{'N':>7} | {'legacy':>9} | {'build':>9} {'rerun':>9} {'search':>9}   (ms)")
+    for n in sizes:
+        items = make_items(n)
+        history_list = [entry for _, entry in items]
+        legacy = timed(lambda: legacy_rerun(history_list, "user7", "部门2"))
+        start = time.perf_counter()
+        index = HistoryIndex(items)
+        build = (time.perf_counter() - start) * 1000
+        rerun = timed(lambda: indexed_rerun(index, n // PAGE_SIZE // 2 + 1, "user7", "部门2"), 200)
+        search = timed(lambda: index.search("user7|部门2"))
+        assert legacy_rerun(history_list, "user7", "部门2")[0] is index.latest[("user7", "部门2")]
+        print(f"{n:>7} | {legacy:9.2f} | {build:9.2f} {rerun:9.3f} {search:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
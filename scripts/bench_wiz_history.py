@@ -0,0 +1,90 @@
+"""wiz_work_repo_tool 历史存储基准：对比旧版整表 history.json 与只追加的 HistoryStore。
+
+对每个规模 N 分别测量：
+- rerun：旧版每次 load_json 整个文件；新版 refresh()（无变化 / 另一会话刚追加一条）
+- submit：旧版 append 后 save_json 整表重写；新版 append 一行
+新版的 rerun 和 submit 耗时应不随 N 增长。用法：
+
+    python scripts/bench_wiz_history.py [规模，逗号分隔，默认 100,1000,10000,100000]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wiz_history_store import HistoryStore, import_legacy  # noqa: E402
+
+ROUNDS = 20
+
+
+def make_entry(i):
+    today = f"a. 完成模块{i}开发80%\nb. 联调接口{i}"
+    plan = f"a. 继续模块{i}测试"
+    return {"user": f"user{i % 20}", "dept": "研发部", "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "report": f"姓名：user{i % 20}  部门：研发部\n{today}\n{plan}\n",
+            "today_work": today, "tomorrow_plan": plan}
+
+
+def timed(func, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def bench(n, tmp):
+    legacy = os.path.join(tmp, f"history_{n}.json")
+    entries = [make_entry(i) for i in range(n)]
+    with open(legacy, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+
+    def legacy_load():
+        with open(legacy, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def legacy_submit():
+        data = legacy_load()
+        data.append(make_entry(n))
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    rounds = ROUNDS if n <= 10000 else 3
+    old_rerun = timed(legacy_load, rounds)
+    old_submit = timed(legacy_submit, rounds)
+
+    journal = os.path.join(tmp, f"history_{n}.jsonl")
+    import_legacy(legacy, journal)
+    start = time.perf_counter()
+    store = HistoryStore(journal)
+    store.entries()
+    cold = (time.perf_counter() - start) * 1000
+    other = HistoryStore(journal)  # 模拟另一个会话
+    idle = timed(store.refresh)
+    new_submit = timed(lambda: other.append(make_entry(n)))
+
+    def rerun_after_append():
+        other.append(make_entry(n))
+        start = time.perf_counter()
+        store.refresh()
+        store.entries()
+        return time.perf_counter() - start
+
+    after_append = sum(rerun_after_append() for _ in range(ROUNDS)) * 1000 / ROUNDS
+    print(f"{n:>7} | {old_rerun:9.2f} {old_submit:9.2f} | {cold:9.1f} {idle:9.3f} {after_append:9.3f} "
+          f"{new_submit:9.3f}")
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1].split(",")] if len(sys.argv) > 1 else [100, 1000, 10000, 100000]
+    print(f"{'N':>7} | {'json.rerun':>9} {'json.save':>9} | {'log.open':>9} {'log.idle':>9} "
+          f"{'log.rerun':>9} {'log.add':>9}   (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            bench(n, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""调试截图：截屏只在内存里进环形缓冲，编码和写盘放到后台线程，不占发送关键路径。
+
+级别（环境变量 WEWORK_DEBUG_CAPTURE）：
+- off：完全不截图。
+- failure（默认）：最近 RING_SIZE 帧留在内存（总像素数据不超过 RING_BYTES，超出时丢最旧的），
+  只有运行失败时才写盘；成功时零磁盘 I/O。
+- always：每帧都交给后台线程写盘（有界队列，写不过来时丢帧而不是阻塞发送）。
+
+编码（环境变量 WEWORK_CAPTURE_FORMAT）：png（compress_level=1，默认）、raw（BMP，
+不压缩最快、文件最大）、qoi（Pillow 支持写 QOI 时可用，否则退回 png）。"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from PIL import Image
+
+RING_SIZE = 12
+# 环形缓冲的像素数据上限；整屏 4K 一帧约 25MB，按帧数限制不够
+RING_BYTES = 64 * 1024 * 1024
+QUEUE_SIZE = 8
+LEVELS = ("off", "failure", "always")
+
+_FORMATS = {
+    "png": ("png", {"format": "PNG", "compress_level": 1}),
+    "raw": ("bmp", {"format": "BMP"}),
+    "qoi": ("qoi", {"format": "QOI"}),
+}
+
+
+def _resolve_format(name):
+    if name == "qoi":
+        Image.init()
+        if "QOI" not in Image.SAVE:
+            name = "png"
+    return _FORMATS.get(name, _FORMATS["png"])
+
+
+def _frame_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+class DebugCapture:
+    """grab(rect) 返回 RGB Image；rect 为 None 表示整个虚拟屏幕"""
+
+    def __init__(self, out_dir, grab, level="failure", fmt="png", log=print):
+        self.out_dir = out_dir
+        self.grab = grab
+        self.level = level if level in LEVELS else "failure"
+        self.ext, self.save_kwargs = _resolve_format(fmt)
+        self.log = log
+        self._ring = deque()
+        self._ring_bytes = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = None
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.grab_ms = 0.0
+
+    def capture(self, tag, rect=None):
+        """截一帧。只做截图（几毫秒），不编码不写盘"""
+        if self.level == "off":
+            return
+        start = time.perf_counter()
+        try:
+            img = self.grab(rect)
+        except Exception as exc:
+            self.log(f"SCREENSHOT_FAILED: {tag} {exc}")
+            return
+        self.grab_ms += (time.perf_counter() - start) * 1000
+        self.captured += 1
+        frame = (datetime.now().strftime("%H%M%S_%f")[:-3], tag, img)
+        if self.level == "always":
+            self._enqueue(frame, block=False)
+        else:
+            self._remember(frame)
+
+    def _remember(self, frame):
+        img = frame[2]
+        self._ring.append(frame)
+        self._ring_bytes += _frame_bytes(img)
+        # 最新一帧总是保留
+        while len(self._ring) > 1 and (len(self._ring) > RING_SIZE or self._ring_bytes > RING_BYTES):
+            self._ring_bytes -= _frame_bytes(self._ring.popleft()[2])
+
+    def finish(self, failed):
+        """运行结束：失败时把环形缓冲中的帧写盘；等待后台写完。返回写出的文件数"""
+        if failed and self.level == "failure":
+            for frame in self._ring:
+                self._enqueue(frame, block=True)
+        self._ring.clear()
+        self._ring_bytes = 0
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self.log(f"CAPTURE: level={self.level} captured={self.captured} written={self.written} "
+                 f"dropped={self.dropped} grab={self.grab_ms:.0f}ms")
+        return self.written
+
+    def _enqueue(self, frame, block):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="debug-capture", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put(frame, block=block)
+        except queue.Full:
+            self.dropped += 1
+
+    def _writer(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            ts, tag, img = frame
+            path = os.path.join(self.out_dir, f"{ts}_{tag}.{self.ext}")
+            try:
+                img.save(path, **self.save_kwargs)
+                self.written += 1
+                self.log(f"SCREENSHOT: {tag} -> {path}")
+            except Exception as exc:
+                self.log(f"SCREENSHOT_FAILED: {tag} {exc}")
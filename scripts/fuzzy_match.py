@@ -0,0 +1,225 @@
+"""OCR 文本与群名的模糊匹配。
+
+- bounded_levenshtein：带状（banded）编辑距离，只计算对角线附近 2k+1 宽的带，
+  一旦整行都超过 k 立即返回，低于阈值的候选几乎不花时间。
+- myers_distance：Myers/Hyyrö 位并行编辑距离，模式串每个字符一个比特位
+  （Python 大整数，长度不受 64 限制），每个文本字符只需十几次位运算。
+- Matcher：一次性给出本次要发送的所有群名并预先处理好，每个 OCR 文本块只做一次
+  去成员数/规范化，再对目标打分；send_to_wework.py 的搜索结果和会话标题都经它匹配。
+
+匹配规则与原 send_to_wework.py 一致：搜索结果用 result_match，会话标题用 title_match。"""
+
+import re
+
+THRESHOLD = 0.85
+
+# 群成员数后缀，如"（22）"
+_MEMBER_COUNT = re.compile(r"[（(]\d+[)）]")
+# 空白、标点、下划线
+_PUNCT = re.compile(r"[\s\W_]+")
+
+
+def strip_member_count(text):
+    return _MEMBER_COUNT.sub("", text).strip()
+
+
+def normalize(text):
+    """去掉空白和标点，便于严格比较"""
+    return _PUNCT.sub("", text)
+
+
+def levenshtein(s1, s2):
+    """完整的 Levenshtein 编辑距离（基准对照用）"""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if not s2:
+        return len(s1)
+    prev = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        curr = [i + 1]
+        for j, c2 in enumerate(s2):
+            curr.append(min(prev[j + 1] + 1, curr[j] + 1, prev[j] + (c1 != c2)))
+        prev = curr
+    return prev[-1]
+
+
+def bounded_levenshtein(s1, s2, k):
+    """编辑距离不超过 k 时返回准确值，否则返回 k + 1"""
+    n, m = len(s1), len(s2)
+    if abs(n - m) > k:
+        return k + 1
+    if n == 0 or m == 0:
+        return max(n, m)
+    over = k + 1
+    # prev[j]：s1 前 i 个字符与 s2 前 j 个字符的距离，带外视为 over
+    prev = [j if j <= k else over for j in range(m + 1)]
+    for i in range(1, n + 1):
+        lo = max(1, i - k)
+        hi = min(m, i + k)
+        curr = [over] * (m + 1)
+        curr[0] = i if i <= k else over
+        c1 = s1[i - 1]
+        row_min = curr[0]
+        for j in range(lo, hi + 1):
+            d = prev[j - 1] + (c1 != s2[j - 1])
+            if prev[j] + 1 < d:
+                d = prev[j] + 1
+            if curr[j - 1] + 1 < d:
+                d = curr[j - 1] + 1
+            if d > over:
+                d = over
+            curr[j] = d
+            if d < row_min:
+                row_min = d
+        if row_min > k:
+            return over
+        prev = curr
+    return min(prev[m], over)
+
+
+def build_peq(pattern):
+    """Myers 算法的字符位掩码表：peq[c] 的第 i 位表示 pattern[i] == c"""
+    peq = {}
+    for i, c in enumerate(pattern):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def myers_distance(pattern, text, peq=None):
+    """位并行计算 pattern 与 text 的 Levenshtein 距离；peq 可预先用 build_peq 生成复用"""
+    m = len(pattern)
+    if m == 0:
+        return len(text)
+    if peq is None:
+        peq = build_peq(pattern)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def similarity(s1, s2, threshold=None, distance=None):
+    """返回 0-1 相似度（1 - 编辑距离/较长串长度）。
+
+    给出 threshold 时用带状算法：结果低于阈值时只保证返回值 < threshold，不再精确。
+    distance 可传入自定义的距离函数（如 Matcher 预建位掩码表的 Myers 实现）。"""
+    longest = max(len(s1), len(s2))
+    if longest == 0:
+        return 1.0
+    if distance is not None:
+        return 1.0 - distance(s1, s2) / longest
+    if threshold is None:
+        return 1.0 - levenshtein(s1, s2) / longest
+    k = int((1.0 - threshold) * longest + 1e-9)
+    return 1.0 - bounded_levenshtein(s1, s2, k) / longest
+
+
+def result_match(group, text, threshold=THRESHOLD, distance=None):
+    """搜索结果项是否对应群名：子串包含（且长度不少于群名 60%）或模糊相似。
+    返回匹配原因字符串，不匹配返回 None"""
+    return _result_match_prepared(group, strip_member_count(text), threshold, distance)
+
+
+def _result_match_prepared(group, text_clean, threshold, distance):
+    if group in text_clean or text_clean in group:
+        if min(len(text_clean), len(group)) >= len(group) * 0.6:
+            return "substring"
+    sim = similarity(group, text_clean, threshold, distance)
+    if sim >= threshold:
+        return f"fuzzy(sim={sim:.2f})"
+    return None
+
+
+def title_match(group, text, threshold=THRESHOLD, distance=None):
+    """会话标题是否等于群名：规范化后相等、包含且最多多 4 个字符，或模糊相似。
+    返回匹配原因字符串，不匹配返回 None"""
+    return _title_match_prepared(normalize(group), normalize(text), threshold, distance)
+
+
+def _title_match_prepared(group_norm, t_norm, threshold, distance):
+    if t_norm == group_norm:
+        return "exact"
+    if group_norm in t_norm and len(t_norm) <= len(group_norm) + 4:
+        return "near"
+    sim = similarity(group_norm, t_norm, threshold, distance)
+    if sim >= threshold:
+        return f"fuzzy(sim={sim:.2f})"
+    return None
+
+
+def _same(text):
+    return text
+
+
+# 内置规则拆成 (目标预处理, 文本预处理, 对预处理结果打分)，Matcher 据此只处理一次
+_PREPARED_RULES = {
+    result_match: (_same, strip_member_count, _result_match_prepared),
+    title_match: (normalize, normalize, _title_match_prepared),
+}
+
+
+class Matcher:
+    """多目标匹配：targets 为群名列表，rule 为 result_match 或 title_match
+    （也可传同签名的自定义函数，此时不做预处理）。
+
+    method="banded"（默认）用带状编辑距离提前退出；method="myers" 为每个目标
+    预建位掩码表，用位并行算法计算距离。"""
+
+    def __init__(self, targets, rule=result_match, threshold=THRESHOLD, method="banded"):
+        self.targets = list(dict.fromkeys(targets))
+        self.rule = rule
+        self.threshold = threshold
+        self._prep_target, self._prep_text, self._score = _PREPARED_RULES.get(rule, (_same, _same, rule))
+        self._prepared = {target: self._prep_target(target) for target in self.targets}
+        self._peqs = {}
+        self.distance = self._myers if method == "myers" else None
+        if method == "myers":
+            for prepared in self._prepared.values():
+                self._peqs[prepared] = build_peq(prepared)
+
+    def _myers(self, pattern, text):
+        peq = self._peqs.get(pattern)
+        if peq is None:
+            peq = self._peqs[pattern] = build_peq(pattern)
+        return myers_distance(pattern, text, peq)
+
+    def _target(self, target):
+        prepared = self._prepared.get(target)
+        return self._prep_target(target) if prepared is None else prepared
+
+    def match(self, target, texts):
+        """单个目标对一屏文本块打分，返回 [(文本块下标, 原因), ...]"""
+        prepared = self._target(target)
+        hits = []
+        for idx, text in enumerate(texts):
+            reason = self._score(prepared, self._prep_text(text), self.threshold, self.distance)
+            if reason:
+                hits.append((idx, reason))
+        return hits
+
+    def match_all(self, texts):
+        """对每个文本块和每个目标打分，一遍扫描，文本块只预处理一次。
+
+        返回 {target: [(文本块下标, 原因), ...]}，没有命中的目标对应空列表"""
+        hits = {target: [] for target in self.targets}
+        for idx, text in enumerate(texts):
+            text = self._prep_text(text)
+            for target in self.targets:
+                reason = self._score(self._prepared[target], text, self.threshold, self.distance)
+                if reason:
+                    hits[target].append((idx, reason))
+        return hits
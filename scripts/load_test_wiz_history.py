@@ -0,0 +1,126 @@
+"""wiz_work_repo_tool 并发写入压测：N 个模拟会话同时提交，检查有没有丢失的汇报。
+
+每个提交者提交 M 份汇报（其中每 10 份删除一份自己较早的汇报，触发墓碑和后台压缩），
+结束后重新打开日志核对：每个未删除的 (提交者, 序号) 恰好出现一次、id 不重复。
+--legacy 时用旧写法（整表读入、追加、整表写回）对照，通常会丢数据。用法：
+
+    python scripts/load_test_wiz_history.py [提交者数，默认 8] [每人提交数，默认 200] [--threads] [--legacy]
+
+默认每个提交者一个进程（模拟多个服务进程）；--threads 时在同一进程内用线程，
+共享一个 HistoryStore（模拟 Streamlit 多会话共用 cache_resource）。
+"""
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wiz_history_store  # noqa: E402
+from wiz_history_store import HistoryStore  # noqa: E402
+
+DELETE_EVERY = 10
+# 压测时降低压缩门槛，让压缩和并发追加交错发生
+COMPACT_MIN_DEAD = 20
+
+
+def make_entry(worker, seq):
+    return {"user": f"user{worker}", "dept": "研发部", "date": "2025-06-01", "seq": seq,
+            "report": f"worker {worker} report {seq}"}
+
+
+def submit_store(path, worker, count, store=None):
+    store = store or HistoryStore(path)
+    own = []
+    deleted = []
+    for seq in range(count):
+        own.append(store.append(make_entry(worker, seq)))
+        if seq % DELETE_EVERY == DELETE_EVERY - 1:
+            victim = own.pop(0)
+            if store.delete(victim):
+                deleted.append(victim)
+    return deleted
+
+
+def submit_legacy(path, worker, count):
+    for seq in range(count):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError:
+            data = []  # 读到别人写了一半的文件
+        data.append(make_entry(worker, seq))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    return []
+
+
+def _process_main(args):
+    path, worker, count, legacy = args
+    wiz_history_store.COMPACT_MIN_DEAD = COMPACT_MIN_DEAD
+    return submit_legacy(path, worker, count) if legacy else submit_store(path, worker, count)
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    workers = int(args[0]) if args else 8
+    count = int(args[1]) if len(args) > 1 else 200
+    use_threads = "--threads" in sys.argv
+    legacy = "--legacy" in sys.argv
+    wiz_history_store.COMPACT_MIN_DEAD = COMPACT_MIN_DEAD
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.json" if legacy else "history.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[]" if legacy else "")
+        start = time.perf_counter()
+        if use_threads:
+            shared = None if legacy else HistoryStore(path)
+            results = [None] * workers
+
+            def run(worker):
+                if legacy:
+                    results[worker] = submit_legacy(path, worker, count)
+                else:
+                    results[worker] = submit_store(path, worker, count, shared)
+
+            threads = [threading.Thread(target=run, args=(w,)) for w in range(workers)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                results = pool.map(_process_main, [(path, w, count, legacy) for w in range(workers)])
+        elapsed = time.perf_counter() - start
+        time.sleep(0.2)  # 等后台压缩线程结束
+
+        deleted = sum(len(r) for r in results)
+        if legacy:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            ids = list(range(len(entries)))
+        else:
+            store = HistoryStore(path)
+            ids = [entry_id for entry_id, _ in store.items()]
+            entries = store.entries()
+            with open(path, "rb") as f:
+                lines = f.read().count(b"\n")
+        expected = workers * count - deleted
+        seen = {(e["user"], e["seq"]) for e in entries}
+        mode = ("legacy" if legacy else "store") + (" threads" if use_threads else " processes")
+        print(f"[{mode}] {workers} x {count} submits in {elapsed:.2f}s "
+              f"({workers * count / elapsed:.0f} submits/s), deletes {deleted}")
+        print(f"  entries {len(entries)} / expected {expected}, unique {len(seen)}, "
+              f"lost {expected - len(seen)}, duplicate ids {len(ids) - len(set(ids))}")
+        if not legacy:
+            print(f"  log lines {lines} (compacted if < {workers * count + 2 * deleted})")
+            assert len(entries) == expected == len(seen), "lost or duplicated writes"
+            assert len(ids) == len(set(ids)), "duplicate ids"
+
+
+if __name__ == "__main__":
+    main()
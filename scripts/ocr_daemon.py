@@ -0,0 +1,248 @@
+"""常驻 OCR 服务：保持 RapidOCR 的 ONNX 模型常驻内存，避免每次发送都冷启动。
+
+send_to_wework.py 每次发送都是新进程，进程内首次构造 RapidOCR() 需要 2-3 秒。
+本服务在 127.0.0.1 的随机端口监听，启动时先跑一次空白图预热，之后按请求识别图片
+区域并返回文本框；空闲 IDLE_TIMEOUT 秒后自动退出。
+
+服务按用户隔离：端口和随机令牌写在当前用户目录下的 ENDPOINT_FILE
+（%LOCALAPPDATA% 下的 WorkReportGenerator/ocr_daemon.json，可用 WEWORK_OCR_ENDPOINT 改），
+同一台机器上其他用户读不到。除 ping 外的请求都要带令牌，否则拒绝；ping 时服务端用
+令牌对客户端的随机数签名，客户端验证通过才会把截图发过去，防止连到别人占用的端口。
+
+协议（每条消息）：8 字节头（JSON 头长度、负载长度，均为大端 uint32）+ JSON 头 + 负载。
+- {"op": "ping", "nonce": n} → {"ok": true, "proof": HMAC-SHA256(令牌, n)}
+- {"op": "ocr", "token": t, "width": w, "height": h, "cls": false} + RGB 原始像素
+  → {"ok": true, "result": [[box, text, score], ...], "elapse_ms": ...}
+- {"op": "shutdown", "token": t} → {"ok": true}，随后退出
+
+单独运行：python scripts/ocr_daemon.py；打包后由 send_to_wework.exe --ocr-daemon 启动。
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+HOST = "127.0.0.1"
+ENDPOINT_FILE = os.environ.get("WEWORK_OCR_ENDPOINT") or os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "WorkReportGenerator", "ocr_daemon.json")
+IDLE_TIMEOUT = 30 * 60
+CONNECT_TIMEOUT = 0.3
+REQUEST_TIMEOUT = 15
+# 单条消息上限，未认证的连接也不能让服务分配过大的内存
+MAX_HEADER = 64 * 1024
+MAX_PAYLOAD = 128 * 1024 * 1024
+
+_FRAME = struct.Struct(">II")
+
+
+class OcrDaemonError(Exception):
+    """OCR 服务不可用或返回错误，调用方应回退到进程内 OCR"""
+
+
+def _recv_exact(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise OcrDaemonError("connection closed")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_msg(sock, header, payload=b""):
+    raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_FRAME.pack(len(raw), len(payload)) + raw + payload)
+
+
+def recv_msg(sock):
+    header_len, payload_len = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    if header_len > MAX_HEADER or payload_len > MAX_PAYLOAD:
+        raise OcrDaemonError(f"message too large ({header_len}+{payload_len} bytes)")
+    header = json.loads(_recv_exact(sock, header_len).decode("utf-8"))
+    payload = _recv_exact(sock, payload_len) if payload_len else b""
+    return header, payload
+
+
+def _proof(token, nonce):
+    return hmac.new(token.encode("ascii"), nonce.encode("ascii"), hashlib.sha256).hexdigest()
+
+
+def read_endpoint(endpoint_file=ENDPOINT_FILE):
+    """读取服务写下的 {"port", "token", "pid"}；文件不存在或损坏时返回 None"""
+    try:
+        with open(endpoint_file, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        return info if isinstance(info.get("port"), int) and info.get("token") else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_endpoint(endpoint_file, info):
+    # 先写临时文件再替换，客户端不会读到半个文件；POSIX 下只有本人可读
+    os.makedirs(os.path.dirname(endpoint_file), exist_ok=True)
+    tmp = f"{endpoint_file}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.replace(tmp, endpoint_file)
+
+
+class OcrClient:
+    """OCR 服务客户端，调用方式与 RapidOCR 实例相同：result, elapse = ocr(img, cls=False)
+
+    每次调用都重新读端点文件（服务可能已重启换了端口）；对同一端点第一次发送图片前
+    先用 ping 确认对方持有令牌。"""
+
+    def __init__(self, endpoint_file=ENDPOINT_FILE):
+        self.endpoint_file = endpoint_file
+        self._verified = None  # 已验证过的 (port, token)
+
+    def _endpoint(self):
+        info = read_endpoint(self.endpoint_file)
+        if info is None:
+            raise OcrDaemonError("OCR daemon not running")
+        return info["port"], info["token"]
+
+    def _request(self, port, header, payload=b"", timeout=REQUEST_TIMEOUT):
+        try:
+            with socket.create_connection((HOST, port), timeout=CONNECT_TIMEOUT) as sock:
+                sock.settimeout(timeout)
+                send_msg(sock, header, payload)
+                reply, _ = recv_msg(sock)
+        except (OSError, ValueError) as exc:
+            raise OcrDaemonError(str(exc))
+        if not reply.get("ok"):
+            raise OcrDaemonError(reply.get("error", "unknown error"))
+        return reply
+
+    def _verify(self, port, token):
+        nonce = secrets.token_hex(16)
+        reply = self._request(port, {"op": "ping", "nonce": nonce}, timeout=CONNECT_TIMEOUT)
+        if not hmac.compare_digest(str(reply.get("proof", "")), _proof(token, nonce)):
+            raise OcrDaemonError(f"port {port} is not our OCR daemon")
+        self._verified = (port, token)
+
+    def _call(self, header, payload=b""):
+        port, token = self._endpoint()
+        if self._verified != (port, token):
+            self._verify(port, token)
+        return self._request(port, dict(header, token=token), payload)
+
+    def ping(self):
+        try:
+            self._verify(*self._endpoint())
+            return True
+        except OcrDaemonError:
+            return False
+
+    def shutdown(self):
+        self._call({"op": "shutdown"})
+
+    def __call__(self, img, cls=False):
+        img = img.convert("RGB")
+        reply = self._call({"op": "ocr", "width": img.width, "height": img.height, "cls": cls},
+                           img.tobytes())
+        result = [(box, text, score) for box, text, score in reply["result"]] or None
+        return result, reply.get("elapse_ms")
+
+
+def start_detached():
+    """后台启动 OCR 服务进程（不等待，不占用本次发送时间）。
+
+    打包后 sys.executable 是 send_to_wework.exe，用 --ocr-daemon 参数进入服务模式。"""
+    if getattr(sys, "frozen", False):
+        cmd = [sys.executable, "--ocr-daemon"]
+    else:
+        cmd = [sys.executable, os.path.abspath(__file__)]
+    flags = 0
+    if sys.platform == "win32":
+        flags = (subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                 | getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, creationflags=flags, close_fds=True)
+
+
+def _jsonable_result(result):
+    return [[[[float(x), float(y)] for x, y in box], text, float(score)]
+            for box, text, score in (result or [])]
+
+
+def serve(endpoint_file=ENDPOINT_FILE, idle_timeout=IDLE_TIMEOUT):
+    """运行 OCR 服务直到空闲超时或收到 shutdown；本用户已有实例在运行时直接返回"""
+    if OcrClient(endpoint_file).ping():
+        return
+    from PIL import Image
+    from rapidocr_onnxruntime import RapidOCR
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind((HOST, 0))
+    server.listen(4)
+    server.settimeout(60)
+    port = server.getsockname()[1]
+    token = secrets.token_hex(32)
+
+    ocr = RapidOCR()
+    # 预热：首次推理会初始化 ONNX 会话和内存池
+    ocr(Image.new("RGB", (64, 32), "white"), cls=False)
+    # 预热完才公布端点，之前的发送照常走进程内 OCR
+    _write_endpoint(endpoint_file, {"port": port, "token": token, "pid": os.getpid()})
+    print(f"OCR_DAEMON_READY {HOST}:{port}", flush=True)
+
+    def still_published():
+        # 两个服务同时启动时后写端点文件的胜出，另一个发现后退出
+        info = read_endpoint(endpoint_file)
+        return info is not None and info["token"] == token
+
+    last_active = time.monotonic()
+    running = True
+    while running and time.monotonic() - last_active < idle_timeout:
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            running = still_published()
+            continue
+        last_active = time.monotonic()
+        with conn:
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                header, payload = recv_msg(conn)
+                op = header.get("op")
+                if op == "ping":
+                    send_msg(conn, {"ok": True, "proof": _proof(token, str(header.get("nonce", "")))})
+                elif not hmac.compare_digest(str(header.get("token", "")), token):
+                    send_msg(conn, {"ok": False, "error": "unauthorized"})
+                elif op == "shutdown":
+                    send_msg(conn, {"ok": True})
+                    running = False
+                elif op == "ocr":
+                    img = Image.frombytes("RGB", (header["width"], header["height"]), payload)
+                    start = time.perf_counter()
+                    result, _ = ocr(img, cls=header.get("cls", False))
+                    send_msg(conn, {"ok": True, "result": _jsonable_result(result),
+                                    "elapse_ms": round((time.perf_counter() - start) * 1000, 1)})
+                else:
+                    send_msg(conn, {"ok": False, "error": f"unknown op {op!r}"})
+            except Exception as exc:
+                try:
+                    send_msg(conn, {"ok": False, "error": str(exc)})
+                except OSError:
+                    pass
+    server.close()
+    if still_published():
+        try:
+            os.remove(endpoint_file)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    serve()
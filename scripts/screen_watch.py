@@ -0,0 +1,59 @@
+"""屏幕区域变化检测：用缩小的灰度图作为画面签名，判断区域是否变化/已稳定。
+
+签名是把区域缩到宽 SIGNATURE_WIDTH 的灰度图，两帧签名的平均灰度差（0-255）
+低于阈值视为未变化。截图加比较每次只需几毫秒，用来替代固定 sleep：
+画面一稳定就继续，画面没变就不必重新 OCR。"""
+
+import time
+
+from PIL import Image, ImageChops, ImageStat
+
+from ocr_batch import grab_mss
+
+SIGNATURE_WIDTH = 64
+# 平均灰度差阈值：光标闪烁、抗锯齿抖动远低于此值，列表刷新、窗口切换远高于此值
+CHANGE_THRESHOLD = 2.0
+POLL_INTERVAL = 0.05
+
+
+def signature(rect, grab=grab_mss):
+    img = grab(rect).convert("L")
+    height = max(1, round(img.height * SIGNATURE_WIDTH / max(img.width, 1)))
+    return img.resize((SIGNATURE_WIDTH, height), Image.BOX)
+
+
+def difference(sig_a, sig_b):
+    """两个签名的平均灰度差，尺寸不同（区域变了）视为完全不同"""
+    if sig_a is None or sig_b is None or sig_a.size != sig_b.size:
+        return 255.0
+    return ImageStat.Stat(ImageChops.difference(sig_a, sig_b)).mean[0]
+
+
+def wait_until_changed(rect, baseline, timeout, threshold=CHANGE_THRESHOLD, grab=grab_mss):
+    """等到区域相对 baseline 签名发生变化。返回 (是否变化, 最新签名)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        current = signature(rect, grab)
+        if difference(baseline, current) >= threshold:
+            return True, current
+        if time.monotonic() >= deadline:
+            return False, current
+        time.sleep(POLL_INTERVAL)
+
+
+def wait_until_stable(rect, timeout, stable_for=0.3, threshold=CHANGE_THRESHOLD, grab=grab_mss):
+    """等到区域连续 stable_for 秒没有变化。返回 (是否稳定, 最新签名)，超时返回 False"""
+    deadline = time.monotonic() + timeout
+    last = signature(rect, grab)
+    stable_since = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now - stable_since >= stable_for:
+            return True, last
+        if now >= deadline:
+            return False, last
+        time.sleep(POLL_INTERVAL)
+        current = signature(rect, grab)
+        if difference(last, current) >= threshold:
+            stable_since = time.monotonic()
+        last = current
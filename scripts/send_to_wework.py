@@ -9,20 +9,34 @@
 参数通过环境变量传入（避免中文命令行编码问题）：
 - WECHAT_GROUP：目标群名
 - WECHAT_MESSAGE：汇报正文（多行）
+- WECHAT_TARGETS / WECHAT_TARGETS_FILE：批量发送的目标列表（JSON 字符串 / 文件路径），
+  设置后忽略 WECHAT_GROUP。JSON 为数组，元素是群名或 {"group": 群名, "message": 正文}
+  （未给 message 的用 WECHAT_MESSAGE）；文件也可以是每行一个群名的纯文本。
+  批量模式只激活一次窗口、加载一次 OCR，逐个目标发送，失败的目标不影响后续目标，
+  每个目标的结果输出为一行 BATCH_RESULT: {json}，并写入 debug 目录的 batch_result.json。
+
+命令行参数：--ocr-daemon 作为常驻 OCR 服务运行；--dry-run 只走 OCR 路径不发送（见 dry_run）。
 
 退出码：
-- 0：发送成功
+- 0：发送成功（批量模式为全部成功）
 - 2：找不到企微窗口（未安装/启动失败）
 - 3：Python 缺少依赖
 - 4：OCR 未找到匹配群名的搜索结果
+- 5：发送前会话标题校验失败
+- 6：批量模式中部分目标发送失败
 """
 
+import atexit
 import ctypes
+import importlib.util
+import json
 import os
 import subprocess
 import sys
 import time
+import traceback
 from datetime import datetime
+from types import SimpleNamespace
 
 # 必须在导入 pyautogui/pygetwindow/mss 之前设置 DPI 感知。
 # 否则高 DPI 缩放（125%/150%/200%）下三者坐标系不一致：
@@ -43,13 +57,25 @@ try:
     import pyautogui
     import pygetwindow as gw
     import pyperclip
-    from mss import mss
-    from PIL import Image
-    from rapidocr_onnxruntime import RapidOCR
 except ImportError as exc:
     print(f"MISSING_DEP: {exc}", file=sys.stderr)
     sys.exit(3)
 
+# RapidOCR（onnxruntime/cv2/numpy，导入要 1 秒以上）只在常驻 OCR 服务不可用时由
+# _local_ocr() 导入，这里只检查是否已安装；mss、Pillow 由 ocr_batch 等模块导入。
+for _dep in ("mss", "PIL", "rapidocr_onnxruntime"):
+    if importlib.util.find_spec(_dep) is None:
+        print(f"MISSING_DEP: No module named '{_dep}'", file=sys.stderr)
+        sys.exit(3)
+
+from debug_capture import DebugCapture
+from fuzzy_match import Matcher, result_match, title_match
+from ocr_batch import BatchOcr, Region, grab_mss
+from ocr_daemon import OcrClient, OcrDaemonError, serve as serve_ocr_daemon, start_detached
+from screen_watch import signature, wait_until_changed, wait_until_stable
+from send_trace import Tracer
+from window_events import CandidateFilter, WindowWatcher, create_default_backend
+
 # 企微窗口可能在副屏（负坐标），pyautogui fail-safe 会误触发，禁用。
 pyautogui.FAILSAFE = False
 
@@ -123,22 +149,37 @@ def get_window_title(hwnd):
         return ""
 
 
-def wait_for(predicate, timeout=30, interval=0.5, desc="condition"):
-    """轮询等待条件成立。返回 predicate() 的真值或 None（超时）。
-    指数退避 interval（上限 2s）减少冷启动期无效轮询。"""
+# 窗口事件监听（WinEvent 钩子），首次使用时启动，进程退出时注销。
+_window_watcher = None
+
+
+def is_wework_candidate(title):
+    """等待的窗口只有企微主窗口和"全局搜索"浮层，其他窗口的事件在钩子里直接丢弃"""
+    return "企业微信" in title or title == "全局搜索"
+
+
+def get_window_watcher():
+    global _window_watcher
+    if _window_watcher is None:
+        _window_watcher = WindowWatcher(create_default_backend(),
+                                        event_filter=CandidateFilter(is_wework_candidate)).start()
+        atexit.register(_window_watcher.stop)
+    return _window_watcher
+
+
+def wait_window(predicate, timeout=30, desc="window"):
+    """等待窗口相关条件成立：只在窗口创建/显示/标题变化等事件到达时重新检查，
+    不再按固定间隔枚举所有窗口。返回 predicate() 的真值或 None（超时）。"""
     start = time.time()
-    delay = interval
-    while time.time() - start < timeout:
-        try:
-            result = predicate()
-            if result:
-                return result
-        except Exception as exc:
-            log(f"wait_for({desc}) predicate error: {exc}")
-        time.sleep(delay)
-        delay = min(delay * 1.5, 2.0)
-    log(f"wait_for({desc}) TIMEOUT after {timeout}s")
-    return None
+    watcher = get_window_watcher()
+    checks = watcher.checks
+    result = watcher.wait_until(predicate, timeout)
+    elapsed = time.time() - start
+    if result:
+        log(f"wait_window({desc}) ok after {elapsed:.2f}s checks={watcher.checks - checks}")
+    else:
+        log(f"wait_window({desc}) TIMEOUT after {timeout}s checks={watcher.checks - checks}")
+    return result
 
 
 WXWORK_PATHS = [
@@ -148,17 +189,73 @@ WXWORK_PATHS = [
     r"D:\Program Files (x86)\WXWork\WXWork.exe",
 ]
 
-# OCR 模型懒加载（首次调用约 2-3 秒）。
+# OCR 优先走常驻服务（ocr_daemon.py，模型已加载并预热）；服务不在时回退到进程内
+# 懒加载（首次调用约 2-3 秒），并在本次发送结束后后台拉起服务，下次发送即可复用。
+# WEWORK_OCR_DAEMON=0 关闭常驻服务。
+_USE_OCR_DAEMON = os.environ.get("WEWORK_OCR_DAEMON", "1") != "0"
 _ocr_instance = None
+_ocr_client = None  # None=尚未探测，False=不可用
 
 
-def get_ocr():
+def _local_ocr():
     global _ocr_instance
     if _ocr_instance is None:
+        from rapidocr_onnxruntime import RapidOCR
         _ocr_instance = RapidOCR()
     return _ocr_instance
 
 
+def _start_ocr_daemon():
+    try:
+        start_detached()
+    except Exception as exc:
+        print(f"OCR daemon start failed: {exc}", flush=True)
+
+
+def _ocr(img, cls=False):
+    global _ocr_client
+    if _ocr_client is None:
+        _ocr_client = False
+        if _USE_OCR_DAEMON:
+            client = OcrClient()
+            if client.ping():
+                _ocr_client = client
+                log("OCR: using warm daemon")
+            else:
+                log("OCR: daemon not running, in-process OCR (will start daemon on exit)")
+                # 放到退出时再启动，避免和本进程加载模型抢 CPU
+                atexit.register(_start_ocr_daemon)
+    if _ocr_client:
+        try:
+            return _ocr_client(img, cls=cls)
+        except OcrDaemonError as exc:
+            log(f"OCR daemon error: {exc}, fallback to in-process OCR")
+            _ocr_client = False
+    return _local_ocr()(img, cls=cls)
+
+
+def get_ocr():
+    """返回 OCR 调用入口，用法与 RapidOCR 实例相同：result, _ = get_ocr()(img, cls=False)"""
+    return _ocr
+
+
+# 所有 OCR 区域都经由批量接口：多个区域一次推理，像素未变的区域复用上次结果。
+_batch_ocr = BatchOcr(get_ocr())
+
+
+def ocr_regions(*regions):
+    """识别一个或多个 Region，返回 {name: [TextBox, ...]}（屏幕坐标）"""
+    start = time.perf_counter()
+    calls, hits = _batch_ocr.inference_calls, _batch_ocr.cache_hits
+    with tracer.span("ocr", regions=[r.name for r in regions]):
+        boxes = _batch_ocr.run(regions)
+    tracer.count("ocr_inference", _batch_ocr.inference_calls - calls)
+    tracer.count("ocr_cache_hit", _batch_ocr.cache_hits - hits)
+    log(f"OCR regions={[r.name for r in regions]} inference={_batch_ocr.inference_calls - calls} "
+        f"cache_hits={_batch_ocr.cache_hits - hits} {(time.perf_counter() - start) * 1000:.0f}ms")
+    return boxes
+
+
 # ---- 调试日志与截图 ----
 # 日志和截图保存到 C:\威智工作汇报器测试\scripts\debug\（用户指定的可写路径）。
 _DEBUG_DIR = r"C:\威智工作汇报器测试\scripts\debug"
@@ -172,8 +269,24 @@ def log(msg):
     _log_lines.append(line)
 
 
-def save_debug_log():
-    """把累计日志写入文件。"""
+# 调试截图先留在内存环形缓冲，只有失败时才由后台线程写盘（见 debug_capture.py）。
+# WEWORK_DEBUG_CAPTURE=off/failure/always，WEWORK_CAPTURE_FORMAT=png/raw/qoi。
+_capture = DebugCapture(
+    _DEBUG_DIR, grab_mss,
+    level=os.environ.get("WEWORK_DEBUG_CAPTURE", "failure"),
+    fmt=os.environ.get("WEWORK_CAPTURE_FORMAT", "png"),
+    log=log,
+)
+
+
+def save_debug_log(failed=True):
+    """把累计日志写入文件。失败时同时把内存中的调试截图写盘。"""
+    _capture.finish(failed)
+    try:
+        summary = tracer.write(_DEBUG_DIR, "failed" if failed else "ok")
+        log(f"TRACE: total={summary['total_ms']}ms phases={summary['phases']} counters={summary['counters']}")
+    except Exception as exc:
+        log(f"TRACE_WRITE_FAILED: {exc}")
     os.makedirs(_DEBUG_DIR, exist_ok=True)
     path = os.path.join(_DEBUG_DIR, "run.log")
     with open(path, "w", encoding="utf-8") as f:
@@ -181,30 +294,19 @@ def save_debug_log():
     print(f"LOG_SAVED: {path}", flush=True)
 
 
-def screenshot(tag, win=None):
-    """截图保存到 debug 目录，文件名带时间戳和标签。
-    win 传入时只截企微窗口区域，否则全屏。"""
-    os.makedirs(_DEBUG_DIR, exist_ok=True)
-    ts = datetime.now().strftime("%H%M%S_%f")[:-3]
-    path = os.path.join(_DEBUG_DIR, f"{ts}_{tag}.png")
-    try:
-        if win is not None:
-            sct = mss()
-            monitor = {
-                "top": win.top,
-                "left": win.left,
-                "width": win.right - win.left,
-                "height": win.bottom - win.top,
-            }
-            shot = sct.grab(monitor)
-            img = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
-            img.save(path)
-        else:
-            pyautogui.screenshot(path)
-        log(f"SCREENSHOT: {tag} -> {path}")
-    except Exception as exc:
-        log(f"SCREENSHOT_FAILED: {tag} {exc}")
-    return path
+# 分阶段计时，运行结束时与 run.log 一起写出 trace.json（见 send_trace.py）。
+tracer = Tracer()
+
+# 批量模式下截图标签加上目标序号前缀，便于区分。
+_shot_prefix = ""
+
+
+def screenshot(tag, win=None, rect=None):
+    """截一帧调试截图（只截图，不编码不写盘）。
+    只截 rect 或 win 窗口的区域，两者都没有（或句柄已失效）时才截整个虚拟屏幕。"""
+    if rect is None and win is not None:
+        rect = safe_win_rect(win)
+    _capture.capture(_shot_prefix + tag, rect)
 
 
 def find_wework_window():
@@ -268,31 +370,31 @@ def find_wework_hwnd():
     return found_hwnd
 
 
-def wait_window_stable(timeout=60, interval=1.0):
-    """轮询等待企微窗口稳定出现。冷启动时窗口会重建，用 hwnd（窗口句柄）
-    比较：找到窗口后记录 hwnd，等 1.5s 再查一次，若 hwnd 相同且句柄仍有效
-    （GetWindowText 能读到标题）则视为稳定。返回稳定窗口或 None。"""
-    start = time.time()
-    delay = interval
-    last_hwnd = 0
-    while time.time() - start < timeout:
-        hwnd = find_wework_hwnd()
-        if hwnd:
-            if hwnd == last_hwnd:
-                # 同一 hwnd，验证句柄仍有效。
-                if ctypes.windll.user32.IsWindow(hwnd):
-                    win = find_wework_window()
-                    if win:
-                        try:
-                            log(f"window stable: hwnd={hwnd} rect=({win.left},{win.top},{win.right},{win.bottom})")
-                            return win
-                        except Exception as exc:
-                            log(f"window stable but rect read failed: {exc}")
-            else:
-                last_hwnd = hwnd
-                log(f"window candidate: hwnd={hwnd}, waiting to confirm stability")
-        time.sleep(delay)
-        delay = min(delay * 1.5, 2.0)
+def wait_window_stable(timeout=60, settle=1.0):
+    """等待企微窗口稳定出现。冷启动时窗口会重建，用 hwnd（窗口句柄）比较：
+    窗口事件到达时查找主窗口 hwnd，找到后若 settle 秒内没有事件表明它被销毁或
+    换成了别的 hwnd，且句柄仍有效，则视为稳定。返回稳定窗口或 None。"""
+    deadline = time.time() + timeout
+    watcher = get_window_watcher()
+    while time.time() < deadline:
+        hwnd = watcher.wait_until(find_wework_hwnd, deadline - time.time())
+        if not hwnd:
+            break
+        log(f"window candidate: hwnd={hwnd}, waiting to confirm stability")
+        replaced = watcher.wait_until(
+            lambda: find_wework_hwnd() != hwnd or not ctypes.windll.user32.IsWindow(hwnd),
+            min(settle, max(deadline - time.time(), 0)))
+        if replaced:
+            log(f"window candidate hwnd={hwnd} replaced during startup")
+            continue
+        win = find_wework_window()
+        if win:
+            try:
+                log(f"window stable: hwnd={hwnd} rect=({win.left},{win.top},{win.right},{win.bottom})")
+                return win
+            except Exception as exc:
+                log(f"window stable but rect read failed: {exc}")
+        watcher.wait_event(min(settle, max(deadline - time.time(), 0)))
     log(f"wait_window_stable TIMEOUT after {timeout}s")
     log("diagnosing: listing all wechat/wework windows")
     log_all_wework_windows()
@@ -340,6 +442,19 @@ def activate_window(win):
     return False
 
 
+def settle(rect, baseline, desc, change_timeout=1.0, stable_timeout=1.0):
+    """替代固定 sleep：等区域相对 baseline 签名发生变化，再等它稳定下来。
+    画面一稳定立即返回；超时未变化返回 False，调用方据此跳过无意义的重新 OCR。"""
+    start = time.perf_counter()
+    with tracer.span("settle", desc=desc):
+        changed, _ = wait_until_changed(rect, baseline, change_timeout)
+        stable = False
+        if changed:
+            stable, _ = wait_until_stable(rect, stable_timeout)
+    log(f"SETTLE {desc}: changed={changed} stable={stable} {(time.perf_counter() - start) * 1000:.0f}ms")
+    return changed
+
+
 def safe_win_rect(win):
     """安全获取窗口 rect。句柄失效返回 None。"""
     try:
@@ -348,30 +463,28 @@ def safe_win_rect(win):
         return None
 
 
-def edit_distance(s1, s2):
-    """计算两个字符串的 Levenshtein 编辑距离。
-    用于容错 OCR 识别的错别字、漏字（如"赛事"→"赛中"、"赛事平台"→"事平台"）。"""
-    if len(s1) < len(s2):
-        s1, s2 = s2, s1
-    if len(s2) == 0:
-        return len(s1)
-    prev = list(range(len(s2) + 1))
-    for i, c1 in enumerate(s1):
-        curr = [i + 1]
-        for j, c2 in enumerate(s2):
-            curr.append(min(prev[j + 1] + 1, curr[j] + 1, prev[j] + (c1 != c2)))
-        prev = curr
-    return prev[-1]
-
-
-def similarity(s1, s2):
-    """返回 0-1 相似度，1=完全相同。基于编辑距离归一化。"""
-    if not s1 and not s2:
-        return 1.0
-    m = max(len(s1), len(s2))
-    if m == 0:
-        return 1.0
-    return 1.0 - edit_distance(s1, s2) / m
+def search_results_rect(region):
+    """搜索结果列表区域：浮层左 55% 宽度（右侧是详情预览）"""
+    left, top, right, bottom = region
+    return (left, top, left + int((right - left) * 0.55), bottom)
+
+
+def conversation_title_rect(win):
+    """会话标题区域：窗口顶部居中，中间 40% 宽度 + 顶部 80px"""
+    win_width = win.right - win.left
+    return (win.left + int(win_width * 0.3), win.top, win.left + int(win_width * 0.7), win.top + 80)
+
+
+# 搜索结果和会话标题的匹配器：run_batch/main 开始时用本次所有目标群名建好，
+# 群名只预处理一次，每屏 OCR 文本块也只规范化一次
+_result_matcher = Matcher([], rule=result_match)
+_title_matcher = Matcher([], rule=title_match)
+
+
+def set_match_targets(groups):
+    global _result_matcher, _title_matcher
+    _result_matcher = Matcher(groups, rule=result_match)
+    _title_matcher = Matcher(groups, rule=title_match)
 
 
 def ocr_find_group(region, group):
@@ -383,73 +496,30 @@ def ocr_find_group(region, group):
 
     加速策略：
     1. 只截浮层左 55% 宽度（搜索结果列表在此区域，右侧是详情预览不需要）。
-    2. 截图 resize 到 50% 再喂给 OCR。
-    3. cls=False 跳过方向分类（企微文字都是正向的，不需要分类）。
-    坐标换算：OCR 返回的是缩小后图片的坐标，需 /scale 还原 + 截图偏移。
+    2. 经 ocr_regions 缩小 50% 识别（cls=False），画面未变时重试直接复用结果。
 
     排除搜索框区域（顶部 150px）。优先选字号最大的命中项。"""
     left, top, right, bottom = region
     full_width = right - left
-    # 只截浮层左 55% 宽度，搜索结果列表在此区域。
-    crop_left = left
-    crop_top = top
-    crop_right = left + int(full_width * 0.55)
-    crop_bottom = bottom
+    crop_left, crop_top, crop_right, crop_bottom = search_results_rect(region)
     crop_width = crop_right - crop_left
     log(f"OCR crop rect: ({crop_left},{crop_top},{crop_right},{crop_bottom}) w={crop_width} (55% of {full_width})")
 
-    sct = mss()
-    monitor = {
-        "top": crop_top,
-        "left": crop_left,
-        "width": crop_right - crop_left,
-        "height": crop_bottom - crop_top,
-    }
-    shot = sct.grab(monitor)
-    img = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
-    # resize 到 50% 加速 OCR。
-    scale = 0.5
-    small = img.resize(
-        (int(img.width * scale), int(img.height * scale)), Image.LANCZOS
-    )
-    log(f"OCR resized: {img.width}x{img.height} -> {small.width}x{small.height}")
-
-    ocr = get_ocr()
-    # cls=False 跳过方向分类，企微文字都是正向的，省约 30% OCR 耗时。
-    result, _ = ocr(small, cls=False)
+    result = ocr_regions(Region("search_results", (crop_left, crop_top, crop_right, crop_bottom)))["search_results"]
     if not result:
         log("OCR returned no results")
         return None
     log(f"OCR found {len(result)} text blocks")
 
+    blocks = [(idx, box) for idx, box in enumerate(result) if box.score >= 0.5]
+    # 去掉群成员数后缀后匹配：子串包含 OR 编辑距离模糊匹配（容错 OCR 错别字/漏字，
+    # 如"赛事"→"赛中"），规则见 fuzzy_match.result_match。
+    reasons = dict(_result_matcher.match(group, [box.text for _, box in blocks]))
     candidates = []
-    for idx, (box, text, score) in enumerate(result):
-        if score < 0.5:
-            continue
-        # box 是缩小后图片的坐标，还原到屏幕绝对坐标。
-        xs = [p[0] / scale for p in box]
-        ys = [p[1] / scale for p in box]
-        height = max(ys) - min(ys)
-        width = max(xs) - min(xs)
-        cx = sum(xs) / 4 + crop_left
-        cy = sum(ys) / 4 + crop_top
+    for pos, (idx, (text, score, cx, cy, width, height)) in enumerate(blocks):
         log(f"  [{idx}] text={text!r} score={score:.2f} h={int(height)} w={int(width)} center=({int(cx)},{int(cy)})")
-        # 去除 OCR 文本中常见的群成员数后缀（如"（22）"）再匹配，避免后缀干扰相似度。
-        import re
-        text_clean = re.sub(r'[（(]\d+[)）]', '', text).strip()
-        # 匹配策略：子串包含 OR 编辑距离模糊匹配（容错 OCR 错别字/漏字，如"赛事"→"赛中"）。
-        matched = False
-        match_reason = ""
-        if group in text_clean or text_clean in group:
-            if min(len(text_clean), len(group)) >= len(group) * 0.6:
-                matched = True
-                match_reason = "substring"
-        if not matched:
-            sim = similarity(group, text_clean)
-            if sim >= 0.85:
-                matched = True
-                match_reason = f"fuzzy(sim={sim:.2f})"
-        if matched:
+        match_reason = reasons.get(pos)
+        if match_reason:
             if cy < top + 150:
                 log(f"    -> matched({match_reason}) but in search box area, skip")
                 continue
@@ -477,62 +547,24 @@ def verify_conversation(win, group):
 
     加速策略：
     1. 会话标题在窗口顶部居中，只截中间 40% 宽度 + 顶部 80px 高度。
-    2. resize 50% 缩小图片。
-    3. cls=False 跳过方向分类。"""
-    left, top = win.left, win.top
-    win_width = win.right - win.left
-    # 会话标题在窗口顶部居中，截中间 40% 宽度 + 顶部 80px。
-    crop_left = left + int(win_width * 0.3)
-    crop_right = left + int(win_width * 0.7)
-    crop_top = top
-    crop_bottom = top + 80
+    2. 经 ocr_regions 缩小 50% 识别，画面未变时重试直接复用结果。"""
+    crop_left, crop_top, crop_right, crop_bottom = conversation_title_rect(win)
     log(f"VERIFY crop: ({crop_left},{crop_top},{crop_right},{crop_bottom}) w={crop_right-crop_left}")
 
-    sct = mss()
-    monitor = {
-        "top": crop_top,
-        "left": crop_left,
-        "width": crop_right - crop_left,
-        "height": crop_bottom - crop_top,
-    }
-    shot = sct.grab(monitor)
-    img = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
-    # resize 50% 加速。
-    scale = 0.5
-    small = img.resize((int(img.width * scale), int(img.height * scale)), Image.LANCZOS)
-    ocr = get_ocr()
-    # cls=False 跳过方向分类。
-    result, _ = ocr(small, cls=False)
+    result = ocr_regions(Region("conversation_title", (crop_left, crop_top, crop_right, crop_bottom)))["conversation_title"]
     if not result:
         log("VERIFY: OCR no results")
         return False
 
-    # 去标点空格的规范化函数，便于严格比较。
-    import re
-    def norm(s):
-        return re.sub(r"[\s\W_]+", "", s)
-
-    group_norm = norm(group)
-    found = False
-    for box, text, score in result:
+    # 严格匹配：去标点后相等，或包含群名且最多多 4 个字符（如群成员数），
+    # 兜底模糊匹配容错 OCR 漏字/错别字（如"赛事平台"→"事平台"），规则见 fuzzy_match.title_match。
+    for text, score, *_ in result:
         log(f"  VERIFY text={text!r} score={score:.2f}")
-        if score < 0.5:
-            continue
-        t_norm = norm(text)
-        # 严格匹配：规范化后相等，或一方完全包含另一方且长度接近。
-        if t_norm == group_norm:
-            found = True
-            log(f"  VERIFY MATCHED (exact): {text!r} == {group!r}")
-        elif group_norm in t_norm and len(t_norm) <= len(group_norm) + 4:
-            # 允许 OCR 多识别少量字符（如群成员数），但差距不能太大。
-            found = True
-            log(f"  VERIFY MATCHED (near): {text!r} contains {group!r}")
-        else:
-            # 模糊匹配兜底：容错 OCR 漏字/错别字（如"赛事平台"→"事平台"）。
-            sim = similarity(group_norm, t_norm)
-            if sim >= 0.85:
-                found = True
-                log(f"  VERIFY MATCHED (fuzzy): {text!r} sim={sim:.2f} vs {group!r}")
+    texts = [box.text for box in result if box.score >= 0.5]
+    hits = _title_matcher.match(group, texts)
+    for idx, reason in hits:
+        log(f"  VERIFY MATCHED ({reason}): {texts[idx]!r} vs {group!r}")
+    found = bool(hits)
 
     if not found:
         log(f"VERIFY FAILED: target {group!r} not in conversation title")
@@ -561,7 +593,7 @@ def find_search_box(win):
 
 def find_search_box_ocr(win):
     """OCR 兜底定位搜索入口（比例定位失败时用）。
-    只截窗口左 20% 宽度 + 顶部 15% 高度的小区域，resize 50% + cls=False，
+    只截窗口左 20% 宽度 + 顶部 15% 高度的小区域，经 ocr_regions 缩小 50% 识别，
     比全屏 OCR 快很多。返回中心坐标或 None。"""
     dpi = get_window_dpi_scale(win)
     left, top = win.left, win.top
@@ -573,33 +605,19 @@ def find_search_box_ocr(win):
     crop_bottom = top + int(win_height * 0.15)
     log(f"SEARCH_BOX_OCR crop: ({crop_left},{crop_top},{crop_right},{crop_bottom})")
 
-    sct = mss()
-    monitor = {
-        "top": crop_top, "left": crop_left,
-        "width": crop_right - crop_left, "height": crop_bottom - crop_top,
-    }
-    shot = sct.grab(monitor)
-    img = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
-    scale = 0.5
-    small = img.resize((int(img.width * scale), int(img.height * scale)), Image.LANCZOS)
-    ocr = get_ocr()
-    result, _ = ocr(small, cls=False)
+    result = ocr_regions(Region("search_box", (crop_left, crop_top, crop_right, crop_bottom)))["search_box"]
     if not result:
         log("SEARCH_BOX_OCR: no results")
         return None
 
     keywords = ["查找所有聊天", "查找", "搜索"]
     best_hit = None
-    for box, text, score in result:
+    for text, score, cx, cy, _, _ in result:
         log(f"  SEARCH_BOX_OCR text={text!r} score={score:.2f}")
         if score < 0.5:
             continue
         for kw in keywords:
             if kw in text:
-                xs = [p[0] / scale for p in box]
-                ys = [p[1] / scale for p in box]
-                cx = sum(xs) / 4 + crop_left
-                cy = sum(ys) / 4 + crop_top
                 rank = len(text)
                 log(f"SEARCH_BOX_OCR HIT: {text!r} -> ({int(cx)},{int(cy)})")
                 if best_hit is None or rank > best_hit[0]:
@@ -611,16 +629,17 @@ def find_search_box_ocr(win):
     return None
 
 
-def main():
-    group = os.environ.get("WECHAT_GROUP", "文件传输助手").strip()
-    message = os.environ.get("WECHAT_MESSAGE", "")
-    if not message:
-        log("EMPTY_MESSAGE")
-        save_debug_log()
-        sys.exit(2)
+class SendAborted(Exception):
+    """发送流程中止，code 为对应的退出码"""
+
+    def __init__(self, code, reason):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
 
-    log(f"START group={group!r} msg_len={len(message)} dpi_scale={get_dpi_scale()}")
 
+def prepare_window():
+    """找到（必要时启动）企微主窗口并激活，返回窗口对象"""
     # 1. 找/启动企微窗口。
     win = find_wework_window()
     if win is None:
@@ -633,15 +652,11 @@ def main():
                 launched = True
                 break
         if not launched:
-            log("NO_WXWORK_EXE")
-            save_debug_log()
-            sys.exit(2)
-        # 轮询等待窗口稳定出现（冷启动时窗口会重建，需连续两次查到同一有效窗口）。
-        win = wait_window_stable(timeout=60, interval=1.0)
+            raise SendAborted(2, "NO_WXWORK_EXE")
+        # 等待窗口稳定出现（冷启动时窗口会重建，需确认同一有效窗口不再被替换）。
+        win = wait_window_stable(timeout=60)
         if win is None:
-            log("NO_STABLE_WINDOW after waiting 60s")
-            save_debug_log()
-            sys.exit(2)
+            raise SendAborted(2, "NO_STABLE_WINDOW after waiting 60s")
 
     log(f"window found: title={win.title!r} rect=({win.left},{win.top},{win.right},{win.bottom})")
     # 激活窗口，失败重试。激活可能触发窗口重建，失效则重新查找。
@@ -652,22 +667,22 @@ def main():
         if win:
             activate_window(win)
         else:
-            log("RE_FIND_AFTER_ACTIVATE_FAILED")
-            save_debug_log()
-            sys.exit(2)
+            raise SendAborted(2, "RE_FIND_AFTER_ACTIVATE_FAILED")
     log("window activated")
     # 激活后再次验证窗口有效，失效则重新查找。
     if safe_win_rect(win) is None:
         log("window handle invalid after activate, re-finding")
-        win = wait_for(find_wework_window, timeout=10, interval=1.0, desc="refind_after_activate")
+        win = wait_window(find_wework_window, timeout=10, desc="refind_after_activate")
         if win is None:
-            log("RE_FIND_FAILED after activate")
-            save_debug_log()
-            sys.exit(2)
+            raise SendAborted(2, "RE_FIND_FAILED after activate")
     screenshot("01_after_activate", win)
+    return win
 
+
+def open_search_popup(win):
+    """确保全局搜索弹窗已打开并聚焦输入框（已打开则直接复用）"""
     # 2. 确保全局搜索弹窗已打开并聚焦输入框。
-    # 策略：多轮重试，每轮后用 wait_for 轮询弹窗是否出现。
+    # 策略：多轮重试，每轮后用 wait_window 等待弹窗出现。
     #   轮1: DPI 比例定位点击搜索入口
     #   轮2: OCR 兜底定位点击
     #   轮3: 快捷键 Ctrl+Alt+F（企微全局搜索快捷键）
@@ -687,136 +702,291 @@ def main():
         sb_pos = find_search_box(win)
         log(f"clicking search box at ({sb_pos[0]},{sb_pos[1]})")
         pyautogui.click(sb_pos[0], sb_pos[1])
-        if wait_for(find_search_popup, timeout=3, interval=0.3, desc="popup_after_ratio_click"):
+        if wait_window(find_search_popup, timeout=3, desc="popup_after_ratio_click"):
             log("popup appeared after ratio click")
             popup_opened = True
 
         # 轮2: OCR 兜底。
         if not popup_opened:
             log("round 2: OCR fallback")
-            screenshot("02a_round1_missed")
+            tracer.count("popup_retry")
+            screenshot("02a_round1_missed", win)
             sb_pos2 = find_search_box_ocr(win)
             if sb_pos2:
                 log(f"OCR fallback clicking search box at ({sb_pos2[0]},{sb_pos2[1]})")
                 pyautogui.click(sb_pos2[0], sb_pos2[1])
-                if wait_for(find_search_popup, timeout=3, interval=0.3, desc="popup_after_ocr_click"):
+                if wait_window(find_search_popup, timeout=3, desc="popup_after_ocr_click"):
                     log("popup appeared after OCR click")
                     popup_opened = True
 
         # 轮3: 快捷键 Ctrl+Alt+F。
         if not popup_opened:
             log("round 3: Ctrl+Alt+F shortcut")
+            tracer.count("popup_retry")
             # 先确保企微主窗口是前台。
             activate_window(win)
             time.sleep(0.2)
             pyautogui.hotkey("ctrl", "alt", "f")
-            if wait_for(find_search_popup, timeout=3, interval=0.3, desc="popup_after_shortcut"):
+            if wait_window(find_search_popup, timeout=3, desc="popup_after_shortcut"):
                 log("popup appeared after Ctrl+Alt+F")
                 popup_opened = True
 
         if not popup_opened:
-            log("ALL_ROUNDS_FAILED: cannot open search popup, abort")
-            save_debug_log()
-            sys.exit(4)
-    screenshot("02_after_click_search_box")
-
-    # 3. 清空搜索输入框 → 粘贴群名 → 等搜索结果。
-    # Ctrl+A 全选输入框内容（即使弹窗已打开且有旧内容也能清空）。
-    log("pressing Ctrl+A to clear search box")
-    pyautogui.hotkey("ctrl", "a")
-    time.sleep(0.05)
-    pyperclip.copy(group)
-    log(f"clipboard set to group: {group!r}")
-    time.sleep(0.1)
-    log("pressing Ctrl+V to paste group name")
-    pyautogui.hotkey("ctrl", "v")
-    # 等搜索结果列表加载（企微搜索通常 1 秒内出结果）。
-    log("waiting 1.5s for search results")
-    time.sleep(1.5)
-    screenshot("03_after_search")
-
-    # 4. 确定搜索结果所在区域。
-    # 全局搜索浮层是独立窗口，可能被用户拖到任意屏幕（含副屏）。
-    # 粘贴群名后焦点在浮层输入框，故浮层=前台窗口，取其 rect 作为 OCR 区域，
-    # 这样不管浮层在主屏还是副屏都能截到搜索结果。
-    log("locating search popup via foreground window")
-    fg_hwnd = ctypes.windll.user32.GetForegroundWindow()
-    fg_rect = get_foreground_window_rect()
-    fg_title = get_window_title(fg_hwnd) if fg_hwnd else ""
-    log(f"foreground hwnd={fg_hwnd} title={fg_title!r} rect={fg_rect}")
-    # 也尝试用 pygetwindow 找弹窗（更可靠，不依赖前台状态）。
-    popup2 = find_search_popup()
-    if popup2:
-        search_region = (popup2.left, popup2.top, popup2.right, popup2.bottom)
-        log(f"SEARCH_REGION: popup window {search_region}")
-    elif fg_rect and fg_rect != (win.left, win.top, win.right, win.bottom):
-        search_region = fg_rect
-        log(f"SEARCH_REGION: foreground popup {search_region}")
-    else:
-        search_region = (win.left, win.top, win.right, win.bottom)
-        log(f"SEARCH_REGION: fallback wework window {search_region}")
-
-    # OCR 找群名，失败重试一次（搜索结果可能加载稍慢）。
-    log("starting OCR (attempt 1)")
-    pos = ocr_find_group(search_region, group)
-    if pos is None:
-        log("GROUP_NOT_FOUND attempt 1, retry after 1s")
-        time.sleep(1.0)
-        log("starting OCR (attempt 2)")
+            raise SendAborted(4, "ALL_ROUNDS_FAILED: cannot open search popup")
+    screenshot("02_after_click_search_box", popup or win)
+
+
+def send_to_group(win, group, message):
+    """在已打开的搜索弹窗中搜索群名、进入会话、校验标题后发送 message"""
+    with tracer.span("search"):
+        # 3. 清空搜索输入框 → 粘贴群名 → 等搜索结果。
+        # Ctrl+A 全选输入框内容（即使弹窗已打开且有旧内容也能清空）。
+        log("pressing Ctrl+A to clear search box")
+        pyautogui.hotkey("ctrl", "a")
+        time.sleep(0.05)
+        pyperclip.copy(group)
+        log(f"clipboard set to group: {group!r}")
+        time.sleep(0.1)
+        open_popup = find_search_popup()
+        if open_popup:
+            watch_rect = (open_popup.left, open_popup.top, open_popup.right, open_popup.bottom)
+        else:
+            watch_rect = (win.left, win.top, win.right, win.bottom)
+        before_paste = signature(watch_rect)
+        log("pressing Ctrl+V to paste group name")
+        pyautogui.hotkey("ctrl", "v")
+        # 等搜索结果列表刷新并稳定（企微搜索通常 1 秒内出结果），不再固定等 1.5 秒。
+        settle(watch_rect, before_paste, "search_results", change_timeout=1.5, stable_timeout=1.5)
+        screenshot("03_after_search", rect=watch_rect)
+
+    with tracer.span("locate_results"):
+        # 4. 确定搜索结果所在区域。
+        # 全局搜索浮层是独立窗口，可能被用户拖到任意屏幕（含副屏）。
+        # 粘贴群名后焦点在浮层输入框，故浮层=前台窗口，取其 rect 作为 OCR 区域，
+        # 这样不管浮层在主屏还是副屏都能截到搜索结果。
+        log("locating search popup via foreground window")
+        fg_hwnd = ctypes.windll.user32.GetForegroundWindow()
+        fg_rect = get_foreground_window_rect()
+        fg_title = get_window_title(fg_hwnd) if fg_hwnd else ""
+        log(f"foreground hwnd={fg_hwnd} title={fg_title!r} rect={fg_rect}")
+        # 也尝试用 pygetwindow 找弹窗（更可靠，不依赖前台状态）。
+        popup2 = find_search_popup()
+        if popup2:
+            search_region = (popup2.left, popup2.top, popup2.right, popup2.bottom)
+            log(f"SEARCH_REGION: popup window {search_region}")
+        elif fg_rect and fg_rect != (win.left, win.top, win.right, win.bottom):
+            search_region = fg_rect
+            log(f"SEARCH_REGION: foreground popup {search_region}")
+        else:
+            search_region = (win.left, win.top, win.right, win.bottom)
+            log(f"SEARCH_REGION: fallback wework window {search_region}")
+
+    with tracer.span("find_group"):
+        # OCR 找群名，失败重试一次（搜索结果可能加载稍慢）。
+        # 画面没变时重新 OCR 只会得到同样的结果，故仅在结果列表变化后才重试。
+        results_rect = search_results_rect(search_region)
+        log("starting OCR (attempt 1)")
+        results_sig = signature(results_rect)
         pos = ocr_find_group(search_region, group)
-    if pos is None:
-        log("GROUP_NOT_FOUND, fallback: Down + Enter")
-        screenshot("04_group_not_found")
-        pyautogui.press("down")
-        time.sleep(0.3)
+        if pos is None:
+            log("GROUP_NOT_FOUND attempt 1, waiting for results to change")
+            tracer.count("find_group_retry")
+            if settle(results_rect, results_sig, "search_results_retry"):
+                log("starting OCR (attempt 2)")
+                pos = ocr_find_group(search_region, group)
+            else:
+                log("search results unchanged, skip OCR attempt 2")
+
+    with tracer.span("open_conversation"):
+        title_rect = conversation_title_rect(win)
+        title_sig = signature(title_rect)
+        if pos is None:
+            log("GROUP_NOT_FOUND, fallback: Down + Enter")
+            screenshot("04_group_not_found", rect=search_region)
+            pyautogui.press("down")
+            time.sleep(0.3)
+            pyautogui.press("enter")
+        else:
+            log(f"clicking search result at ({pos[0]},{pos[1]})")
+            pyautogui.click(pos[0], pos[1])
+            log("click issued")
+        # 等会话标题切换并稳定，不再固定等 1 秒。
+        settle(title_rect, title_sig, "conversation_switch")
+        if pos is not None:
+            screenshot("05_after_click_group", win)
+
+    with tracer.span("verify"):
+        # 5. 发送前检查：OCR 确认当前会话标题 = 目标群名，防止发错群。
+        # 验证失败时重试最多 3 次（会话切换可能稍慢）。
+        log("pre-send check: verifying conversation title")
+        verified = False
+        for verify_attempt in range(3):
+            screenshot(f"05b_verify_attempt{verify_attempt+1}", win)
+            title_sig = signature(title_rect)
+            if verify_conversation(win, group):
+                log(f"VERIFY_OK on attempt {verify_attempt+1}")
+                verified = True
+                break
+            log(f"VERIFY_FAILED attempt {verify_attempt+1}, waiting for title to change")
+            tracer.count("verify_retry")
+            # 标题未变化时下一次识别直接命中 OCR 缓存，不会重复推理
+            settle(title_rect, title_sig, f"verify_retry{verify_attempt+1}")
+        if not verified:
+            raise SendAborted(5, "VERIFY_FAILED: conversation title does not match target group after 3 attempts, ABORT SEND")
+
+    with tracer.span("paste_send"):
+        # 6. 粘贴汇报并发送。此时焦点应在消息输入框。
+        log("copying message to clipboard")
+        pyperclip.copy(message)
+        time.sleep(0.1)
+        log("pressing Ctrl+V to paste message")
+        pyautogui.hotkey("ctrl", "v")
+        time.sleep(0.4)
+        screenshot("06_after_paste_message", win)
+        log("pressing Enter to send")
         pyautogui.press("enter")
-        time.sleep(1.0)
-    else:
-        log(f"clicking search result at ({pos[0]},{pos[1]})")
-        pyautogui.click(pos[0], pos[1])
-        log("click issued")
-        time.sleep(1.0)
-        screenshot("05_after_click_group", win)
-
-    # 5. 发送前检查：OCR 确认当前会话标题 = 目标群名，防止发错群。
-    # 验证失败时重试最多 3 次（会话切换可能稍慢）。
-    log("pre-send check: verifying conversation title")
-    verified = False
-    for verify_attempt in range(3):
-        screenshot(f"05b_verify_attempt{verify_attempt+1}", win)
-        if verify_conversation(win, group):
-            log(f"VERIFY_OK on attempt {verify_attempt+1}")
-            verified = True
-            break
-        log(f"VERIFY_FAILED attempt {verify_attempt+1}, retry after 1s")
-        time.sleep(1.0)
-    if not verified:
-        log("VERIFY_FAILED: conversation title does not match target group after 3 attempts, ABORT SEND")
+        time.sleep(0.3)
+        screenshot("07_after_send", win)
+        log(f"SENT group={group!r}")
+
+
+def load_targets(default_message):
+    """读取批量发送目标，返回 [(群名, 正文), ...]；未配置批量目标时返回 None"""
+    raw = os.environ.get("WECHAT_TARGETS", "").strip()
+    path = os.environ.get("WECHAT_TARGETS_FILE", "").strip()
+    if not raw and path:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            raw = f.read().strip()
+        if not raw.startswith("["):
+            raw = json.dumps([line.strip() for line in raw.splitlines() if line.strip()], ensure_ascii=False)
+    if not raw:
+        return None
+    targets = []
+    for item in json.loads(raw):
+        if isinstance(item, str):
+            item = {"group": item}
+        group = str(item.get("group", "")).strip()
+        if group:
+            targets.append((group, item.get("message") or default_message))
+    return targets
+
+
+def run_batch(targets):
+    """依次发送到多个群，复用已激活的窗口和已加载的 OCR。返回每个目标的结果列表"""
+    global _shot_prefix
+    set_match_targets([group for group, _ in targets])
+    with tracer.span("window"):
+        win = prepare_window()
+    results = []
+    for idx, (group, message) in enumerate(targets, 1):
+        _shot_prefix = f"t{idx}_"
+        start = time.perf_counter()
+        log(f"BATCH target {idx}/{len(targets)} group={group!r} msg_len={len(message)}")
+        result = {"group": group, "status": "sent", "code": 0, "reason": ""}
+        try:
+            with tracer.span("target", group=group, index=idx):
+                if safe_win_rect(win) is None:
+                    with tracer.span("window"):
+                        win = prepare_window()
+                with tracer.span("popup"):
+                    open_search_popup(win)
+                send_to_group(win, group, message)
+        except SendAborted as exc:
+            log(f"BATCH target {idx} FAILED: {exc.reason}")
+            result.update(status="failed", code=exc.code, reason=exc.reason)
+        except Exception as exc:
+            # 键鼠/剪贴板出错、窗口句柄失效等意外异常也只算这个目标失败，退出码同单发模式的 1
+            detail = traceback.format_exc()
+            log(f"BATCH target {idx} EXCEPTION: {exc}")
+            log(detail)
+            result.update(status="failed", code=1, reason=f"EXCEPTION: {exc}", traceback=detail)
+        if result["status"] == "failed":
+            # 回到主窗口，清掉可能残留的搜索弹窗，再处理下一个目标
+            try:
+                pyautogui.press("esc")
+                activate_window(win)
+            except Exception as exc:
+                log(f"BATCH target {idx} cleanup failed: {exc}")
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000)
+        print(f"BATCH_RESULT: {json.dumps(result, ensure_ascii=False)}", flush=True)
+        results.append(result)
+    _shot_prefix = ""
+    os.makedirs(_DEBUG_DIR, exist_ok=True)
+    with open(os.path.join(_DEBUG_DIR, "batch_result.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+def dry_run():
+    """--dry-run：按一次发送的顺序识别搜索结果、会话标题、搜索入口三个区域，不点击、
+    不粘贴、不发送。bench_ocr_daemon.py 用它测量冷启动与常驻 OCR 服务下的端到端耗时。
+    找不到企微窗口时用主屏代替。"""
+    start = time.perf_counter()
+    group = os.environ.get("WECHAT_GROUP", "文件传输助手").strip()
+    win = find_wework_window()
+    if win is None:
+        width, height = pyautogui.size()
+        win = SimpleNamespace(left=0, top=0, right=width, bottom=height)
+    ocr_find_group(safe_win_rect(win), group)
+    verify_conversation(win, group)
+    find_search_box_ocr(win)
+    log(f"DRY_RUN_DONE elapsed_ms={(time.perf_counter() - start) * 1000:.0f}")
+
+
+def main():
+    group = os.environ.get("WECHAT_GROUP", "文件传输助手").strip()
+    message = os.environ.get("WECHAT_MESSAGE", "")
+    targets = load_targets(message)
+    if targets is not None:
+        if not targets or not all(msg for _, msg in targets):
+            log("EMPTY_TARGETS_OR_MESSAGE")
+            save_debug_log()
+            sys.exit(2)
+        log(f"START batch targets={len(targets)} dpi_scale={get_dpi_scale()}")
+        try:
+            results = run_batch(targets)
+        except SendAborted as exc:
+            log(exc.reason)
+            save_debug_log()
+            sys.exit(exc.code)
+        failed = [r for r in results if r["status"] != "sent"]
+        log(f"BATCH_DONE sent={len(results) - len(failed)} failed={len(failed)}")
+        save_debug_log(failed=bool(failed))
+        sys.exit(6 if failed else 0)
+
+    if not message:
+        log("EMPTY_MESSAGE")
+        save_debug_log()
+        sys.exit(2)
+
+    log(f"START group={group!r} msg_len={len(message)} dpi_scale={get_dpi_scale()}")
+    set_match_targets([group])
+    try:
+        with tracer.span("window"):
+            win = prepare_window()
+        with tracer.span("popup"):
+            open_search_popup(win)
+        send_to_group(win, group, message)
+    except SendAborted as exc:
+        log(exc.reason)
         save_debug_log()
-        sys.exit(5)
-
-    # 6. 粘贴汇报并发送。此时焦点应在消息输入框。
-    log("copying message to clipboard")
-    pyperclip.copy(message)
-    time.sleep(0.1)
-    log("pressing Ctrl+V to paste message")
-    pyautogui.hotkey("ctrl", "v")
-    time.sleep(0.4)
-    screenshot("06_after_paste_message", win)
-    log("pressing Enter to send")
-    pyautogui.press("enter")
-    time.sleep(0.3)
-    screenshot("07_after_send", win)
+        sys.exit(exc.code)
     log("SENT")
-    save_debug_log()
+    save_debug_log(failed=False)
     sys.exit(0)
 
 
 if __name__ == "__main__":
+    if "--ocr-daemon" in sys.argv[1:]:
+        # 打包后的 send_to_wework.exe 以此参数作为常驻 OCR 服务运行
+        serve_ocr_daemon()
+        sys.exit(0)
+    if "--dry-run" in sys.argv[1:]:
+        dry_run()
+        sys.exit(0)
     try:
         main()
     except Exception as exc:
-        import traceback
         log(f"EXCEPTION: {exc}")
         log(traceback.format_exc())
         save_debug_log()
@@ -0,0 +1,110 @@
+"""发送流程分阶段计时：嵌套 span + 计数器，导出 Chrome trace 并汇总多次运行的分位数。
+
+每次运行结束写两份文件到 debug 目录（与 run.log 同目录）：
+- trace.json：Chrome trace 格式（chrome://tracing 或 Perfetto 打开），otherData 里是本次汇总。
+- trace_history.jsonl：每次运行追加一行汇总（各阶段耗时、计数器），保留最近 HISTORY_LIMIT 行。
+
+汇总报告：python scripts/send_trace.py [debug 目录]，输出各阶段 p50/p95。"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from _stats import percentile
+
+HISTORY_LIMIT = 500
+TRACE_FILE = "trace.json"
+HISTORY_FILE = "trace_history.jsonl"
+
+
+class Tracer:
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._stack = []
+        self.events = []
+        self.counters = {}
+
+    def _now_us(self):
+        return (time.perf_counter() - self._origin) * 1e6
+
+    @contextmanager
+    def span(self, name, **args):
+        """计时一个阶段；嵌套的 span 以 "外层/内层" 作为汇总时的阶段名"""
+        path = "/".join(self._stack + [name])
+        self._stack.append(name)
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self.events.append({"name": name, "ph": "X", "ts": round(start, 1),
+                                "dur": round(self._now_us() - start, 1), "pid": os.getpid(),
+                                "tid": threading.get_ident(), "args": dict(args, path=path)})
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        self.events.append({"name": name, "ph": "C", "ts": round(self._now_us(), 1),
+                            "pid": os.getpid(), "args": {name: self.counters[name]}})
+
+    def summary(self, status=""):
+        phases = {}
+        for event in self.events:
+            if event["ph"] == "X":
+                path = event["args"]["path"]
+                phases[path] = round(phases.get(path, 0.0) + event["dur"] / 1000, 1)
+        return {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": status,
+                "total_ms": round(self._now_us() / 1000, 1), "phases": phases,
+                "counters": dict(self.counters)}
+
+    def write(self, out_dir, status=""):
+        """写 trace.json 并把汇总追加到 trace_history.jsonl，返回汇总"""
+        os.makedirs(out_dir, exist_ok=True)
+        summary = self.summary(status)
+        with open(os.path.join(out_dir, TRACE_FILE), "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms", "otherData": summary},
+                      f, ensure_ascii=False)
+        history = os.path.join(out_dir, HISTORY_FILE)
+        lines = []
+        if os.path.exists(history):
+            with open(history, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        lines.append(json.dumps(summary, ensure_ascii=False))
+        with open(history, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines[-HISTORY_LIMIT:]) + "\n")
+        return summary
+
+
+def aggregate(history_file):
+    """读取历史汇总，返回 {阶段: (次数, p50, p95)}，另含 "total" 和 "counter:名字" 项"""
+    samples = {}
+    with open(history_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            samples.setdefault("total", []).append(run["total_ms"])
+            for phase, ms in run.get("phases", {}).items():
+                samples.setdefault(phase, []).append(ms)
+            for name, n in run.get("counters", {}).items():
+                samples.setdefault(f"counter:{name}", []).append(n)
+    return {name: (len(v), percentile(v, 50), percentile(v, 95)) for name, v in samples.items()}
+
+
+def main():
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else r"C:\威智工作汇报器测试\scripts\debug"
+    history = os.path.join(out_dir, HISTORY_FILE)
+    if not os.path.exists(history):
+        sys.exit(f"no trace history: {history}")
+    report = aggregate(history)
+    print(f"{'phase':<40}{'n':>6}{'p50':>10}{'p95':>10}")
+    for name, (n, p50, p95) in sorted(report.items()):
+        print(f"{name:<40}{n:>6}{p50:>10.1f}{p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""窗口事件监听：用 WinEvent 钩子代替轮询枚举窗口。
+
+WindowWatcher.wait_until(predicate) 先检查一次条件，之后只在收到窗口事件
+（创建/销毁/显示/隐藏/标题变化/前台切换）时才重新检查，窗口一出现就能发现，
+不再按退避间隔反复枚举所有顶层窗口。事件来源可替换：
+- WinEventBackend：SetWinEventHook，独立线程跑消息循环（仅 Windows）。
+- FakeBackend：手动 emit 事件，供非 Windows 环境测试和基准使用。
+没有事件来源时按 fallback_interval 定时检查，退化为普通轮询。
+
+系统里其他程序的窗口事件很密集，event_filter（如 CandidateFilter）在钩子线程按事件
+的 hwnd 只看这一个窗口，不是候选窗口的事件直接丢弃，不会触发重新枚举。"""
+
+import ctypes
+import sys
+import threading
+import time
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+
+EVENT_NAMES = {
+    EVENT_SYSTEM_FOREGROUND: "foreground",
+    EVENT_OBJECT_CREATE: "create",
+    EVENT_OBJECT_DESTROY: "destroy",
+    EVENT_OBJECT_SHOW: "show",
+    EVENT_OBJECT_HIDE: "hide",
+    EVENT_OBJECT_NAMECHANGE: "namechange",
+}
+
+# 钩子订阅的事件区间（闭区间）
+_HOOK_RANGES = [
+    (EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND),
+    (EVENT_OBJECT_CREATE, EVENT_OBJECT_HIDE),
+    (EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE),
+]
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WM_QUIT = 0x0012
+
+
+class FakeBackend:
+    def start(self, callback):
+        self._callback = callback
+
+    def stop(self):
+        self._callback = None
+
+    def emit(self, kind, hwnd=0):
+        if self._callback:
+            self._callback(kind, hwnd)
+
+
+class WinEventBackend:
+    """在后台线程注册 WinEvent 钩子并运行消息循环，事件回调在该线程中触发"""
+
+    def __init__(self):
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+
+    def start(self, callback):
+        self._callback = callback
+        self._thread = threading.Thread(target=self._run, name="winevent-hook", daemon=True)
+        self._thread.start()
+        self._ready.wait(2.0)
+
+    def _run(self):
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        WINEVENTPROC = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG,
+            wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [wintypes.UINT, wintypes.UINT, wintypes.HMODULE, WINEVENTPROC,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.UINT]
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread, ms):
+            # 只关心顶层窗口本身的事件，忽略控件、光标等子对象
+            if id_object == OBJID_WINDOW and id_child == CHILDID_SELF:
+                self._callback(EVENT_NAMES.get(event, hex(event)), hwnd or 0)
+
+        proc = WINEVENTPROC(on_event)  # 保持引用，防止回调被回收
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        hooks = [user32.SetWinEventHook(lo, hi, 0, proc, 0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS)
+                 for lo, hi in _HOOK_RANGES]
+        self._ready.set()
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        if self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+            self._thread.join(1.0)
+            self._thread_id = None
+
+
+def window_title(hwnd):
+    """读取单个窗口的标题，失败返回空串"""
+    try:
+        user32 = ctypes.windll.user32
+        length = user32.GetWindowTextLengthW(hwnd)
+        if length == 0:
+            return ""
+        buf = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buf, length + 1)
+        return buf.value
+    except Exception:
+        return ""
+
+
+class CandidateFilter:
+    """事件过滤：match(标题) 为真的窗口是候选窗口，只有候选窗口的事件才唤醒等待方。
+
+    候选窗口的 hwnd 会记下来：它之后的 hide/destroy（此时已读不到标题）以及标题改掉
+    的事件也放行。只在钩子线程中调用。"""
+
+    def __init__(self, match, get_title=window_title):
+        self.match = match
+        self.get_title = get_title
+        self._known = set()
+
+    def __call__(self, kind, hwnd):
+        if kind == "destroy":
+            known = hwnd in self._known
+            self._known.discard(hwnd)
+            return known
+        if kind != "hide" and self.match(self.get_title(hwnd)):
+            self._known.add(hwnd)
+            return True
+        return hwnd in self._known
+
+
+def create_default_backend():
+    """Windows 上返回 WinEventBackend，其他平台返回 None（退化为定时检查）"""
+    if sys.platform == "win32":
+        return WinEventBackend()
+    return None
+
+
+class WindowWatcher:
+    def __init__(self, backend=None, fallback_interval=2.0, min_interval=0.03, event_filter=None):
+        self.backend = backend
+        self.event_filter = event_filter
+        self.fallback_interval = fallback_interval if backend else 0.5
+        # 系统里其他程序的窗口事件可能很密集，两次检查至少间隔 min_interval 秒，
+        # 期间到达的事件合并为一次检查
+        self.min_interval = min_interval
+        self._cond = threading.Condition()
+        self._seq = 0
+        self.events = 0
+        self.ignored = 0
+        self.checks = 0
+
+    def start(self):
+        if self.backend:
+            self.backend.start(self._on_event)
+        return self
+
+    def stop(self):
+        if self.backend:
+            self.backend.stop()
+
+    def _on_event(self, kind, hwnd):
+        if self.event_filter is not None:
+            try:
+                relevant = self.event_filter(kind, hwnd)
+            except Exception:
+                relevant = True
+            if not relevant:
+                self.ignored += 1
+                return
+        with self._cond:
+            self._seq += 1
+            self.events += 1
+            self._cond.notify_all()
+
+    def wait_event(self, timeout):
+        """等待下一个窗口事件，收到返回 True，超时返回 False"""
+        with self._cond:
+            seen = self._seq
+            return self._cond.wait_for(lambda: self._seq != seen, timeout=timeout)
+
+    def wait_until(self, predicate, timeout):
+        """等到 predicate() 为真并返回其结果，超时返回 None。
+
+        每批事件只检查一次条件；事件丢失时每 fallback_interval 秒兜底检查一次。"""
+        deadline = time.monotonic() + timeout
+        last_check = None
+        while True:
+            if last_check is not None:
+                gap = self.min_interval - (time.monotonic() - last_check)
+                if gap > 0:
+                    time.sleep(min(gap, max(deadline - time.monotonic(), 0)))
+            with self._cond:
+                seen = self._seq
+            last_check = time.monotonic()
+            self.checks += 1
+            try:
+                result = predicate()
+            except Exception:
+                result = None
+            if result:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            with self._cond:
+                self._cond.wait_for(lambda: self._seq != seen, timeout=min(remaining, self.fallback_interval))
@@ -0,0 +1,272 @@
+"""发送任务队列：“发送到企微”在后台排队执行，Tk 主线程只负责提交任务和显示状态。
+
+- 任务由单个工作线程按提交顺序执行（剪贴板和企微窗口同一时间只能有一个发送在操作）。
+- 状态变化（queued/running/progress/done/failed/cancelled）经队列交回主线程，
+  每 POLL_INTERVAL_MS 最多处理 MAX_EVENTS_PER_TICK 条，回调 on_status(job, status, detail)。
+- 每次状态变化由写盘线程向 send_jobs.jsonl 追加一行；进程中途崩溃后，下次启动会把
+  停在 queued/running 的任务标记为 interrupted，日志里保留崩溃前最后的进度。
+- 相同类型、目标和内容的任务在排队/执行中，或成功后 DEDUP_SECONDS 秒内再次提交，
+  直接返回已有任务，连点按钮不会重复发送。"""
+
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from background_task import POLL_INTERVAL_MS
+
+MAX_EVENTS_PER_TICK = 20
+DEDUP_SECONDS = 5
+KEEP_JOBS = 200  # 日志超过 KEEP_JOBS * 4 行时，启动时压缩为最近 KEEP_JOBS 个任务各一行
+FINAL_STATUSES = ("done", "failed", "cancelled", "interrupted")
+
+
+class SendFailed(Exception):
+    """发送失败（send_to_wechat 返回 False、助手非零退出等）"""
+
+
+class SendJob:
+    def __init__(self, job_id, kind, content, target=None):
+        self.id = job_id
+        self.kind = kind
+        self.content = content
+        self.target = target
+        self.key = hashlib.sha1(f"{kind}\0{target or ''}\0{content}".encode("utf-8")).hexdigest()
+        self.status = "queued"
+        self.detail = ""
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in FINAL_STATUSES
+
+    def describe(self):
+        """首条日志记录的任务信息：只存长度和摘要，汇报内容不落盘"""
+        return {"kind": self.kind, "target": self.target, "content_len": len(self.content),
+                "key": self.key[:12]}
+
+
+def load_jobs(journal_file):
+    """重放日志，返回 ({任务 id: 合并后的最新状态}，日志行数)，按提交顺序"""
+    jobs = {}
+    lines = 0
+    if os.path.exists(journal_file):
+        with open(journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 写到一半的最后一行
+                lines += 1
+                jobs.setdefault(entry["id"], {}).update(entry)
+    return jobs, lines
+
+
+def _has_partial_line(path):
+    """文件非空且最后一个字节不是换行"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+class SendQueue:
+    """runners 为 {kind: runner}，runner(job, cancel_event, report) 在工作线程执行，
+    失败时抛异常；report(text) 上报进度"""
+
+    def __init__(self, root, journal_file, runners, on_status=None):
+        self.root = root
+        self.journal_file = journal_file
+        self.runners = runners
+        self.on_status = on_status
+        self.pending = 0  # 未结束的任务数，只在主线程读写
+        self._recent = {}  # key -> job，去重用，只在主线程读写
+        self._seq = 0
+        self._polling = False
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        self._journal = queue.Queue()
+        self._writer = threading.Thread(target=self._write_journal, name="send-journal", daemon=True)
+        self._worker = threading.Thread(target=self._work, name="send-queue", daemon=True)
+        self._writer.start()
+        self._worker.start()
+
+    def submit(self, kind, content, target=None):
+        """提交发送任务，返回 (job, created)；被去重时返回已有任务和 False"""
+        self._seq += 1
+        job = SendJob(f"{datetime.now():%Y%m%d%H%M%S}_{self._seq}", kind, content, target)
+        now = time.time()
+        for key, old in list(self._recent.items()):
+            if old.finished and now - old.finished_at >= DEDUP_SECONDS:
+                del self._recent[key]
+        existing = self._recent.get(job.key)
+        if existing and (not existing.finished or existing.status == "done"):
+            return existing, False
+        self._recent[job.key] = job
+        self.pending += 1
+        self._emit(job, "queued", extra=job.describe())
+        self._jobs.put(job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        return job, True
+
+    def cancel(self, job):
+        """排队中的任务不再执行；执行中的任务由 runner 检查 cancel_event 尽快结束"""
+        job.cancel_event.set()
+
+    def close(self, timeout=2.0):
+        """取消未完成的任务并等待日志写完；超时仍在执行的任务下次启动时记为 interrupted"""
+        for job in self._recent.values():
+            job.cancel_event.set()
+        self._jobs.put(None)
+        self._worker.join(timeout)
+        self._journal.put(None)
+        self._writer.join(timeout)
+
+    def _emit(self, job, status, detail="", extra=None):
+        """工作线程和主线程都会调用：更新任务状态、记日志、通知主线程"""
+        if status != "progress":
+            job.status = status
+            if status in FINAL_STATUSES:
+                job.finished_at = time.time()
+        job.detail = detail
+        entry = {"id": job.id, "status": job.status, "detail": detail,
+                 "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        if extra:
+            entry.update(extra)
+        self._journal.put(entry)
+        self._events.put((job, status, detail))
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancel_event.is_set():
+                self._emit(job, "cancelled")
+                continue
+            self._emit(job, "running")
+            try:
+                runner = self.runners.get(job.kind)
+                if runner is None:
+                    raise SendFailed(f"未知的发送方式: {job.kind}")
+                runner(job, job.cancel_event, lambda text: self._emit(job, "progress", text))
+            except Exception as exc:
+                self._emit(job, "cancelled" if job.cancel_event.is_set() else "failed", str(exc))
+            else:
+                self._emit(job, "cancelled" if job.cancel_event.is_set() else "done")
+
+    def _poll(self):
+        for _ in range(MAX_EVENTS_PER_TICK):
+            try:
+                job, status, detail = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if status in FINAL_STATUSES:
+                self.pending -= 1
+            if self.on_status:
+                try:
+                    self.on_status(job, status, detail)
+                except Exception as exc:
+                    print(f"发送状态回调出错: {exc}")
+        if self.pending > 0 or not self._events.empty():
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _write_journal(self):
+        os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+        self._recover()
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            while True:
+                entry = self._journal.get()
+                if entry is None:
+                    return
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+
+    def _recover(self):
+        """上次退出时未结束的任务标记为 interrupted；日志过长，或含旧版写入的内容预览时压缩"""
+        jobs, lines = load_jobs(self.journal_file)
+        has_preview = False
+        for state in jobs.values():
+            has_preview = state.pop("preview", None) is not None or has_preview
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        interrupted = [state for state in jobs.values() if state.get("status") not in FINAL_STATUSES]
+        for state in interrupted:
+            print(f"上次发送未完成: {state['id']} {state.get('status')} {state.get('detail', '')}")
+            state.update(status="interrupted", time=now)
+        if lines > KEEP_JOBS * 4 or has_preview:
+            tmp = f"{self.journal_file}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for state in list(jobs.values())[-KEEP_JOBS:]:
+                    f.write(json.dumps(state, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.journal_file)
+            return
+        if _has_partial_line(self.journal_file):
+            # 上次崩溃时最后一行只写了一半，先换行，免得新记录接在残行后面
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write("\n")
+        if interrupted:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                for state in interrupted:
+                    f.write(json.dumps({"id": state["id"], "status": "interrupted",
+                                        "detail": state.get("detail", ""), "time": now},
+                                       ensure_ascii=False) + "\n")
+
+
+def clipboard_runner(job, cancel_event, report):
+    """复制到剪贴板并打开企业微信"""
+    from wechat_integration import send_to_wechat
+    if not send_to_wechat(job.content):
+        raise SendFailed("发送到企微失败，请检查企微是否安装！")
+
+
+def find_wework_helper():
+    """企微自动发送助手的命令行：优先 scripts/send_to_wework.exe，源码运行时用 .py，找不到返回 None"""
+    frozen = getattr(sys, "frozen", False)
+    base = os.path.dirname(sys.executable if frozen else os.path.abspath(__file__))
+    exe = os.path.join(base, "scripts", "send_to_wework.exe")
+    if os.path.exists(exe):
+        return [exe]
+    script = os.path.join(base, "scripts", "send_to_wework.py")
+    if not frozen and os.path.exists(script):
+        return [sys.executable, script]
+    return None
+
+
+def _terminate_on_cancel(proc, cancel_event):
+    while proc.poll() is None:
+        if cancel_event.wait(0.2):
+            proc.terminate()
+            return
+
+
+def wework_runner(job, cancel_event, report):
+    """调用 send_to_wework 助手自动发到 job.target 群，助手的每行日志作为进度上报"""
+    command = find_wework_helper()
+    if not command:
+        raise SendFailed("未找到企微自动发送助手 send_to_wework")
+    env = dict(os.environ, WECHAT_GROUP=job.target or "", WECHAT_MESSAGE=job.content,
+               PYTHONIOENCODING="utf-8")
+    flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env,
+                            encoding="utf-8", errors="replace", creationflags=flags)
+    threading.Thread(target=_terminate_on_cancel, args=(proc, cancel_event), daemon=True).start()
+    last_line = ""
+    for line in proc.stdout:
+        line = line.strip()
+        if line:
+            last_line = line
+            report(line)
+    code = proc.wait()
+    if code != 0:
+        raise SendFailed(f"send_to_wework 退出码 {code}: {last_line}")
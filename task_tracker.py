@@ -5,33 +5,171 @@ from datetime import datetime, timedelta
 TASK_FILE = os.path.join("工作汇报记录", "task_tracker.json")
 
 
-def load_tasks():
-    """加载任务跟踪数据"""
-    if os.path.exists(TASK_FILE):
+JOURNAL_SUFFIX = ".journal"
+COMPACT_EVERY = 200  # 日志累计这么多条后合并回快照
+
+
+class TaskRepository:
+    """任务仓库：启动时加载一次，之后全部在内存中按索引查找。
+
+    task_tracker.json 仍是原来的 {"tasks": [...], "completed": [...]} 快照；每次修改只向
+    旁边的 .journal 追加一行 JSON，加载时在快照上重放，累计 COMPACT_EVERY 条后重写
+    快照并清空日志。索引：id → 任务，进行中任务按 status、created_at 分组。"""
+
+    def __init__(self, task_file):
+        self.task_file = task_file
+        self.journal_file = task_file + JOURNAL_SUFFIX
+        self._journal_entries = 0
+        self._load()
+
+    def _load(self):
+        data = {"tasks": [], "completed": []}
+        if os.path.exists(self.task_file):
+            try:
+                with open(self.task_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception:
+                pass
+        self._reset(data)
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 写到一半的最后一行
+                    self._apply(entry)
+                    self._journal_entries += 1
+
+    def _reset(self, data):
+        self._by_id = {}
+        self._active = {}  # 进行中列表（data["tasks"]），dict 保持插入顺序且可 O(1) 删除
+        self._completed = []
+        self._by_status = {}
+        self._by_created = {}
+        for task in data.get("tasks", []):
+            self._index_active(task)
+        for task in data.get("completed", []):
+            self._by_id[task["id"]] = task
+            self._completed.append(task)
+
+    def _index_active(self, task):
+        self._by_id[task["id"]] = task
+        self._active[task["id"]] = task
+        self._by_status.setdefault(task.get("status"), {})[task["id"]] = task
+        self._by_created.setdefault(task.get("created_at"), {})[task["id"]] = task
+
+    def _unindex_active(self, task):
+        self._active.pop(task["id"], None)
+        self._by_status.get(task.get("status"), {}).pop(task["id"], None)
+        self._by_created.get(task.get("created_at"), {}).pop(task["id"], None)
+
+    def _apply(self, entry):
+        op = entry.get("op")
+        if op == "add":
+            self._index_active(entry["task"])
+            return True
+        task = self._active.get(entry.get("id"))
+        if task is None:
+            return False
+        if op == "update":
+            fields = entry["fields"]
+            if "status" in fields:
+                self._by_status.get(task.get("status"), {}).pop(task["id"], None)
+            task.update(fields)
+            if "status" in fields:
+                self._by_status.setdefault(task["status"], {})[task["id"]] = task
+            return True
+        if op == "complete":
+            self._unindex_active(task)
+            task["status"] = "completed"
+            task["completed_at"] = entry["completed_at"]
+            self._completed.append(task)
+            return True
+        return False
+
+    def _record(self, entry):
+        if not self._apply(entry):
+            return False
         try:
-            with open(TASK_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._journal_entries += 1
+            if self._journal_entries >= COMPACT_EVERY:
+                self.compact()
         except Exception:
             pass
-    return {
-        "tasks": [],
-        "completed": []
-    }
+        return True
+
+    def snapshot(self):
+        return {"tasks": list(self._active.values()), "completed": list(self._completed)}
+
+    def compact(self):
+        """把当前状态写回快照并清空日志"""
+        tmp = self.task_file + ".tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.task_file)
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self._journal_entries = 0
+            return True
+        except Exception:
+            return False
+
+    def replace_all(self, data):
+        self._reset(data)
+        return self.compact()
+
+    def add(self, task):
+        base = task["id"]
+        n = 1
+        while task["id"] in self._by_id:
+            task["id"] = f"{base}_{n}"
+            n += 1
+        self._record({"op": "add", "task": task})
+        return task
+
+    def update(self, task_id, fields):
+        return self._record({"op": "update", "id": task_id, "fields": fields})
+
+    def complete(self, task_id, completed_at):
+        return self._record({"op": "complete", "id": task_id, "completed_at": completed_at})
+
+    def get(self, task_id):
+        return self._by_id.get(task_id)
+
+    def by_status(self, status):
+        return list(self._by_status.get(status, {}).values())
+
+    def by_created(self, date_str):
+        return list(self._by_created.get(date_str, {}).values())
+
+
+_repository = None
+
+
+def get_repository():
+    """进程内共享的任务仓库（首次调用时加载）"""
+    global _repository
+    if _repository is None or _repository.task_file != TASK_FILE:
+        _repository = TaskRepository(TASK_FILE)
+    return _repository
+
+
+def load_tasks():
+    """加载任务跟踪数据"""
+    return get_repository().snapshot()
 
 
 def save_tasks(data):
     """保存任务跟踪数据"""
-    try:
-        with open(TASK_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception:
-        return False
+    return get_repository().replace_all(data)
 
 
 def add_task(task_name, progress="0%", completed="", planned=""):
     """添加新任务"""
-    data = load_tasks()
     task = {
         "id": f"task_{datetime.now().timestamp()}",
         "name": task_name,
@@ -41,52 +179,28 @@ def add_task(task_name, progress="0%", completed="", planned=""):
         "created_at": datetime.now().strftime("%Y-%m-%d"),
         "status": "in_progress"
     }
-    data["tasks"].append(task)
-    save_tasks(data)
-    return task
+    return get_repository().add(task)
 
 
 def update_task(task_id, progress=None, completed=None, planned=None, status=None):
     """更新任务信息"""
-    data = load_tasks()
-    for task in data["tasks"]:
-        if task["id"] == task_id:
-            if progress is not None:
-                task["progress"] = progress
-            if completed is not None:
-                task["completed"] = completed
-            if planned is not None:
-                task["planned"] = planned
-            if status is not None:
-                task["status"] = status
-            save_tasks(data)
-            return True
-    return False
+    fields = {"progress": progress, "completed": completed, "planned": planned, "status": status}
+    return get_repository().update(task_id, {k: v for k, v in fields.items() if v is not None})
 
 
 def complete_task(task_id):
     """完成任务"""
-    data = load_tasks()
-    for i, task in enumerate(data["tasks"]):
-        if task["id"] == task_id:
-            task["status"] = "completed"
-            task["completed_at"] = datetime.now().strftime("%Y-%m-%d")
-            data["completed"].append(data["tasks"].pop(i))
-            save_tasks(data)
-            return True
-    return False
+    return get_repository().complete(task_id, datetime.now().strftime("%Y-%m-%d"))
 
 
 def get_tasks_by_date(date_str):
     """获取指定日期的任务"""
-    data = load_tasks()
-    return [task for task in data["tasks"] if task["created_at"] == date_str]
+    return get_repository().by_created(date_str)
 
 
 def get_pending_tasks():
     """获取未完成的任务"""
-    data = load_tasks()
-    return [task for task in data["tasks"] if task["status"] == "in_progress"]
+    return get_repository().by_status("in_progress")
 
 
 def generate_today_work():
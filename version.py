@@ -45,10 +45,13 @@ def save_version(version):
         return False
 
 
+def format_version(version):
+    return f"v{version['major']}.{version['minor']}.{version['patch']}.{version['build']}"
+
+
 def get_version_string():
     """获取版本号字符串"""
-    version = load_version()
-    return f"v{version['major']}.{version['minor']}.{version['patch']}.{version['build']}"
+    return format_version(load_version())
 
 
 def increment_version(part='patch'):
@@ -78,7 +81,7 @@ def get_version_info():
     """获取完整的版本信息"""
     version = load_version()
     return {
-        'version': get_version_string(),
+        'version': format_version(version),
         'major': version['major'],
         'minor': version['minor'],
         'patch': version['patch'],
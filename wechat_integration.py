@@ -1,49 +1,177 @@
-import subprocess
+"""企业微信启动与检测。
+
+系统相关操作（注册表、文件存在、进程枚举、启动进程）集中在 Platform 对象里：
+- WindowsPlatform：注册表查安装路径；进程检查用 ToolHelp 快照在进程内枚举，
+  不再每次启动 tasklist 子进程（几百毫秒 -> 约 1 毫秒）。
+- FakePlatform：内存中的假环境，非 Windows 上测试用，set_platform() 替换。
+
+PathResolver 缓存解析出的 WXWork.exe 路径，之后每次只 stat 一下该文件，
+文件不在了（卸载、移动）才重新查注册表和常见路径。"""
+
+import ctypes
 import os
-import winreg
+import subprocess
+import sys
+
+WECHAT_EXE = "WXWork.exe"
+UNINSTALL_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\WXWork"
+
+# 常见的企业微信安装路径
+COMMON_PATHS = [
+    r"C:\Program Files\WXWork\WXWork.exe",
+    r"C:\Program Files (x86)\WXWork\WXWork.exe",
+    r"D:\Program Files\WXWork\WXWork.exe",
+    r"D:\Program Files (x86)\WXWork\WXWork.exe"
+]
+
+TH32CS_SNAPPROCESS = 0x00000002
+MAX_PATH = 260
+
+
+class WindowsPlatform:
+    def install_location(self):
+        """从注册表读取企业微信安装目录，读不到返回 None"""
+        import winreg
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, UNINSTALL_KEY) as key:
+                return winreg.QueryValueEx(key, "InstallLocation")[0]
+        except OSError:
+            return None
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def process_running(self, image_name):
+        """用 ToolHelp 快照枚举进程，判断是否有映像名为 image_name 的进程"""
+        from ctypes import wintypes
+
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [("dwSize", wintypes.DWORD),
+                        ("cntUsage", wintypes.DWORD),
+                        ("th32ProcessID", wintypes.DWORD),
+                        ("th32DefaultHeapID", ctypes.c_size_t),
+                        ("th32ModuleID", wintypes.DWORD),
+                        ("cntThreads", wintypes.DWORD),
+                        ("th32ParentProcessID", wintypes.DWORD),
+                        ("pcPriClassBase", wintypes.LONG),
+                        ("dwFlags", wintypes.DWORD),
+                        ("szExeFile", wintypes.WCHAR * MAX_PATH)]
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+        kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+        kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+        snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+        if not snapshot or snapshot == wintypes.HANDLE(-1).value:
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            entry = PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+            target = image_name.lower()
+            ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+            while ok:
+                if entry.szExeFile.lower() == target:
+                    return True
+                ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+            return False
+        finally:
+            kernel32.CloseHandle(snapshot)
+
+    def launch(self, args):
+        # 隐藏窗口运行
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        subprocess.Popen(args, startupinfo=startupinfo)
+
+
+class FakePlatform:
+    """假环境：files 为存在的文件路径集合，processes 为正在运行的映像名集合。
+    launch 只记录参数，并把可执行文件加入 processes"""
+
+    def __init__(self, install_location=None, files=(), processes=()):
+        self.location = install_location
+        self.files = set(files)
+        self.processes = set(processes)
+        self.launched = []
+        self.registry_reads = 0
+        self.stats = 0
+
+    def install_location(self):
+        self.registry_reads += 1
+        return self.location
+
+    def exists(self, path):
+        self.stats += 1
+        return path in self.files
+
+    def process_running(self, image_name):
+        return image_name.lower() in {p.lower() for p in self.processes}
+
+    def launch(self, args):
+        self.launched.append(list(args))
+        self.processes.add(os.path.basename(args[0].replace("\\", "/")))
+
+
+class PathResolver:
+    """缓存 WXWork.exe 路径；命中缓存时只检查文件是否仍存在"""
+
+    def __init__(self, platform):
+        self.platform = platform
+        self._path = None
+
+    def resolve(self):
+        if self._path and self.platform.exists(self._path):
+            return self._path
+        self._path = self._lookup()
+        return self._path
+
+    def invalidate(self):
+        self._path = None
+
+    def _lookup(self):
+        try:
+            location = self.platform.install_location()
+        except Exception:
+            location = None
+        if location:
+            wechat_exe = os.path.join(location, WECHAT_EXE)
+            if self.platform.exists(wechat_exe):
+                return wechat_exe
+        for path in COMMON_PATHS:
+            if self.platform.exists(path):
+                return path
+        return None
+
+
+def create_default_platform():
+    """Windows 上返回 WindowsPlatform，其他平台返回空的 FakePlatform"""
+    if sys.platform == "win32":
+        return WindowsPlatform()
+    return FakePlatform()
+
+
+_platform = create_default_platform()
+_resolver = PathResolver(_platform)
+
+
+def set_platform(platform):
+    """替换系统操作实现（测试用），同时清空路径缓存"""
+    global _platform, _resolver
+    _platform = platform
+    _resolver = PathResolver(platform)
 
 
 def get_wechat_path():
     """获取企业微信的安装路径"""
-    try:
-        # 尝试从注册表获取企业微信路径
-        key_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\WXWork"
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
-            install_location = winreg.QueryValueEx(key, "InstallLocation")[0]
-            wechat_exe = os.path.join(install_location, "WXWork.exe")
-            if os.path.exists(wechat_exe):
-                return wechat_exe
-    except Exception:
-        pass
-    
-    # 常见的企业微信安装路径
-    common_paths = [
-        r"C:\Program Files\WXWork\WXWork.exe",
-        r"C:\Program Files (x86)\WXWork\WXWork.exe",
-        r"D:\Program Files\WXWork\WXWork.exe",
-        r"D:\Program Files (x86)\WXWork\WXWork.exe"
-    ]
-    
-    for path in common_paths:
-        if os.path.exists(path):
-            return path
-    
-    return None
+    return _resolver.resolve()
 
 
 def open_wechat():
     """打开企业微信"""
-    wechat_path = get_wechat_path()
-    if wechat_path:
-        try:
-            # 隐藏窗口运行
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            subprocess.Popen([wechat_path], startupinfo=startupinfo)
-            return True
-        except Exception:
-            return False
-    return False
+    return open_wechat_chat()
 
 
 def open_wechat_chat(chat_name=None):
@@ -55,19 +183,18 @@ def open_wechat_chat(chat_name=None):
     wechat_path = get_wechat_path()
     if wechat_path:
         try:
-            # 隐藏窗口运行
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             # 企业微信的命令行参数
             # 注意：企业微信的命令行参数可能会随版本变化
             if chat_name:
                 # 尝试打开指定聊天
-                subprocess.Popen([wechat_path, f"weixin://wxwork/{chat_name}"], startupinfo=startupinfo)
+                _platform.launch([wechat_path, f"weixin://wxwork/{chat_name}"])
             else:
                 # 直接打开企业微信
-                subprocess.Popen([wechat_path], startupinfo=startupinfo)
+                _platform.launch([wechat_path])
             return True
         except Exception:
+            # 缓存的路径启动失败时下次重新解析
+            _resolver.invalidate()
             return False
     return False
 
@@ -75,16 +202,7 @@ def open_wechat_chat(chat_name=None):
 def is_wechat_running():
     """检查企业微信是否正在运行"""
     try:
-        # 使用tasklist命令检查企业微信进程，隐藏窗口
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        result = subprocess.run(
-            ["tasklist", "/FI", "IMAGENAME eq WXWork.exe"],
-            capture_output=True,
-            text=True,
-            startupinfo=startupinfo
-        )
-        return "WXWork.exe" in result.stdout
+        return _platform.process_running(WECHAT_EXE)
     except Exception:
         return False
 
@@ -0,0 +1,307 @@
+"""wiz_work_repo_tool.py 的历史存储：只追加的 JSON Lines 日志。
+
+history.jsonl 每行一条操作：
+- {"op": "add", "id": 7, "entry": {...}}：新增一份汇报，id 单调递增
+- {"op": "del", "id": 7}：删除（墓碑），原行保留到下次压缩
+
+HistoryStore 记住已读到的字节偏移，refresh() 只读取偏移之后新增的完整行，
+Streamlit 每次 rerun 的开销与历史总量无关。追加只写一行；墓碑累计超过活动条目数
+（且不少于 COMPACT_MIN_DEAD）时在后台线程重写文件，只保留活动条目。文件被压缩
+替换（inode 变化或变短）时自动整体重新加载。
+
+多个会话/进程同时写：追加、删除和压缩都在 FileLock（旁边的 .lock 文件）内进行，
+持锁后先读入别人新写的行再分配 id，id 不会重复、写入不会互相覆盖；读不加锁，
+只消费完整的行。
+
+旧版 history.json（整个列表）首次打开时自动导入，原文件改名为 history.json.migrated；
+export_json() 可导出为旧格式。"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+JOURNAL_NAME = "history.jsonl"
+LEGACY_NAME = "history.json"
+COMPACT_MIN_DEAD = 200
+LOCK_TIMEOUT = 10.0
+
+
+class FileLock:
+    """跨进程互斥锁：锁住 path 文件的第一个字节（Windows 用 msvcrt.locking，其他平台 fcntl.flock）。
+    同一进程内的线程互斥由调用方的 threading 锁负责"""
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def _try_lock(self):
+        if sys.platform == "win32":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._try_lock()
+                return self
+            except OSError:
+                if time.monotonic() > deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"等待历史记录写锁超时: {self.path}")
+                time.sleep(0.005)
+
+    def __exit__(self, *exc):
+        if sys.platform == "win32":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _line(record):
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class HistoryStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(path + ".lock")
+        self._compacting = False
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self._entries = {}  # id -> entry，按追加顺序
+        self._offset = 0
+        self._file_id = None
+        self._mtime = None
+        self._next_id = 1
+        self._dead = 0  # 文件中已失效的行（被删条目的 add 行和墓碑行）
+        # items()/entries() 的缓存：新增时原地追加，删除或重新加载时置空重建
+        self._items = None
+        self._values = None
+        self.version = 0  # 每次数据变化加一，供上层缓存判断是否失效
+
+    def refresh(self):
+        """读取其他会话/进程追加的新行。返回是否有变化"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            file_id = (st.st_dev, st.st_ino)
+            if self._file_id is not None and (file_id != self._file_id or st.st_size < self._offset):
+                # 文件被压缩替换，整体重新加载
+                self._reset()
+            self._file_id = file_id
+            self._mtime = st.st_mtime_ns
+            if st.st_size == self._offset:
+                return False
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # 最后一行可能正在写，留到下次
+            changed = False
+            for raw in data[:end].splitlines():
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    self._dead += 1
+                    continue
+                changed = self._apply(record) or changed
+            self._offset += end
+            if changed:
+                self.version += 1
+            return changed
+
+    def _apply(self, record):
+        entry_id = record.get("id")
+        if record.get("op") == "add":
+            entry = record.get("entry", {})
+            if entry_id in self._entries:
+                self._items = self._values = None
+            elif self._items is not None:
+                self._items.append((entry_id, entry))
+                self._values.append(entry)
+            self._entries[entry_id] = entry
+            self._next_id = max(self._next_id, entry_id + 1)
+            return True
+        if record.get("op") == "del":
+            self._dead += 1
+            if self._entries.pop(entry_id, None) is not None:
+                self._dead += 1
+                self._items = self._values = None
+                return True
+        return False
+
+    def _append(self, record):
+        # 持写锁并已 refresh()，偏移之后还有字节说明末尾是崩溃留下的半行，先换行隔开
+        partial = os.path.exists(self.path) and os.path.getsize(self.path) > self._offset
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(("\n" if partial else "") + _line(record))
+
+    def append(self, entry):
+        """追加一份汇报，返回其 id"""
+        with self._lock, self._file_lock:
+            self.refresh()
+            entry_id = self._next_id
+            self._append({"op": "add", "id": entry_id, "entry": entry})
+            self.refresh()
+            return entry_id
+
+    def delete(self, entry_id):
+        """写入墓碑；失效行过多时触发后台压缩。返回是否删除了条目"""
+        with self._lock, self._file_lock:
+            self.refresh()
+            if entry_id not in self._entries:
+                return False
+            self._append({"op": "del", "id": entry_id})
+            self.refresh()
+            if self._dead >= COMPACT_MIN_DEAD and self._dead > len(self._entries) and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self._compact_in_background, name="history-compact",
+                                 daemon=True).start()
+            return True
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except OSError as exc:
+            # Windows 上文件正被其他进程读取时替换会失败，下次删除时再试
+            print(f"历史记录压缩失败: {exc}")
+        finally:
+            self._compacting = False
+
+    def compact(self):
+        """重写日志文件，只保留活动条目（保留原 id）"""
+        with self._lock, self._file_lock:
+            self.refresh()
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry_id, entry in self._entries.items():
+                    f.write(_line({"op": "add", "id": entry_id, "entry": entry}))
+            os.replace(tmp, self.path)
+            st = os.stat(self.path)
+            self._file_id = (st.st_dev, st.st_ino)
+            self._mtime = st.st_mtime_ns
+            self._offset = st.st_size
+            self._dead = 0
+
+    def items(self):
+        """[(id, entry), ...]，按追加顺序。返回内部缓存列表，调用方不要修改"""
+        with self._lock:
+            if self._items is None:
+                self._items = list(self._entries.items())
+                self._values = list(self._entries.values())
+            return self._items
+
+    def entries(self):
+        """与 items() 顺序一致的条目列表（不含 id）"""
+        with self._lock:
+            self.items()
+            return self._values
+
+    def snapshot(self):
+        """(签名, items())。签名为已加载内容对应的 (文件 id, mtime, 已读偏移)，
+        内容变化签名必变，可作为上层缓存的键"""
+        with self._lock:
+            return (self._file_id, self._mtime, self._offset), self.items()
+
+    def get(self, entry_id):
+        return self._entries.get(entry_id)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def export_json(self, path):
+        """导出为旧版 history.json 格式（条目列表）"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([entry for _, entry in self.items()], f, ensure_ascii=False, indent=2)
+
+
+def entry_label(entry):
+    return f"{entry.get('user', '')}|{entry.get('dept', '')}|{entry.get('date', '')}"
+
+
+class HistoryIndex:
+    """历史浏览用索引，由 items() 一次构建：
+
+    - latest：(user, dept) -> 日期最新的一份汇报（同日期取先提交的）
+    - ids_by_date：条目 id 按日期从近到远排列，同日期后提交的在前
+    - user_counts：各用户提交份数"""
+
+    def __init__(self, items):
+        self.latest = {}
+        self.user_counts = {}
+        for _, entry in items:
+            key = (entry.get("user"), entry.get("dept"))
+            current = self.latest.get(key)
+            if current is None or entry.get("date", "") > current.get("date", ""):
+                self.latest[key] = entry
+            user = entry.get("user", "")
+            self.user_counts[user] = self.user_counts.get(user, 0) + 1
+        # items 按 id 递增；先反转再做稳定排序，同日期的条目自然是后提交的在前
+        ordered = sorted(reversed(items), key=lambda item: item[1].get("date", ""), reverse=True)
+        self.ids_by_date = [entry_id for entry_id, _ in ordered]
+        self._entries = dict(items)
+        self._labels = None  # 与 ids_by_date 对齐的标签，第一次搜索时生成
+
+    def __len__(self):
+        return len(self.ids_by_date)
+
+    def search(self, query):
+        """标签（姓名|部门|日期）包含 query 的 id，顺序同 ids_by_date"""
+        query = query.strip()
+        if not query:
+            return self.ids_by_date
+        if self._labels is None:
+            self._labels = [entry_label(self._entries[i]) for i in self.ids_by_date]
+        return [i for i, label in zip(self.ids_by_date, self._labels) if query in label]
+
+    def label(self, entry_id):
+        return entry_label(self._entries[entry_id])
+
+
+def import_legacy(legacy_path, journal_path):
+    """把旧版 history.json 列表写成日志文件，返回导入条数"""
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        entries = []
+    tmp = f"{journal_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for i, entry in enumerate(entries, 1):
+            f.write(_line({"op": "add", "id": i, "entry": entry}))
+    os.replace(tmp, journal_path)
+    return len(entries)
+
+
+def open_history_store(data_dir):
+    """打开 data_dir 下的历史日志；首次打开时从旧版 history.json 迁移"""
+    os.makedirs(data_dir, exist_ok=True)
+    journal_path = os.path.join(data_dir, JOURNAL_NAME)
+    legacy_path = os.path.join(data_dir, LEGACY_NAME)
+    if not os.path.exists(journal_path):
+        if os.path.exists(legacy_path):
+            count = import_legacy(legacy_path, journal_path)
+            os.replace(legacy_path, legacy_path + ".migrated")
+            print(f"已把 {count} 条历史从 {LEGACY_NAME} 迁移到 {JOURNAL_NAME}")
+        else:
+            open(journal_path, "a", encoding="utf-8").close()
+    return HistoryStore(journal_path)
@@ -1,60 +1,31 @@
 import streamlit as st
-import json, os, datetime
+import datetime
+from report_format import format_report
+from wiz_history_store import HistoryIndex, open_history_store
 
 st.set_page_config(page_title="工作汇报系统（固定模板版）", layout="wide")
 
 # ----------------------- 数据路径 -------------------------- #
 DATA_DIR = "work_report_data"
-HIST_FILE = os.path.join(DATA_DIR, "history.json")
+HISTORY_PAGE_SIZE = 50
 
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
-if not os.path.exists(HIST_FILE):
-    with open(HIST_FILE, "w", encoding="utf-8") as f:
-        json.dump([], f)
+@st.cache_resource
+def get_history_store():
+    # 每个进程只打开一次，之后每次 rerun 只读取新追加的行
+    return open_history_store(DATA_DIR)
 
-def load_json(fp, default):
-    try:
-        with open(fp, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return default
-
-def save_json(fp, obj):
-    with open(fp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-
-def excel_letters(n):
-    res = ""
-    while True:
-        n, r = divmod(n, 26)
-        res = chr(97 + r) + res
-        if n == 0:
-            break
-        n -= 1
-    return res + "."
-
-def proper_bullet(line, idx):
-    import re
-    patterns = [
-        r"^[a-zA-Z]{1,2}\.\s?.*",
-        r"^\d+\.\s?.*",
-        r"^①|②|③|④|⑤|⑥|⑦|⑧|⑨|⑩",
-    ]
-    for pat in patterns:
-        if re.match(pat, line):
-            return line
-    circled = ["①","②","③","④","⑤","⑥","⑦","⑧","⑨","⑩"]
-    if idx < 10:
-        return f"{excel_letters(idx)} {line}"
-    elif idx < 36:
-        return f"{idx+1}. {line}"
-    else:
-        return f"{circled[idx%10]} {line}"
+@st.cache_resource(max_entries=2)
+def get_history_index(signature, _items):
+    # 按日志签名（文件、mtime、已读偏移）缓存，历史没变的 rerun 直接复用索引
+    return HistoryIndex(_items)
 
-def format_with_bullets(text):
-    lines = text.strip().split("\n")
-    return "\n".join([proper_bullet(line, i) for i, line in enumerate(lines) if line.strip()])
+@st.cache_data(max_entries=16)
+def search_history(signature, query, _index):
+    return _index.search(query)
+
+def current_history_index():
+    signature, items = get_history_store().snapshot()
+    return signature, get_history_index(signature, items)
 
 def get_today():
     return str(datetime.date.today())
@@ -114,13 +85,14 @@ with col3:
 date_str = str(date)
 
 # --- 历史加载 ---
-history_list = load_json(HIST_FILE, [])
+history_store = get_history_store()
+history_store.refresh()
 
 def get_last_tomorrow(user, dept):
     # 找到当前人最后一次的明日计划
-    history = [h for h in history_list if h.get("user")==user and h.get("dept")==dept]
-    if history:
-        last = sorted(history, key=lambda x:x['date'], reverse=True)[0]
+    _, index = current_history_index()
+    last = index.latest.get((user, dept))
+    if last:
         return last.get("tomorrow_plan","")
     return ""
 
@@ -138,43 +110,48 @@ with st.form("report_form"):
     submitted = st.form_submit_button("生成/保存汇报")
 
 if submitted:
-    outlist = []
     for field in TEMPLATE:
-        key = field["key"]
-        value = curr_fields[key]
-        st.session_state[key] = value  # 保持当前状态
-        if key in ("today_work","tomorrow_plan"):
-            value = format_with_bullets(value) if value else ("a. 休息" if key=="tomorrow_plan" else "")
-        outlist.append(f"{field['title']}：\n{value}\n")
+        st.session_state[field["key"]] = curr_fields[field["key"]]  # 保持当前状态
+    body, _ = format_report(TEMPLATE, curr_fields)
     toptext = f"姓名：{user}  部门：{dept}  汇报日期：{date_str}\n"
-    report_full = toptext + "="*52 + "\n" + "".join(outlist)
+    report_full = toptext + "="*52 + "\n" + body
     # 写入历史
     newentry = {
         "user": user, "dept": dept, "date": date_str, "report": report_full
     }
     for field in TEMPLATE:
         newentry[field["key"]] = curr_fields[field["key"]]
-    history_list.append(newentry)
-    save_json(HIST_FILE, history_list)
+    try:
+        history_store.append(newentry)
+    except TimeoutError:
+        st.error("其他同事正在保存，历史记录写入超时，请稍后重新提交")
+        st.stop()
     st.success("汇报已生成，下方可一键复制")
     st.code(report_full, language="markdown")
     st.download_button("导出为txt", report_full, file_name=f"work_report_{user}_{date_str}.txt")
     st.button("复制内容", on_click=lambda: st.session_state.setdefault('copied', True))
     with st.expander("免费写作建议/优化：", expanded=False):
-        st.write(make_suggestion(outlist[0]+outlist[1]))
+        st.write(make_suggestion(body))
 
 # --------- 查历史（可一键导入/删除）----------------------
 st.markdown("---")
 with st.expander("历史记录管理（点导入/删除）"):
-    if not history_list:
+    signature, history_index = current_history_index()
+    if not len(history_index):
         st.info("暂无历史记录")
     else:
-        # 展示历史从近到远
-        ids = [f"{h.get('user','')}|{h.get('dept','')}|{h.get('date','')}" for h in history_list[::-1]]
-        selected = st.selectbox("选择历史记录", ids)
-        if selected:
-            idx = ids.index(selected)
-            h = history_list[::-1][idx]
+        # 展示历史从近到远，可按姓名/部门/日期搜索，分页显示
+        query = st.text_input("搜索历史（姓名/部门/日期）", key="hist_query")
+        ids = search_history(signature, query, history_index) if query.strip() else history_index.ids_by_date
+        pages = max(1, (len(ids) + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE)
+        if st.session_state.get("hist_page", 1) > pages:
+            st.session_state["hist_page"] = 1
+        page = st.number_input(f"页码（共 {pages} 页，{len(ids)} 条）", min_value=1, max_value=pages,
+                               step=1, key="hist_page")
+        page_ids = ids[(page - 1) * HISTORY_PAGE_SIZE:page * HISTORY_PAGE_SIZE]
+        selected = st.selectbox("选择历史记录", page_ids, format_func=history_index.label)
+        h = history_store.get(selected) if selected is not None else None
+        if h:
             st.code(h.get("report",""), language="markdown")
             c1, c2 = st.columns(2)
             with c1:
@@ -191,20 +168,14 @@ with st.expander("历史记录管理（点导入/删除）"):
             with c2:
                 if st.button("删除此历史记录"):
                     # 删除选中这个
-                    del_idx = len(history_list) - 1 - idx
-                    history_list.pop(del_idx)
-                    save_json(HIST_FILE, history_list)
+                    history_store.delete(selected)
                     st.success("删除成功！")
                     st.experimental_rerun()
 
 # --------- 统计分析 --------------
 with st.expander("数据统计分析", expanded=False):
-    total = len(history_list)
-    user_counter = {}
-    for h in history_list:
-        u = h.get("user","")
-        user_counter[u] = user_counter.get(u,0)+1
-    st.write(f"历史总汇报份数：{total}")
+    _, history_index = current_history_index()
+    st.write(f"历史总汇报份数：{len(history_index)}")
     st.write("各用户提交量：")
-    for u,c in user_counter.items():
+    for u,c in history_index.user_counts.items():
         st.write(f"- {u}：{c}份")